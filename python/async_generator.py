@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Async Project Generator
+asyncio front end for PIC32ProjectGenerator: blocking file I/O runs on a
+bounded thread pool so callers on an event loop are never stalled
+"""
+
+import sys
+import asyncio
+import argparse
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from generate_project import PIC32ProjectGenerator
+from project_plan import ProjectSpec, create_directories, apply_file
+from project_manifest import record_manifest
+
+DEFAULT_MAX_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the shared bounded executor used when none is supplied."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS,
+                                           thread_name_prefix="pic32gen")
+        return _executor
+
+
+class AsyncPIC32ProjectGenerator:
+    """Coroutine front end wrapping a PIC32ProjectGenerator.
+
+    generate() runs directory creation first, then writes the planned files
+    concurrently on the executor and records the manifest; regenerate() and
+    generate_archive() run on the executor as a whole. Cancelling the task
+    cancels any step that has not started yet. The wrapped generator is left
+    untouched and can still be used synchronously.
+    """
+
+    def __init__(self, generator=None, executor=None):
+        self.generator = generator or PIC32ProjectGenerator()
+        self.executor = executor
+
+    @classmethod
+    def from_spec(cls, spec, cache=None, fs=None, executor=None):
+        return cls(PIC32ProjectGenerator.from_spec(spec, cache, fs), executor)
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor or get_executor(), functools.partial(func, *args, **kwargs))
+
+    async def generate(self, include_startup=False):
+        """Run every generation step for the configured project."""
+        gen = self.generator
+        plan = gen.plan(include_startup)
+        await self._run(create_directories, plan, gen.log, gen.fs)
+        tasks = [asyncio.ensure_future(self._run(apply_file, plan, planned, gen.cache,
+                                                 gen.log, gen.fs))
+                 for planned in plan.files]
+        try:
+            actions = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        results = [(planned.path, action) for planned, action in zip(plan.files, actions)]
+        await self._run(record_manifest, plan, results, gen.cache, gen.fs)
+        return results
+
+    async def regenerate(self):
+        """Update the existing project from its manifest."""
+        return await self._run(self.generator.regenerate)
+
+    async def generate_archive(self, out, fmt="tar", include_startup=False):
+        """Stream the project into a tar/tgz/zip on out."""
+        return await self._run(self.generator.generate_archive, out, fmt, include_startup)
+
+
+async def generate_many(generators, include_startup=False, limit=8):
+    """Generate several projects with at most limit running at once.
+
+    Returns one entry per generator: the step results, or the exception
+    raised while generating that project.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(generator):
+        async with semaphore:
+            return await generator.generate(include_startup=include_startup)
+
+    return await asyncio.gather(*(bounded(g) for g in generators),
+                                return_exceptions=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate several PIC32MZ projects concurrently")
+    parser.add_argument("projnames", nargs="+", help="Names of the projects to generate")
+    parser.add_argument("-d", "--device", default="32MZ1024EFH064",
+                        help="PIC32MZ device (default: 32MZ1024EFH064)")
+    parser.add_argument("-o", "--output", default=".",
+                        help="Root directory where project folders will be created")
+    parser.add_argument("--mikroc", dest="mikroc", action="store_true", default=True,
+                        help="Include startup files for MikroC compatibility (default)")
+    parser.add_argument("--no-mikroc", dest="mikroc", action="store_false",
+                        help="Do not include the MikroC startup files")
+    parser.add_argument("-j", "--jobs", type=int, default=8,
+                        help="Maximum projects generated at once (default: 8)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help="Threads used for blocking file I/O (default: 4)")
+    args = parser.parse_args()
+
+    executor = ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="pic32gen")
+    generators = []
+    for name in args.projnames:
+        spec = ProjectSpec(name, args.device, args.output, args.mikroc)
+        generator = AsyncPIC32ProjectGenerator.from_spec(spec, executor=executor)
+        generator.generator.log = lambda message: None
+        generators.append(generator)
+
+    results = asyncio.run(generate_many(generators, args.mikroc, args.jobs))
+    executor.shutdown()
+
+    failed = 0
+    for generator, result in zip(generators, results):
+        project = generator.generator
+        if isinstance(result, BaseException):
+            failed += 1
+            print(f"✗ {project.project_name}: {result}")
+        else:
+            print(f"✓ {project.project_name}: {project.project_root}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
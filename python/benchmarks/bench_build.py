@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Build Orchestration Benchmarks
+Generates synthetic projects with 100 to 20,000 translation units in the
+generator's directory layout and builds them through the generated Makefiles
+against the stub xc32 toolchain in fake_xc32/. The stub records every call and
+can sleep to stand in for compiler work, so the time make spends globbing,
+spawning shells and echoing per file can be separated from compile time for
+full builds, no-op builds and single-file edits.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from generate_project import PIC32ProjectGenerator  # noqa: E402
+from project_plan import ProjectSpec, SCRIPT_DIR  # noqa: E402
+
+# Results are written next to the benchmarks unless -o says otherwise
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_VERSION = 1
+FAKE_XC32_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_xc32")
+DEFAULT_SIZES = (100, 1000, 5000)
+# Translation units per source folder; folders are nested two levels deep
+FILES_PER_DIR = 50
+DIRS_PER_GROUP = 10
+MODULE = "bench"
+DEVICE = "32MZ2048EFH064"
+
+FAKE_LINKER_SCRIPT = """\
+MEMORY
+{
+  kseg0_program_mem    (rx)  : ORIGIN = 0x9D000000, LENGTH = 0x200000
+  kseg0_boot_mem             : ORIGIN = 0x9FC00490, LENGTH = 0x0
+  kseg0_data_mem       (w!x) : ORIGIN = 0x80000000, LENGTH = 0x80000
+}
+"""
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def create_fake_dfp(workdir, device=DEVICE):
+    """Minimal DFP tree: an include folder and a linker script for the validator."""
+    dfp = os.path.join(workdir, "dfp")
+    _write(os.path.join(dfp, "include", "xc.h"), "/* fake DFP device header */\n")
+    _write(os.path.join(dfp, "xc32", device, f"p{device}.ld"), FAKE_LINKER_SCRIPT)
+    return dfp
+
+
+def create_synthetic_project(workdir, units):
+    """Generate a project and add srcs/grpG/modM/fileF.c until it has units TUs.
+
+    Every module folder gets a matching header under incs so the include
+    path list grows with the project as it does in real trees.
+    """
+    spec = ProjectSpec(f"synth{units}", DEVICE, workdir, include_startup=True)
+    generator = PIC32ProjectGenerator.from_spec(spec)
+    generator.log = lambda message: None
+    generator.generate(include_startup=True)
+
+    root = spec.project_root
+    remaining = units - 1  # main.c is already there
+    index = 0
+    while remaining > 0:
+        group, module = divmod(index, DIRS_PER_GROUP)
+        rel = f"grp{group}/mod{module}"
+        header = f"mod{index}.h"
+        _write(os.path.join(root, "incs", rel, header),
+               f"#ifndef MOD{index}_H\n#define MOD{index}_H\nint mod{index}_value(int x);\n#endif\n")
+        for n in range(min(FILES_PER_DIR, remaining)):
+            _write(os.path.join(root, "srcs", rel, f"file{n}.c"),
+                   f'#include "{header}"\nint mod{index}_f{n}(int x) {{ return x + {n}; }}\n')
+        remaining -= min(FILES_PER_DIR, remaining)
+        index += 1
+    return root
+
+
+def calibrate_stub(runs=50):
+    """Median seconds for one fake xc32-gcc compile call spawned from Python."""
+    tmp = tempfile.mkdtemp(prefix="pic32gen_cal_")
+    try:
+        src = os.path.join(tmp, "a.c")
+        _write(src, "int a;\n")
+        argv = [os.path.join(FAKE_XC32_DIR, "xc32-gcc"), "-c", "-MMD",
+                "-MF", os.path.join(tmp, "a.d"), src, "-o", os.path.join(tmp, "a.o")]
+        env = dict(os.environ, FAKE_XC32_SLEEP="0")
+        env.pop("FAKE_XC32_LOG", None)
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            subprocess.run(argv, env=env, check=True)
+            samples.append(time.perf_counter() - started)
+        return statistics.median(samples)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+class BuildRunner:
+    """Runs the root Makefile of one project against the stub toolchain."""
+
+    def __init__(self, root, dfp, jobs=1, sleep=0.0, make_args=()):
+        self.root = root
+        self.make_args = list(make_args)
+        self.dfp = dfp
+        self.jobs = jobs
+        self.sleep = sleep
+        self.log_path = os.path.join(root, "other", "fake_xc32.log")
+
+    def run(self):
+        """Build once; returns wall time, tool calls and output volume."""
+        if os.path.exists(self.log_path):
+            os.remove(self.log_path)
+        env = dict(os.environ, FAKE_XC32_LOG=self.log_path, FAKE_XC32_SLEEP=str(self.sleep))
+        # The root Makefile hands MAKEFLAGS down itself; do not inherit ours
+        env.pop("MAKEFLAGS", None)
+        cmd = ["make", f"-j{self.jobs}", "all",
+               f"COMPILER_LOCATION={FAKE_XC32_DIR}", f"DFP={self.dfp}",
+               f"DEVICE={DEVICE}", f"MODULE={MODULE}", f"TOOLS_DIR={SCRIPT_DIR}",
+               f"PYTHON={sys.executable}"] + self.make_args
+        started = time.perf_counter()
+        proc = subprocess.run(cmd, cwd=self.root, env=env,
+                              stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        elapsed = time.perf_counter() - started
+        if proc.returncode != 0:
+            tail = proc.stdout.decode("utf-8", errors="replace").splitlines()[-20:]
+            raise RuntimeError("make failed:\n" + "\n".join(tail))
+
+        calls = {}
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    mode = line.split(" ", 1)[0]
+                    calls[mode] = calls.get(mode, 0) + 1
+        return {"wall_s": elapsed, "calls": calls,
+                "output_lines": proc.stdout.count(b"\n"), "output_bytes": len(proc.stdout)}
+
+    def clean(self):
+        for folder in ("objs", "bins", "other"):
+            path = os.path.join(self.root, folder)
+            shutil.rmtree(path, ignore_errors=True)
+            os.makedirs(path, exist_ok=True)
+
+
+def _overhead(result, call_cost, sleep, jobs):
+    """Seconds not explained by the tool calls themselves."""
+    tool_calls = sum(result["calls"].values())
+    tool_time = tool_calls * (call_cost + sleep) / max(jobs, 1)
+    result["tool_calls"] = tool_calls
+    result["tool_s"] = tool_time
+    result["overhead_s"] = max(result["wall_s"] - tool_time, 0.0)
+    return result
+
+
+def bench_project(workdir, units, dfp, jobs, sleep, call_cost, make_args=()):
+    root = create_synthetic_project(workdir, units)
+    runner = BuildRunner(root, dfp, jobs, sleep, make_args)
+    results = {}
+    try:
+        runner.clean()
+        results["full"] = _overhead(runner.run(), call_cost, sleep, jobs)
+        results["noop"] = _overhead(runner.run(), call_cost, sleep, jobs)
+        edited = os.path.join(root, "srcs", "grp0", "mod0", "file0.c")
+        if not os.path.exists(edited):
+            edited = os.path.join(root, "srcs", "main.c")
+        with open(edited, "a", encoding="utf-8") as f:
+            f.write("/* edited */\n")
+        results["edit"] = _overhead(runner.run(), call_cost, sleep, jobs)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    for result in results.values():
+        result["overhead_per_unit_ms"] = result["overhead_s"] * 1000.0 / units
+    return results
+
+
+def run_suite(sizes, jobs, sleep, base=None, make_args=()):
+    call_cost = calibrate_stub()
+    workdir = tempfile.mkdtemp(prefix="pic32gen_build_", dir=base)
+    results = {}
+    try:
+        dfp = create_fake_dfp(workdir)
+        for units in sizes:
+            for scenario, result in bench_project(workdir, units, dfp, jobs, sleep,
+                                                  call_cost, make_args).items():
+                results[f"{scenario}.{units}"] = result
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return call_cost, results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure make orchestration overhead with a stub xc32 toolchain")
+    parser.add_argument("-s", "--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma separated translation unit counts (default: 100,1000,5000)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Parallel make jobs (default: 1)")
+    parser.add_argument("--sleep", type=float, default=0.0,
+                        help="Seconds each stub compiler call sleeps (default: 0)")
+    parser.add_argument("-m", "--make-arg", action="append", default=[],
+                        help="Extra make variable, e.g. -m UNITY=1 (repeatable)")
+    parser.add_argument("--work-dir", help="Where to create the synthetic projects")
+    parser.add_argument("-o", "--output", default=os.path.join(BENCH_DIR, "bench_build.json"),
+                        help="Where to write the results JSON (default: benchmarks/bench_build.json)")
+    args = parser.parse_args()
+
+    if shutil.which("make") is None:
+        print("Error: GNU make is required for the build benchmarks")
+        sys.exit(2)
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+
+    try:
+        call_cost, results = run_suite(sizes, args.jobs, args.sleep, args.work_dir,
+                                       args.make_arg)
+    except RuntimeError as ex:
+        print(f"Error running build benchmark: {ex}")
+        sys.exit(1)
+
+    report = {
+        "schema": SCHEMA_VERSION,
+        "created": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "make": subprocess.run(["make", "--version"], stdout=subprocess.PIPE,
+                               text=True).stdout.splitlines()[0],
+        "jobs": args.jobs,
+        "stub_sleep_s": args.sleep,
+        "make_args": args.make_arg,
+        "stub_call_ms": call_cost * 1000.0,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    print(f"Stub call cost {call_cost * 1000.0:.2f} ms, -j{args.jobs}, sleep {args.sleep}s")
+    print(f"{'scenario':<14} {'wall s':>8} {'calls':>7} {'tool s':>8} {'overhead s':>10} "
+          f"{'ms/TU':>7} {'out lines':>9}")
+    for key in sorted(results, key=lambda k: (int(k.split(".")[1]), k)):
+        r = results[key]
+        print(f"{key:<14} {r['wall_s']:8.2f} {r['tool_calls']:7d} {r['tool_s']:8.2f} "
+              f"{r['overhead_s']:10.2f} {r['overhead_per_unit_ms']:7.3f} {r['output_lines']:9d}")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
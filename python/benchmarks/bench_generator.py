@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Generator Benchmarks
+Measures single-project latency, batch throughput, bytes written and
+filesystem operation counts for PIC32ProjectGenerator and makefile_utils,
+with cold and warm caches on tmpfs, on disk and in memory (generator_fs).
+"cold" only means a new, empty DependencyCache per project: the runs share one
+process, so the OS page cache, imported modules and the memoized Makefile
+fragments stay warm. "warm" shares one DependencyCache primed before timing.
+Results are written as JSON and can be compared against a saved baseline to fail on regressions.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from generate_project import PIC32ProjectGenerator, DependencyCache  # noqa: E402
+from generator_fs import DISK, MemoryFS, RecordingFS  # noqa: E402
+from project_plan import ProjectSpec  # noqa: E402
+
+# Results are written next to the benchmarks unless -o says otherwise
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_VERSION = 1
+# Timing metrics may drift by this fraction before they count as a regression
+DEFAULT_TOLERANCE = 0.25
+TMPFS_CANDIDATES = ("/dev/shm", "/run/shm")
+
+# Audit events that correspond to filesystem syscalls made by the generator.
+# os.stat/os.path.exists are not audited, so the counts are a lower bound.
+AUDITED_EVENTS = ("open", "os.mkdir", "os.rename", "os.replace", "os.remove",
+                  "os.rmdir", "os.listdir", "os.scandir", "os.chmod", "os.utime",
+                  "shutil.copyfile")
+
+
+class OperationCounter:
+    """Counts audited filesystem operations while enabled."""
+
+    def __init__(self):
+        self.enabled = False
+        self.counts = {}
+        sys.addaudithook(self._hook)
+
+    def _hook(self, event, args):
+        if self.enabled and event in AUDITED_EVENTS:
+            self.counts[event] = self.counts.get(event, 0) + 1
+
+    def __enter__(self):
+        self.counts = {}
+        self.enabled = True
+        return self
+
+    def __exit__(self, *exc):
+        self.enabled = False
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+
+COUNTER = OperationCounter()
+
+
+def fs_type(path):
+    """Return the filesystem type of path from /proc/mounts, if known."""
+    best, fstype = "", "unknown"
+    try:
+        with open("/proc/mounts", "r") as f:
+            for line in f:
+                fields = line.split()
+                mount = fields[1]
+                if path.startswith(mount) and len(mount) > len(best):
+                    best, fstype = mount, fields[2]
+    except OSError:
+        pass
+    return fstype
+
+
+def default_targets(disk_dir=None):
+    targets = {}
+    for candidate in TMPFS_CANDIDATES:
+        if candidate and os.path.isdir(candidate) and os.access(candidate, os.W_OK):
+            targets["tmpfs"] = candidate
+            break
+    disk = disk_dir or os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    if fs_type(disk) != "tmpfs":
+        targets["disk"] = disk
+    return targets
+
+
+def tree_bytes(root):
+    total = 0
+    for dirpath, _dirnames, filenames in os.walk(root):
+        for name in filenames:
+            total += os.path.getsize(os.path.join(dirpath, name))
+    return total
+
+
+def _generator(spec, cache, fs=None):
+    generator = PIC32ProjectGenerator.from_spec(spec, cache, fs)
+    generator.log = lambda message: None
+    return generator
+
+
+def bench_single(workdir, runs, warm):
+    """Median latency of generating one project."""
+    shared = DependencyCache()
+    if warm:
+        # Prime the cache once outside the timed region
+        _generator(ProjectSpec("prime", output_dir=workdir, include_startup=True),
+                   shared).generate(include_startup=True)
+    samples = []
+    ops = bytes_written = 0
+    for index in range(runs):
+        spec = ProjectSpec(f"single{index}", output_dir=workdir, include_startup=True)
+        cache = shared if warm else DependencyCache()
+        generator = _generator(spec, cache)
+        with COUNTER:
+            started = time.perf_counter()
+            generator.generate(include_startup=True)
+            samples.append(time.perf_counter() - started)
+        ops = COUNTER.total
+        bytes_written = tree_bytes(spec.project_root)
+        shutil.rmtree(spec.project_root)
+    return {
+        "latency_ms": statistics.median(samples) * 1000.0,
+        "latency_min_ms": min(samples) * 1000.0,
+        "fs_ops": ops,
+        "fs_op_breakdown": dict(COUNTER.counts),
+        "bytes_written": bytes_written,
+    }
+
+
+def bench_batch(workdir, count, warm):
+    """Projects per second generating count projects back to back."""
+    cache = DependencyCache()
+    if warm:
+        _generator(ProjectSpec("prime", output_dir=workdir), cache).generate()
+    batch_dir = os.path.join(workdir, "batch")
+    os.makedirs(batch_dir, exist_ok=True)
+    with COUNTER:
+        started = time.perf_counter()
+        for index in range(count):
+            spec = ProjectSpec(f"batch{index}", output_dir=batch_dir, include_startup=True)
+            _generator(spec, cache if warm else DependencyCache()).generate(include_startup=True)
+        elapsed = time.perf_counter() - started
+    result = {
+        "projects": count,
+        "projects_per_sec": count / elapsed,
+        "fs_ops_per_project": COUNTER.total / count,
+        "bytes_per_project": tree_bytes(batch_dir) / count,
+    }
+    shutil.rmtree(batch_dir)
+    return result
+
+
+def bench_memory(count):
+    """Batch throughput with the projects written to a MemoryFS.
+
+    Shows the generator's own cost without the filesystem; the operation
+    counts come from a RecordingFS and are exact, unlike the audited ones.
+    """
+    cache = DependencyCache()
+    _generator(ProjectSpec("prime", output_dir="/pic32gen_bench"), cache,
+               MemoryFS(DISK)).generate()
+    memory = MemoryFS(DISK)
+    recorder = RecordingFS(memory)
+    started = time.perf_counter()
+    for index in range(count):
+        spec = ProjectSpec(f"batch{index}", output_dir="/pic32gen_bench", include_startup=True)
+        _generator(spec, cache, recorder).generate(include_startup=True)
+    elapsed = time.perf_counter() - started
+    return {
+        "projects": count,
+        "projects_per_sec": count / elapsed,
+        "fs_ops_per_project": recorder.total / count,
+        "fs_op_breakdown": {op: n / count for op, n in sorted(recorder.counts.items())},
+        "bytes_per_project": memory.total_bytes / count,
+    }
+
+
+def bench_makefile_utils(workdir, runs):
+    """Latency of makefile_utils.create_root_makefile, if the module imports."""
+    try:
+        import makefile_utils
+    except SyntaxError as ex:
+        return {"skipped": f"makefile_utils does not import: {ex.msg} (line {ex.lineno})"}
+    samples = []
+    target = os.path.join(workdir, "mfu")
+    os.makedirs(target, exist_ok=True)
+    for _ in range(runs):
+        started = time.perf_counter()
+        makefile_utils.create_root_makefile("Bench", "32MZ2048EFH064", target,
+                                            log=lambda message: None)
+        samples.append(time.perf_counter() - started)
+    shutil.rmtree(target)
+    return {"latency_ms": statistics.median(samples) * 1000.0}
+
+
+def run_suite(targets, runs, batch):
+    results = {}
+    for label, base in targets.items():
+        workdir = tempfile.mkdtemp(prefix="pic32gen_bench_", dir=base)
+        try:
+            for warm in (False, True):
+                cache_label = "warm" if warm else "cold"
+                results[f"single.{cache_label}.{label}"] = bench_single(workdir, runs, warm)
+                results[f"batch.{cache_label}.{label}"] = bench_batch(workdir, batch, warm)
+            results[f"makefile_utils.{label}"] = bench_makefile_utils(workdir, runs)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    results["batch.warm.memory"] = bench_memory(batch)
+    return results
+
+
+# metric name -> True if larger is better
+TIMED_METRICS = {"latency_ms": False, "projects_per_sec": True}
+COUNT_METRICS = ("fs_ops", "fs_ops_per_project", "bytes_written", "bytes_per_project")
+
+
+def compare(baseline, current, tolerance):
+    """Return a list of regression descriptions."""
+    regressions = []
+    for key, old in baseline.get("results", {}).items():
+        new = current["results"].get(key)
+        if not new or "skipped" in old or "skipped" in new:
+            continue
+        for metric, higher_is_better in TIMED_METRICS.items():
+            if metric not in old or metric not in new:
+                continue
+            if higher_is_better and new[metric] < old[metric] * (1.0 - tolerance):
+                regressions.append(f"{key}.{metric}: {new[metric]:.1f} < baseline {old[metric]:.1f}")
+            if not higher_is_better and new[metric] > old[metric] * (1.0 + tolerance):
+                regressions.append(f"{key}.{metric}: {new[metric]:.2f} > baseline {old[metric]:.2f}")
+        for metric in COUNT_METRICS:
+            if metric in old and metric in new and new[metric] > old[metric]:
+                regressions.append(f"{key}.{metric}: {new[metric]:g} > baseline {old[metric]:g}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the PIC32MZ project generator")
+    parser.add_argument("-r", "--runs", type=int, default=20,
+                        help="Samples for single-project latency (default: 20)")
+    parser.add_argument("-b", "--batch", type=int, default=100,
+                        help="Projects generated in the batch benchmark (default: 100)")
+    parser.add_argument("--disk-dir", help="Directory on a real disk (default: the python folder)")
+    parser.add_argument("-o", "--output", default=os.path.join(BENCH_DIR, "bench_generator.json"),
+                        help="Where to write the results JSON (default: benchmarks/bench_generator.json)")
+    parser.add_argument("--baseline", help="Baseline results JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Also write the results to --baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed timing slowdown as a fraction (default: 0.25)")
+    args = parser.parse_args()
+
+    targets = default_targets(args.disk_dir)
+    report = {
+        "schema": SCHEMA_VERSION,
+        "created": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "targets": {label: {"path": path, "fs": fs_type(path)} for label, path in targets.items()},
+        "results": run_suite(targets, args.runs, args.batch),
+    }
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    for key, result in sorted(report["results"].items()):
+        if "skipped" in result:
+            print(f"{key:<28} skipped ({result['skipped']})")
+        elif "projects_per_sec" in result:
+            print(f"{key:<28} {result['projects_per_sec']:8.1f} projects/s  "
+                  f"{result['fs_ops_per_project']:5.0f} ops  {result['bytes_per_project']:8.0f} B")
+        elif "fs_ops" in result:
+            print(f"{key:<28} {result['latency_ms']:8.2f} ms          "
+                  f"{result['fs_ops']:5d} ops  {result['bytes_written']:8d} B")
+        else:
+            print(f"{key:<28} {result['latency_ms']:8.2f} ms")
+    print(f"Results written to {args.output}")
+
+    if args.baseline and args.save_baseline:
+        shutil.copyfile(args.output, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.tolerance)
+        if regressions:
+            print("✗ Performance regressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("✓ No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
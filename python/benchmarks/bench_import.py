@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Import Time Benchmark
+Imports the generator's entry modules in fresh interpreters with
+python -X importtime and fails when one takes longer than its budget, so
+generator startup stays fast as features are added. Also fails if importing
+makefile_utils loads any Makefile fragment: those are read on first use.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+import statistics
+
+PYTHON_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Results are written next to the benchmarks unless -o says otherwise
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_VERSION = 1
+# Cumulative import time, in milliseconds, each module may take
+DEFAULT_BUDGETS_MS = {
+    "generate_project": 60.0,
+    "makefile_utils": 15.0,
+}
+FRAGMENT_PROBE = "import makefile_utils; print(makefile_utils.load_fragment.cache_info().currsize)"
+
+
+def _run(args):
+    env = dict(os.environ)
+    # Time imports from cached bytecode, as an installed generator would
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return subprocess.run([sys.executable, *args], cwd=PYTHON_DIR, env=env,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True, check=True)
+
+
+def import_time_ms(module):
+    """Cumulative import time of module in a fresh interpreter, or None if unsupported."""
+    result = _run(["-X", "importtime", "-c", f"import {module}"])
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        # Nested imports are indented; the module itself is not
+        if len(fields) == 3 and fields[2].rstrip() == f" {module}":
+            return int(fields[1]) / 1000.0
+    return None
+
+
+def measure(module, runs):
+    import_time_ms(module)  # writes the bytecode caches
+    samples = [import_time_ms(module) for _ in range(runs)]
+    if None in samples:
+        return {"skipped": "python -X importtime is not supported (Python 3.7+)"}
+    return {"import_ms": statistics.median(samples), "import_min_ms": min(samples)}
+
+
+def fragments_loaded_on_import():
+    return int(_run(["-c", FRAGMENT_PROBE]).stdout.strip())
+
+
+def parse_budgets(values):
+    budgets = dict(DEFAULT_BUDGETS_MS)
+    for value in values:
+        module, sep, ms = value.partition("=")
+        if not sep:
+            raise ValueError(f"budget {value!r} is not MODULE=MS")
+        budgets[module] = float(ms)
+    return budgets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the PIC32MZ generator's import time")
+    parser.add_argument("-r", "--runs", type=int, default=7,
+                        help="Fresh interpreters per module (default: 7)")
+    parser.add_argument("--budget", action="append", default=[], metavar="MODULE=MS",
+                        help="Budget for a module in milliseconds; repeatable "
+                             "(defaults: generate_project=60, makefile_utils=15)")
+    parser.add_argument("-o", "--output", default=os.path.join(BENCH_DIR, "bench_import.json"),
+                        help="Where to write the results JSON (default: benchmarks/bench_import.json)")
+    args = parser.parse_args()
+
+    try:
+        budgets = parse_budgets(args.budget)
+        results = {module: measure(module, args.runs) for module in budgets}
+        fragments = fragments_loaded_on_import()
+    except (ValueError, subprocess.CalledProcessError) as ex:
+        print(f"Error measuring import time: {ex}")
+        sys.exit(1)
+
+    report = {
+        "schema": SCHEMA_VERSION,
+        "created": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "budgets_ms": budgets,
+        "fragments_loaded_on_import": fragments,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    failures = []
+    for module, result in sorted(results.items()):
+        if "skipped" in result:
+            print(f"{module:<20} skipped ({result['skipped']})")
+            continue
+        over = result["import_ms"] > budgets[module]
+        print(f"{module:<20} {result['import_ms']:7.1f} ms  (budget {budgets[module]:.0f} ms)"
+              + ("  ✗" if over else ""))
+        if over:
+            failures.append(f"{module} imports in {result['import_ms']:.1f} ms, "
+                            f"budget {budgets[module]:.0f} ms")
+    if fragments:
+        failures.append(f"importing makefile_utils loaded {fragments} Makefile fragment(s)")
+    print(f"Results written to {args.output}")
+
+    if failures:
+        print("✗ Import time budget exceeded:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("✓ Imports within budget")
+
+
+if __name__ == "__main__":
+    main()
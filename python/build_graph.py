@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Build Graph
+Exports the resolved build of a project for other tools: every source and
+its object, the compile, assemble and link flags, linker script, DFP and
+the header dependencies make recorded in the .d files. srcs/Makefile keeps
+other/build_graph.json up to date after objects change; dependencies of a
+unit are only re-read when its .d file changed, and the file is only
+rewritten when something differs. With msgpack installed a MessagePack copy
+(other/build_graph.msgpack) is written as well, and load_build_graph()
+prefers it.
+"""
+
+import os
+import sys
+import json
+import argparse
+
+from build_model import (BuildModelError, DEFAULT_CONFIG, config_root, load_build_model,
+                         parse_depfile)
+from include_paths import write_if_changed
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+GRAPH_VERSION = 1
+GRAPH_JSON = os.path.join("other", "build_graph.json")
+GRAPH_MSGPACK = os.path.join("other", "build_graph.msgpack")
+
+
+def _rel(model, root, path):
+    """Path relative to the project root, absolute when outside it."""
+    full = model.abspath(path)
+    rel = os.path.relpath(full, root)
+    return (full if rel.startswith("..") else rel).replace("\\", "/")
+
+
+def _depfile(model, obj):
+    for candidate in (obj[:-2] + ".d", obj + ".d"):
+        path = model.abspath(candidate)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _unit(model, root, source, kind, previous):
+    obj = model.object_for(source)
+    unit = {"source": _rel(model, root, source), "object": _rel(model, root, obj),
+            "kind": kind, "deps": [], "depfile_stat": None}
+    depfile = _depfile(model, obj)
+    if depfile is None:
+        return unit
+    st = os.stat(depfile)
+    stat_key = [st.st_size, st.st_mtime_ns]
+    if previous and previous.get("depfile_stat") == stat_key:
+        unit["deps"] = previous["deps"]
+    else:
+        deps = parse_depfile(depfile) or []
+        # The source itself is the first prerequisite
+        unit["deps"] = [_rel(model, root, dep) for dep in deps if model.abspath(dep) != model.abspath(source)]
+    unit["depfile_stat"] = stat_key
+    return unit
+
+
+def build_graph(model, root, previous=None):
+    """Return the graph dict, reusing dependencies of unchanged .d files from previous."""
+    old_units = {unit["source"]: unit for unit in (previous or {}).get("units", ())}
+    units = []
+    for sources, kind in ((model.sources, "c"), (model.asm_sources, "asm")):
+        for source in sources:
+            units.append(_unit(model, root, source, kind, old_units.get(_rel(model, root, source))))
+    return {
+        "version": GRAPH_VERSION,
+        "root": root.replace("\\", "/"),
+        "device": model.device,
+        "dfp": model.dfp,
+        "cc": model.cc,
+        "cflags": list(model.cflags),
+        "asflags": list(model.asflags),
+        "ldflags": list(model.ldflags),
+        "include_dirs": [_rel(model, root, d) for d in model.include_dirs()],
+        "linker_script": model.linker_script,
+        "output": _rel(model, root, model.output) if model.output else "",
+        "units": units,
+    }
+
+
+def _load_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) and data.get("version") == GRAPH_VERSION else None
+
+
+def load_build_graph(project_root, config=DEFAULT_CONFIG, device=None):
+    """Load the exported graph, from the MessagePack copy when possible; None if missing."""
+    json_path = os.path.join(config_root(project_root, config, device), GRAPH_JSON)
+    msgpack_path = os.path.join(config_root(project_root, config, device), GRAPH_MSGPACK)
+    if msgpack is not None:
+        try:
+            if os.stat(msgpack_path).st_mtime_ns >= os.stat(json_path).st_mtime_ns:
+                with open(msgpack_path, "rb") as f:
+                    data = msgpack.unpackb(f.read())
+                if isinstance(data, dict) and data.get("version") == GRAPH_VERSION:
+                    return data
+        except (OSError, ValueError):
+            pass
+    return _load_json(json_path)
+
+
+def update_build_graph(project_root, config=DEFAULT_CONFIG, device=None):
+    """Re-export the graph of a configuration; returns True when the content changed."""
+    root = os.path.abspath(project_root)
+    model = load_build_model(root, config, device)
+    json_path = os.path.join(config_root(root, config, device), GRAPH_JSON)
+    graph = build_graph(model, root, _load_json(json_path))
+    changed = write_if_changed(json_path, json.dumps(graph, indent=1) + "\n")
+    if msgpack is not None:
+        msgpack_path = os.path.join(config_root(root, config, device), GRAPH_MSGPACK)
+        if changed or not os.path.exists(msgpack_path):
+            tmp_path = msgpack_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(msgpack.packb(graph))
+            os.replace(tmp_path, msgpack_path)
+        else:
+            os.utime(msgpack_path)
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export the resolved build graph of a project as JSON (and MessagePack)")
+    parser.add_argument("project", nargs="?", default=".",
+                        help="Project root (default: current directory)")
+    parser.add_argument("--config", default=DEFAULT_CONFIG,
+                        help="Build configuration (default: default)")
+    parser.add_argument("--device", help="Device of a matrix build (MATRIX=1)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print errors")
+    args = parser.parse_args()
+
+    try:
+        changed = update_build_graph(args.project, args.config, args.device)
+    except (OSError, BuildModelError) as ex:
+        print(f"Error exporting build graph: {ex}")
+        sys.exit(1)
+    if not args.quiet:
+        print(f"{GRAPH_JSON} {'updated' if changed else 'is up to date'}"
+              + ("" if msgpack is not None else " (install msgpack for a MessagePack copy)"))
+
+
+if __name__ == "__main__":
+    main()
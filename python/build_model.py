@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Build Model
+Reads the build variables srcs/Makefile dumps to other/build_vars.txt (the
+compiler, the exact compile and assemble flags and every source file), so
+Python tools see the same build make runs instead of re-deriving it.
+Named build configurations keep theirs in build/<name>/other/, matrix builds
+in build/<name>/<device>/other/.
+"""
+
+import os
+import shlex
+from dataclasses import dataclass
+
+BUILD_VARS_FILE = os.path.join("other", "build_vars.txt")
+BUILD_VARS_VERSION = "1"
+# "make CONFIG=<name>" builds into build/<name>/; the default keeps the root
+DEFAULT_CONFIG = "default"
+
+
+class BuildModelError(Exception):
+    """Raised when the build variables file is missing or malformed."""
+
+
+def split_flags(text):
+    """Split a make flag string the way the shell would."""
+    return tuple(shlex.split(text, posix=True))
+
+
+@dataclass(frozen=True)
+class BuildModel:
+    """Compiler invocation details for one project, relative to directory."""
+    directory: str
+    device: str
+    dfp: str
+    cc: str
+    cflags: tuple
+    asflags: tuple
+    src_dir: str
+    obj_dir: str
+    sources: tuple = ()
+    asm_sources: tuple = ()
+    linker_script: str = ""
+    ldflags: tuple = ()
+    output: str = ""
+
+    def object_for(self, source):
+        """Object path make builds source into, relative to directory."""
+        rel = os.path.relpath(os.path.join(self.directory, source),
+                              os.path.join(self.directory, self.src_dir))
+        return os.path.join(self.obj_dir, os.path.splitext(rel)[0] + ".o").replace("\\", "/")
+
+    def compile_args(self, source):
+        """Full argument list make uses to compile a C source."""
+        obj = self.object_for(source)
+        return [self.cc, *self.cflags, "-MF", obj[:-2] + ".d", source, "-o", obj]
+
+    def assemble_args(self, source):
+        return [self.cc, *self.asflags, "-o", self.object_for(source), source]
+
+    def include_dirs(self):
+        """-I folders in search order, relative to directory."""
+        dirs = []
+        for index, flag in enumerate(self.cflags):
+            if flag == "-I" and index + 1 < len(self.cflags):
+                dirs.append(self.cflags[index + 1])
+            elif flag.startswith("-I"):
+                dirs.append(flag[2:])
+        return dirs
+
+    def abspath(self, path):
+        return os.path.normpath(os.path.join(self.directory, path))
+
+
+def parse_build_vars(text, directory):
+    """Build a BuildModel from the KEY=value lines of a build_vars.txt."""
+    values = {}
+    sources, asm_sources = [], []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or "=" not in line:
+            continue
+        key, value = line.split("=", 1)
+        if key == "SRC":
+            sources.append(value)
+        elif key == "ASM":
+            asm_sources.append(value)
+        else:
+            values[key] = value
+    if values.get("VERSION") != BUILD_VARS_VERSION:
+        raise BuildModelError(f"Unsupported build_vars version {values.get('VERSION')!r}")
+    try:
+        cc = split_flags(values["CC"])
+        return BuildModel(directory=directory, device=values["DEVICE"], dfp=values["DFP"],
+                          cc=cc[0] if cc else "", cflags=split_flags(values["CFLAGS"]),
+                          asflags=split_flags(values["ASFLAGS"]),
+                          src_dir=values["SRC_DIR"], obj_dir=values["OBJ_DIR"],
+                          sources=tuple(sources), asm_sources=tuple(asm_sources),
+                          linker_script=values.get("LINKER_SCRIPT", ""),
+                          ldflags=split_flags(values.get("LDFLAGS", "")),
+                          output=values.get("OUTPUT", ""))
+    except (KeyError, ValueError) as ex:
+        raise BuildModelError(f"Malformed build_vars: {ex}")
+
+
+def parse_depfile(path):
+    """Prerequisites of the first rule in a make .d file, or None if unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            text = f.read().replace("\\\n", " ")
+    except OSError:
+        return None
+    rule = text.split("\n", 1)[0]
+    _target, sep, prerequisites = rule.partition(": ")
+    if not sep:
+        _target, sep, prerequisites = rule.partition(":")
+    return prerequisites.split() if sep else None
+
+
+def config_root(project_root, config=DEFAULT_CONFIG, device=None):
+    """Folder holding objs/, bins/ and other/ of a build configuration.
+
+    Matrix builds (MATRIX=1) add a folder per device below the configuration.
+    """
+    if device:
+        return os.path.join(project_root, "build", config, device)
+    if config == DEFAULT_CONFIG:
+        return project_root
+    return os.path.join(project_root, "build", config)
+
+
+def load_build_model(project_root, config=DEFAULT_CONFIG, device=None):
+    """Load the build model of a project configuration built at least once."""
+    path = os.path.join(config_root(project_root, config, device), BUILD_VARS_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+    except OSError:
+        hint = "" if config == DEFAULT_CONFIG else f" CONFIG={config}"
+        hint += f" DEVICE={device} MATRIX=1" if device else ""
+        raise BuildModelError(f"No {os.path.relpath(path, project_root)} in {project_root}; "
+                              f"run make{hint} first")
+    # Paths in the dump are relative to srcs/, where make runs
+    return parse_build_vars(text, os.path.join(os.path.abspath(project_root), "srcs"))
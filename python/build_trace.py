@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Build Trace
+Turns the step log written by the Makefiles with TRACE=1 into a Chrome /
+Perfetto trace-event JSON and a summary of the slowest translation units,
+the critical path and how busy the cores were.
+
+Each log line is tab separated: kind, target, start, end, exit status, with
+times in seconds since the epoch. The Makefiles take the timestamps from
+bash's $EPOCHREALTIME, so recording spawns no extra processes.
+"""
+
+import os
+import sys
+import json
+import argparse
+from dataclasses import dataclass
+
+# Build stages in dependency order; every step of a stage waits for the previous one
+STAGES = (("pch",), ("compile", "assemble"), ("link",), ("bin2hex",), ("validate",))
+DEFAULT_TOP = 10
+
+
+@dataclass(frozen=True)
+class Step:
+    kind: str
+    target: str
+    start: float
+    end: float
+    status: int = 0
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+
+def parse_log(path):
+    """Return the steps in a trace log, skipping lines that are incomplete."""
+    steps = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) != 5:
+                continue
+            kind, target, start, end, status = fields
+            try:
+                steps.append(Step(kind, target, float(start.replace(",", ".")),
+                                  float(end.replace(",", ".")), int(status)))
+            except ValueError:
+                continue
+    return sorted(steps, key=lambda step: (step.start, step.end))
+
+
+def assign_lanes(steps):
+    """Give each step the lowest lane free at its start; returns a list of lanes."""
+    free_at = []
+    lanes = []
+    for step in steps:
+        for lane, end in enumerate(free_at):
+            if end <= step.start:
+                free_at[lane] = step.end
+                lanes.append(lane)
+                break
+        else:
+            free_at.append(step.end)
+            lanes.append(len(free_at) - 1)
+    return lanes
+
+
+def chrome_trace(steps, lanes=None):
+    """Trace-event JSON (ph "X" complete events) for chrome://tracing or Perfetto."""
+    lanes = lanes if lanes is not None else assign_lanes(steps)
+    origin = steps[0].start if steps else 0.0
+    events = [{"name": "process_name", "ph": "M", "pid": 1,
+               "args": {"name": "PIC32MZ build"}}]
+    for lane in sorted(set(lanes)):
+        events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": lane,
+                       "args": {"name": f"job {lane}"}})
+    for step, lane in zip(steps, lanes):
+        events.append({
+            "name": os.path.basename(step.target),
+            "cat": step.kind,
+            "ph": "X",
+            "ts": round((step.start - origin) * 1e6),
+            "dur": round(step.duration * 1e6),
+            "pid": 1,
+            "tid": lane,
+            "args": {"target": step.target, "status": step.status},
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def critical_path(steps):
+    """Longest step of each stage, chained in stage order.
+
+    Make only lets a stage start once everything before it finished, so
+    the slowest step of each stage bounds the build at any -j.
+    """
+    path = []
+    for stage in STAGES:
+        in_stage = [step for step in steps if step.kind in stage]
+        if in_stage:
+            path.append(max(in_stage, key=lambda step: step.duration))
+    return path
+
+
+def summarize(steps, top=DEFAULT_TOP, cores=None):
+    """Return the summary dict for a list of steps."""
+    if not steps:
+        return {"steps": 0}
+    cores = cores or os.cpu_count() or 1
+    wall = max(step.end for step in steps) - min(step.start for step in steps)
+    busy = sum(step.duration for step in steps)
+    lanes = assign_lanes(steps)
+    path = critical_path(steps)
+    by_kind = {}
+    for step in steps:
+        entry = by_kind.setdefault(step.kind, {"count": 0, "seconds": 0.0})
+        entry["count"] += 1
+        entry["seconds"] += step.duration
+    units = [step for step in steps if step.kind in ("compile", "assemble")]
+    slowest = sorted(units, key=lambda step: step.duration, reverse=True)[:top]
+    return {
+        "steps": len(steps),
+        "failed": [step.target for step in steps if step.status != 0],
+        "wall_s": wall,
+        "busy_s": busy,
+        "peak_parallelism": max(lanes) + 1,
+        "average_parallelism": busy / wall if wall > 0 else 1.0,
+        "cores": cores,
+        "core_utilization": busy / (wall * cores) if wall > 0 else 1.0,
+        "by_kind": by_kind,
+        "slowest": [{"target": step.target, "seconds": step.duration} for step in slowest],
+        "critical_path": [{"kind": step.kind, "target": step.target,
+                           "seconds": step.duration} for step in path],
+        "critical_path_s": sum(step.duration for step in path),
+    }
+
+
+def print_summary(summary):
+    if not summary.get("steps"):
+        print("No build steps recorded")
+        return
+    print(f"{summary['steps']} steps in {summary['wall_s']:.2f} s wall, "
+          f"{summary['busy_s']:.2f} s busy")
+    print(f"Parallelism: average {summary['average_parallelism']:.1f}, "
+          f"peak {summary['peak_parallelism']}, "
+          f"{summary['core_utilization'] * 100:.0f}% of {summary['cores']} cores")
+    for kind, entry in sorted(summary["by_kind"].items()):
+        print(f"  {kind:<9} {entry['count']:6d} steps {entry['seconds']:8.2f} s")
+    print("Slowest translation units:")
+    for item in summary["slowest"]:
+        print(f"  {item['seconds'] * 1000.0:8.1f} ms  {item['target']}")
+    print(f"Critical path ({summary['critical_path_s']:.2f} s):")
+    for item in summary["critical_path"]:
+        print(f"  {item['kind']:<9} {item['seconds'] * 1000.0:8.1f} ms  {item['target']}")
+    if summary["failed"]:
+        print(f"✗ {len(summary['failed'])} step(s) failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert a TRACE=1 build log into a Chrome trace and a summary")
+    parser.add_argument("log", help="Step log written by the Makefiles (other/build_trace.log)")
+    parser.add_argument("-o", "--output", help="Trace JSON to write (default: LOG with .json)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP,
+                        help="Slowest translation units to list (default: 10)")
+    parser.add_argument("--cores", type=int, default=None,
+                        help="Cores to measure utilization against (default: CPU count)")
+    parser.add_argument("--summary-json", help="Also write the summary as JSON")
+    args = parser.parse_args()
+
+    try:
+        steps = parse_log(args.log)
+    except OSError as ex:
+        print(f"Error reading build trace: {ex}")
+        sys.exit(1)
+
+    output = args.output or os.path.splitext(args.log)[0] + ".json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(chrome_trace(steps), f)
+    summary = summarize(steps, args.top, args.cores)
+    if args.summary_json:
+        with open(args.summary_json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    print_summary(summary)
+    print(f"Trace written to {output} (open in ui.perfetto.dev or chrome://tracing)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Compile Database
+Writes compile_commands.json at the project root from the exact flags make
+uses, for clangd and the VS Code C/C++ extension. Existing entries are kept
+as they are unless their command changed, and the file is only replaced
+(atomically) when something did change, so language servers do not
+re-index the project after every build.
+"""
+
+import os
+import sys
+import json
+import argparse
+
+from build_model import BuildModelError, load_build_model
+
+COMPILE_DB_FILE = "compile_commands.json"
+
+
+def build_entries(model):
+    """Return one compile_commands entry per C and assembly source."""
+    entries = []
+    for source in model.sources:
+        entries.append({"directory": model.directory,
+                        "arguments": model.compile_args(source),
+                        "file": model.abspath(source),
+                        "output": model.abspath(model.object_for(source))})
+    for source in model.asm_sources:
+        entries.append({"directory": model.directory,
+                        "arguments": model.assemble_args(source),
+                        "file": model.abspath(source),
+                        "output": model.abspath(model.object_for(source))})
+    return entries
+
+
+def load_entries(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return []
+    return entries if isinstance(entries, list) else []
+
+
+def merge_entries(old, new):
+    """Keep the old entry object for unchanged files, in the old order.
+
+    Returns (entries, counts) where counts has added, changed, removed and
+    unchanged totals.
+    """
+    new_by_file = {entry["file"]: entry for entry in new}
+    counts = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0}
+    merged = []
+    seen = set()
+    for entry in old:
+        current = new_by_file.get(entry.get("file"))
+        if current is None:
+            counts["removed"] += 1
+            continue
+        seen.add(entry["file"])
+        if current == entry:
+            counts["unchanged"] += 1
+            merged.append(entry)
+        else:
+            counts["changed"] += 1
+            merged.append(current)
+    for entry in new:
+        if entry["file"] not in seen:
+            counts["added"] += 1
+            merged.append(entry)
+    return merged, counts
+
+
+def write_atomic(path, text):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def update_compile_db(project_root, output=None):
+    """Bring compile_commands.json up to date; returns the change counts."""
+    model = load_build_model(project_root)
+    output = output or os.path.join(project_root, COMPILE_DB_FILE)
+    old = load_entries(output)
+    merged, counts = merge_entries(old, build_entries(model))
+    counts["written"] = merged != old or not os.path.exists(output)
+    if counts["written"]:
+        write_atomic(output, json.dumps(merged, indent=2) + "\n")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Update compile_commands.json from the flags make uses")
+    parser.add_argument("project", nargs="?", default=".",
+                        help="Project root (default: current directory)")
+    parser.add_argument("-o", "--output", help="Where to write (default: PROJECT/compile_commands.json)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print errors")
+    args = parser.parse_args()
+
+    try:
+        counts = update_compile_db(args.project, args.output)
+    except (OSError, BuildModelError) as ex:
+        print(f"Error updating {COMPILE_DB_FILE}: {ex}")
+        sys.exit(1)
+
+    if not args.quiet:
+        if counts["written"]:
+            print(f"Updated {COMPILE_DB_FILE}: {counts['added']} added, "
+                  f"{counts['changed']} changed, {counts['removed']} removed")
+        else:
+            print(f"{COMPILE_DB_FILE} is up to date ({counts['unchanged']} entries)")
+
+
+if __name__ == "__main__":
+    main()
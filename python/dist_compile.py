@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Distributed Compile
+Compiles out-of-date C objects of a project on a pool of workers. Each
+translation unit is preprocessed locally (so workers need neither the
+project headers nor the DFP include tree), sent with its compile flags to
+the worker with the shortest queue, and the object is written as soon as it
+comes back. `make all DIST=1` runs this before the srcs make, which then
+only links; make still checks every object, so anything left over is
+compiled locally as usual.
+
+Workers are started with `dist_compile.py worker` on each build host (same
+xc32 version as the coordinator) or with --local N on this machine, which
+goes through the same socket protocol and needs no network. A worker runs
+the compiler on whatever it receives: only listen on trusted networks.
+
+Protocol: every frame is a 4-byte big-endian header length, a JSON header
+and "size" bytes of payload (zlib compressed when "zlib" is set).
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import queue
+import shutil
+import socket
+import struct
+import argparse
+import tempfile
+import threading
+import subprocess
+import socketserver
+from collections import deque
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+
+from build_model import BuildModelError, DEFAULT_CONFIG, load_build_model, parse_depfile
+
+PROTOCOL_VERSION = 1
+DEFAULT_PORT = 3633
+ALLOWED_COMPILERS = ("xc32-gcc", "xc32-g++")
+# Jobs sent ahead of a worker's free slots, so it never waits on the network
+PIPELINE_DEPTH = 2
+CONNECT_TIMEOUT = 5.0
+
+# Flags consumed by the local preprocessor; the ones in _FLAGS_WITH_VALUE
+# take the next argument when not written joined (-Ifoo vs -I foo)
+_PREPROCESSOR_FLAGS = ("-I", "-D", "-U", "-include", "-imacros", "-isystem",
+                       "-iquote", "-idirafter", "-MF", "-MT", "-MQ", "-MMD", "-MD", "-MP",
+                       "-Winvalid-pch", "-c")
+_FLAGS_WITH_VALUE = ("-I", "-D", "-U", "-include", "-imacros", "-isystem",
+                     "-iquote", "-idirafter", "-MF", "-MT", "-MQ")
+
+
+class DistError(Exception):
+    """Raised for protocol errors and workers that cannot be reached."""
+
+
+def send_frame(sock, header, payload=b""):
+    head = json.dumps(dict(header, size=len(payload))).encode("utf-8")
+    sock.sendall(struct.pack("!I", len(head)) + head)
+    if payload:
+        sock.sendall(payload)
+
+
+def _read_exact(rfile, size):
+    data = rfile.read(size)
+    if len(data) != size:
+        raise EOFError("connection closed")
+    return data
+
+
+def recv_frame(rfile):
+    """Return (header, payload), or (None, None) at a clean end of stream."""
+    prefix = rfile.read(4)
+    if not prefix:
+        return None, None
+    if len(prefix) != 4:
+        raise EOFError("connection closed")
+    header = json.loads(_read_exact(rfile, struct.unpack("!I", prefix)[0]))
+    return header, _read_exact(rfile, header.get("size", 0))
+
+
+def compile_flags(cflags):
+    """cflags without the preprocessor-only flags the worker must not see."""
+    flags = []
+    skip = False
+    for flag in cflags:
+        if skip:
+            skip = False
+        elif flag in _FLAGS_WITH_VALUE:
+            skip = True
+        elif not flag.startswith(_PREPROCESSOR_FLAGS):
+            flags.append(flag)
+    return flags
+
+
+# -- worker -------------------------------------------------------------------
+
+class CompileWorker:
+    """Runs compile requests on a fixed number of slots."""
+
+    def __init__(self, slots, compiler_dir=None):
+        self.slots = slots
+        self.compiler_dir = compiler_dir
+        self.pool = ThreadPoolExecutor(slots)
+        self.lock = threading.Lock()
+        self.queued = 0
+
+    def compiler(self, requested):
+        name = os.path.basename(requested)
+        if os.path.splitext(name)[0] not in ALLOWED_COMPILERS:
+            raise DistError(f"compiler {name} is not allowed")
+        if self.compiler_dir:
+            return os.path.join(self.compiler_dir, name)
+        return requested if os.path.isfile(requested) else (shutil.which(name) or name)
+
+    def submit(self, header, payload, reply):
+        with self.lock:
+            self.queued += 1
+        self.pool.submit(self._run, header, payload, reply)
+
+    def _run(self, header, payload, reply):
+        try:
+            response, obj = self.compile(header, payload)
+        except Exception as ex:  # reported to the coordinator, never fatal here
+            response, obj = {"status": -1, "stderr": f"worker error: {ex}"}, b""
+        with self.lock:
+            self.queued -= 1
+            response.update(op="result", id=header["id"], queued=self.queued)
+        reply(response, obj)
+
+    def compile(self, header, payload):
+        source = zlib.decompress(payload) if header.get("zlib") else payload
+        with tempfile.TemporaryDirectory(prefix="dist_compile_") as tmp:
+            name = os.path.splitext(os.path.basename(header["name"]))[0] or "unit"
+            i_path = os.path.join(tmp, name + ".i")
+            o_path = os.path.join(tmp, name + ".o")
+            with open(i_path, "wb") as f:
+                f.write(source)
+            started = time.monotonic()
+            result = subprocess.run([self.compiler(header["cc"]), *header["flags"],
+                                     "-c", i_path, "-o", o_path],
+                                    stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            response = {"status": result.returncode,
+                        "stderr": result.stdout.decode("utf-8", "replace"),
+                        "seconds": time.monotonic() - started}
+            obj = b""
+            if result.returncode == 0:
+                with open(o_path, "rb") as f:
+                    obj = zlib.compress(f.read(), 1)
+                response["zlib"] = True
+            return response, obj
+
+
+class _WorkerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        worker = self.server.worker
+        write_lock = threading.Lock()
+
+        def reply(header, payload=b""):
+            with write_lock:
+                try:
+                    send_frame(self.connection, header, payload)
+                except OSError:
+                    pass  # coordinator went away; its jobs are requeued there
+
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        while True:
+            try:
+                header, payload = recv_frame(self.rfile)
+            except (OSError, EOFError, ValueError):
+                return
+            if header is None:
+                return
+            if header.get("op") == "hello":
+                with worker.lock:
+                    queued = worker.queued
+                reply({"op": "hello", "version": PROTOCOL_VERSION,
+                       "slots": worker.slots, "queued": queued})
+            elif header.get("op") == "compile":
+                worker.submit(header, payload, reply)
+            else:
+                reply({"op": "error", "stderr": f"unknown op {header.get('op')!r}"})
+                return
+
+
+class WorkerServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, worker):
+        super().__init__(address, _WorkerHandler)
+        self.worker = worker
+
+
+def parse_address(text, default_host="127.0.0.1"):
+    host, _, port = text.rpartition(":")
+    return (host or default_host), int(port or DEFAULT_PORT)
+
+
+def start_local_workers(count, slots):
+    """Start count worker processes on localhost; returns (processes, addresses)."""
+    processes, addresses = [], []
+    try:
+        for _ in range(count):
+            process = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "worker",
+                 "--listen", "127.0.0.1:0", "--slots", str(slots), "--announce"],
+                stdout=subprocess.PIPE, text=True)
+            processes.append(process)
+        for process in processes:
+            line = process.stdout.readline().split()
+            if len(line) != 2 or line[0] != "listening":
+                raise DistError("local worker failed to start")
+            addresses.append(parse_address(line[1]))
+    except Exception:
+        stop_local_workers(processes)
+        raise
+    return processes, addresses
+
+
+def stop_local_workers(processes):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+# -- coordinator --------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Job:
+    source: str
+    obj: str
+
+    @property
+    def depfile(self):
+        return self.obj[:-2] + ".d"
+
+
+class WorkerLink:
+    """Coordinator side of one worker connection."""
+
+    def __init__(self, address, events):
+        self.address = address
+        self.name = f"{address[0]}:{address[1]}"
+        self.sock = socket.create_connection(address, timeout=CONNECT_TIMEOUT)
+        self.sock.settimeout(None)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.rfile = self.sock.makefile("rb")
+        send_frame(self.sock, {"op": "hello", "version": PROTOCOL_VERSION})
+        header, _payload = recv_frame(self.rfile)
+        if not header or header.get("version") != PROTOCOL_VERSION:
+            raise DistError(f"{self.name} speaks an unsupported protocol")
+        self.slots = max(1, int(header["slots"]))
+        self.reported = int(header.get("queued", 0))
+        self.in_flight = {}
+        self.completed = 0
+        self.alive = True
+        self.events = events
+        threading.Thread(target=self._receive, daemon=True).start()
+
+    def depth(self):
+        """Queue depth per slot; the worker's own count also covers other coordinators."""
+        return max(len(self.in_flight), self.reported) / self.slots
+
+    def has_room(self):
+        return self.alive and len(self.in_flight) < self.slots * PIPELINE_DEPTH
+
+    def send(self, job_id, job, header, payload):
+        self.in_flight[job_id] = (job, payload, time.time())
+        send_frame(self.sock, dict(header, op="compile", id=job_id), payload)
+
+    def _receive(self):
+        try:
+            while True:
+                header, payload = recv_frame(self.rfile)
+                if header is None:
+                    break
+                self.events.put(("result", self, header, payload))
+        except (OSError, EOFError, ValueError):
+            pass
+        self.events.put(("lost", self, None, None))
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def out_of_date(model):
+    """C sources whose object is missing or older than the source or a header in its .d."""
+    previous = os.getcwd()
+    os.chdir(model.directory)
+    mtimes = {}
+
+    def mtime(path):
+        if path not in mtimes:
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                mtimes[path] = None
+        return mtimes[path]
+
+    try:
+        stale = []
+        for source in model.sources:
+            job = Job(source, model.object_for(source))
+            built = mtime(job.obj)
+            deps = parse_depfile(job.depfile) if built is not None else None
+            if deps is None:
+                stale.append(job)
+                continue
+            for dep in [source, *deps]:
+                changed = mtime(dep)
+                if changed is None or changed > built:
+                    stale.append(job)
+                    break
+        return stale
+    finally:
+        os.chdir(previous)
+
+
+def preprocess(model, job):
+    """Run the preprocessor locally; writes the .d next to the object, returns .i bytes."""
+    os.makedirs(os.path.dirname(job.obj) or ".", exist_ok=True)
+    args = [model.cc, *[flag for flag in model.cflags if flag != "-c"], "-E",
+            "-MF", job.depfile + ".tmp", "-MT", job.obj, job.source]
+    result = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise DistError(result.stderr.decode("utf-8", "replace").strip()
+                        or f"preprocessing {job.source} failed")
+    return result.stdout
+
+
+def _write_atomic(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def distribute(model, jobs, addresses, local_jobs=None, trace_log=None, log=print):
+    """Compile jobs on the workers at addresses.
+
+    Returns (compiled, failed, left): objects written, jobs whose compile
+    failed and jobs no worker could take (make compiles those itself).
+    """
+    events = queue.Queue()
+    links = []
+    for address in addresses:
+        try:
+            links.append(WorkerLink(address, events))
+        except (OSError, DistError, EOFError, ValueError) as ex:
+            log(f"  worker {address[0]}:{address[1]} unavailable: {ex}")
+    if not links:
+        return 0, [], list(jobs)
+
+    flags = compile_flags(model.cflags)
+    pending = deque()
+    finished = set()
+    failed = []
+    compiled = 0
+    trace = []
+    previous = os.getcwd()
+    os.chdir(model.directory)
+    pool = ThreadPoolExecutor(local_jobs or os.cpu_count() or 1)
+    try:
+        for job in jobs:
+            future = pool.submit(preprocess, model, job)
+            future.add_done_callback(lambda f, job=job: events.put(("ready", None, job, f)))
+
+        next_id = 0
+        while len(finished) < len(jobs):
+            kind, link, first, second = events.get()
+            if kind == "ready":
+                job, future = first, second
+                try:
+                    pending.append((job, zlib.compress(future.result(), 1)))
+                except (OSError, DistError) as ex:
+                    log(f"✗ {job.source}: {ex}")
+                    failed.append(job)
+                    finished.add(job)
+            elif kind == "result":
+                header = first
+                job, payload, started = link.in_flight.pop(header["id"])
+                link.reported = int(header.get("queued", 0))
+                link.completed += 1
+                finished.add(job)
+                output = header.get("stderr", "").strip()
+                if header.get("status") == 0:
+                    obj = zlib.decompress(second) if header.get("zlib") else second
+                    os.replace(job.depfile + ".tmp", job.depfile)
+                    _write_atomic(job.obj, obj)
+                    compiled += 1
+                    if output:
+                        log(f"{job.source}:\n{output}")
+                else:
+                    log(f"✗ {job.source} ({link.name}):\n{output}")
+                    failed.append(job)
+                trace.append((job.obj, started, time.time(), header.get("status", -1)))
+            elif kind == "lost" and link.alive:
+                link.alive = False
+                if link.in_flight:
+                    log(f"  worker {link.name} lost, requeueing {len(link.in_flight)} job(s)")
+                for job, payload, _started in link.in_flight.values():
+                    pending.appendleft((job, payload))
+                link.in_flight.clear()
+            if not any(l.alive for l in links):
+                break
+            while pending:
+                ready = [l for l in links if l.has_room()]
+                if not ready:
+                    break
+                target = min(ready, key=WorkerLink.depth)
+                job, payload = pending.popleft()
+                try:
+                    target.send(next_id, job, {"cc": model.cc, "flags": flags,
+                                               "name": job.source, "zlib": True}, payload)
+                except OSError:
+                    # The receiver thread reports the link as lost
+                    target.in_flight.pop(next_id, None)
+                    pending.appendleft((job, payload))
+                    target.alive = False
+                next_id += 1
+    finally:
+        pool.shutdown(wait=True)
+        for link in links:
+            link.close()
+        left = [job for job in jobs if job not in finished]
+        for job in left + failed:
+            try:
+                os.remove(job.depfile + ".tmp")
+            except OSError:
+                pass
+        os.chdir(previous)
+
+    if trace_log and trace:
+        with open(trace_log, "a", encoding="utf-8") as f:
+            for obj, start, end, status in trace:
+                f.write(f"compile\t{obj}\t{start:.6f}\t{end:.6f}\t{status}\n")
+    for link in links:
+        log(f"  {link.name:<21} {link.completed:6d} objects ({link.slots} slot(s))")
+    return compiled, failed, left
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compile out-of-date C objects of a project on a worker pool")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("build", help="Compile the project's stale objects on the workers")
+    p.add_argument("project", nargs="?", default=".", help="Project root (default: .)")
+    p.add_argument("-w", "--workers", default="",
+                   help="Comma separated host:port workers")
+    p.add_argument("-l", "--local", type=int, default=None,
+                   help="Local worker processes to start (default: CPU count without --workers)")
+    p.add_argument("--local-slots", type=int, default=1, help="Slots per local worker (default: 1)")
+    p.add_argument("-j", "--jobs", type=int, default=None,
+                   help="Parallel local preprocessors (default: CPU count)")
+    p.add_argument("--config", default=DEFAULT_CONFIG,
+                   help="Build configuration (default: default)")
+    p.add_argument("--device", help="Device of a matrix build (MATRIX=1)")
+    p.add_argument("--trace-log", help="Append compile steps to a TRACE=1 build log")
+
+    p = sub.add_parser("worker", help="Serve compile requests")
+    p.add_argument("--listen", default=f"127.0.0.1:{DEFAULT_PORT}",
+                   help=f"host:port to listen on (default: 127.0.0.1:{DEFAULT_PORT})")
+    p.add_argument("-s", "--slots", type=int, default=os.cpu_count() or 1,
+                   help="Concurrent compiles (default: CPU count)")
+    p.add_argument("--compiler-dir", help="xc32 bin folder on this host (default: as requested)")
+    p.add_argument("--announce", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        try:
+            server = WorkerServer(parse_address(args.listen),
+                                  CompileWorker(args.slots, args.compiler_dir))
+        except (OSError, ValueError) as ex:
+            print(f"Error starting worker: {ex}")
+            sys.exit(1)
+        host, port = server.server_address[:2]
+        print(f"listening {host}:{port}" if args.announce
+              else f"Worker listening on {host}:{port} with {args.slots} slot(s)", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    try:
+        model = load_build_model(args.project, args.config, args.device)
+        jobs = out_of_date(model)
+    except (OSError, BuildModelError) as ex:
+        print(f"Error loading build: {ex}")
+        sys.exit(1)
+    if not jobs:
+        print("Distributed compile: all objects up to date")
+        return
+
+    addresses = [parse_address(w.strip()) for w in args.workers.split(",") if w.strip()]
+    local = args.local if args.local is not None else (0 if addresses else os.cpu_count() or 1)
+    processes = []
+    started = time.monotonic()
+    try:
+        if local:
+            processes, local_addresses = start_local_workers(local, args.local_slots)
+            addresses += local_addresses
+        compiled, failed, left = distribute(model, jobs, addresses, args.jobs, args.trace_log)
+    except (OSError, DistError) as ex:
+        print(f"Error in distributed compile: {ex}")
+        sys.exit(1)
+    finally:
+        stop_local_workers(processes)
+
+    print(f"Distributed compile: {compiled}/{len(jobs)} objects in "
+          f"{time.monotonic() - started:.2f} s on {len(addresses)} worker(s)")
+    if left:
+        print(f"  {len(left)} object(s) left for make to compile locally")
+    if failed:
+        print(f"✗ {len(failed)} object(s) failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Fake PIC32MZ Bootloader Endpoint
+Simulates a page-erase/row-write bootloader over localhost TCP so the flash
+engine can be exercised without a board attached
+"""
+
+import sys
+import json
+import time
+import base64
+import socket
+import argparse
+import threading
+import socketserver
+
+from flash_image import FlashError, FlashTransport, DEFAULT_PAGE_SIZE, ERASED_BYTE
+
+# PIC32MZ EF programs flash one 2 KB row at a time
+DEFAULT_ROW_SIZE = 0x800
+
+
+class FakeFlash:
+    """In-memory flash array with simple erase/program timing."""
+
+    def __init__(self, page_size=DEFAULT_PAGE_SIZE, row_size=DEFAULT_ROW_SIZE,
+                 erase_ms=0.0, row_ms=0.0):
+        self.page_size = page_size
+        self.row_size = row_size
+        self.erase_ms = erase_ms
+        self.row_ms = row_ms
+        self.pages = {}
+        self.stats = {"erases": 0, "rows": 0, "bytes": 0, "resets": 0}
+        self.lock = threading.Lock()
+
+    def erase(self, address):
+        if address % self.page_size:
+            raise ValueError(f"Erase address 0x{address:08X} is not page aligned")
+        time.sleep(self.erase_ms / 1000.0)
+        with self.lock:
+            self.pages[address] = bytearray([ERASED_BYTE]) * self.page_size
+            self.stats["erases"] += 1
+
+    def write_row(self, address, data):
+        if address % self.row_size or len(data) > self.row_size:
+            raise ValueError(f"Row write at 0x{address:08X} is not row aligned")
+        page_addr = address - (address % self.page_size)
+        time.sleep(self.row_ms / 1000.0)
+        with self.lock:
+            page = self.pages.get(page_addr)
+            if page is None:
+                raise ValueError(f"Page 0x{page_addr:08X} written before erase")
+            start = address - page_addr
+            # Flash can only clear bits until the page is erased again
+            for i, value in enumerate(data):
+                page[start + i] &= value
+            self.stats["rows"] += 1
+            self.stats["bytes"] += len(data)
+
+    def read(self, address, length):
+        page_addr = address - (address % self.page_size)
+        with self.lock:
+            page = self.pages.get(page_addr)
+            if page is None:
+                return bytes([ERASED_BYTE]) * length
+            start = address - page_addr
+            return bytes(page[start:start + length])
+
+
+def _int_field(request, name):
+    value = request[name]
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(f"{name} must be an integer, got {value!r}")
+    return value
+
+
+class _BootloaderHandler(socketserver.StreamRequestHandler):
+    """One JSON request per line, one JSON reply per line."""
+
+    def handle(self):
+        flash = self.server.flash
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("Request must be a JSON object")
+                op = request.get("op")
+                if op == "info":
+                    reply = {"page_size": flash.page_size, "row_size": flash.row_size}
+                elif op == "erase":
+                    flash.erase(_int_field(request, "addr"))
+                    reply = {}
+                elif op == "write":
+                    flash.write_row(_int_field(request, "addr"), base64.b64decode(request["data"]))
+                    reply = {}
+                elif op == "read":
+                    data = flash.read(_int_field(request, "addr"), _int_field(request, "length"))
+                    reply = {"data": base64.b64encode(data).decode("ascii")}
+                elif op == "stats":
+                    reply = dict(flash.stats)
+                elif op == "reset":
+                    flash.stats["resets"] += 1
+                    reply = {}
+                else:
+                    raise ValueError(f"Unknown op: {op}")
+                reply["ok"] = True
+            except (KeyError, ValueError, TypeError) as ex:
+                reply = {"ok": False, "error": str(ex)}
+            self.wfile.write((json.dumps(reply) + "\n").encode("utf-8"))
+
+
+class FakeBootloader(socketserver.ThreadingTCPServer):
+    """TCP endpoint serving a FakeFlash. Use port 0 to pick a free port."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0, flash=None):
+        super().__init__((host, port), _BootloaderHandler)
+        self.flash = flash or FakeFlash()
+
+    @property
+    def endpoint(self):
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self):
+        """Serve from a background thread and return the endpoint string."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self.endpoint
+
+
+class FakeBootloaderTransport(FlashTransport):
+    """Flash transport speaking the fake bootloader protocol."""
+
+    name = "fake"
+
+    def __init__(self, endpoint="127.0.0.1:5151"):
+        self.endpoint = endpoint
+
+    def _call(self, stream, request):
+        stream.write((json.dumps(request) + "\n").encode("utf-8"))
+        stream.flush()
+        line = stream.readline()
+        if not line:
+            raise FlashError(f"Bootloader at {self.endpoint} closed the connection")
+        reply = json.loads(line)
+        if not isinstance(reply, dict) or not reply.get("ok"):
+            raise FlashError(f"Bootloader error: "
+                             f"{reply.get('error') if isinstance(reply, dict) else reply!r}")
+        return reply
+
+    def flash(self, image, full):
+        host, port = self.endpoint.rsplit(":", 1)
+        with socket.create_connection((host, int(port))) as sock:
+            stream = sock.makefile("rwb")
+            info = self._call(stream, {"op": "info"})
+            if info["page_size"] != image.page_size:
+                raise FlashError(
+                    f"Page size mismatch: image {image.page_size:#x}, "
+                    f"bootloader {info['page_size']:#x}")
+            row_size = info["row_size"]
+            for page_addr in sorted(image.pages):
+                page = image.pages[page_addr]
+                self._call(stream, {"op": "erase", "addr": page_addr})
+                for start in range(0, image.page_size, row_size):
+                    row = bytes(page[start:start + row_size])
+                    if row.count(ERASED_BYTE) == len(row):
+                        continue
+                    self._call(stream, {
+                        "op": "write",
+                        "addr": page_addr + start,
+                        "data": base64.b64encode(row).decode("ascii"),
+                    })
+            self._call(stream, {"op": "reset"})
+
+    def stats(self):
+        host, port = self.endpoint.rsplit(":", 1)
+        with socket.create_connection((host, int(port))) as sock:
+            return self._call(sock.makefile("rwb"), {"op": "stats"})
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fake PIC32MZ bootloader endpoint for flash testing")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("-p", "--port", type=int, default=5151,
+                        help="TCP port to listen on (default: 5151)")
+    parser.add_argument("--page-size", type=lambda v: int(v, 0), default=DEFAULT_PAGE_SIZE,
+                        help="Simulated flash page size (default: 0x4000)")
+    parser.add_argument("--erase-ms", type=float, default=20.0,
+                        help="Simulated page erase time in ms (default: 20)")
+    parser.add_argument("--row-ms", type=float, default=2.0,
+                        help="Simulated row program time in ms (default: 2)")
+    args = parser.parse_args()
+
+    flash = FakeFlash(args.page_size, erase_ms=args.erase_ms, row_ms=args.row_ms)
+    server = FakeBootloader(args.host, args.port, flash)
+    print(f"Fake bootloader listening on {server.endpoint}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping fake bootloader")
+        print(f"Stats: {flash.stats}")
+        server.server_close()
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Flash Image Engine
+Hashes a HEX image per flash page and flashes only the pages that changed
+since the last image loaded onto each board
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import importlib
+import subprocess
+import tempfile
+
+# PIC32MZ EF flash is erased in 16 KB pages
+DEFAULT_PAGE_SIZE = 0x4000
+ERASED_BYTE = 0xFF
+HEX_LINE_BYTES = 16
+
+
+class HexFormatError(Exception):
+    """Raised when an Intel HEX file cannot be parsed."""
+
+
+class FlashError(RuntimeError):
+    """Raised by a transport when the bootloader refuses or fails a request."""
+
+
+class FlashImage:
+    """Sparse flash image split into fixed size pages."""
+
+    def __init__(self, page_size=DEFAULT_PAGE_SIZE):
+        self.page_size = page_size
+        self.pages = {}
+        self.start_address = None
+
+    def write(self, address, data):
+        """Place data at address, spilling over page boundaries as needed."""
+        offset = 0
+        while offset < len(data):
+            page_addr = (address + offset) - ((address + offset) % self.page_size)
+            page = self.pages.get(page_addr)
+            if page is None:
+                page = bytearray([ERASED_BYTE]) * self.page_size
+                self.pages[page_addr] = page
+            start = address + offset - page_addr
+            chunk = min(len(data) - offset, self.page_size - start)
+            page[start:start + chunk] = data[offset:offset + chunk]
+            offset += chunk
+
+    def page_hashes(self):
+        """Return {page_address: sha1} for every populated page."""
+        return {addr: hashlib.sha1(bytes(page)).hexdigest()
+                for addr, page in self.pages.items()}
+
+    def subset(self, page_addrs):
+        """Return a new image containing only the requested pages."""
+        image = FlashImage(self.page_size)
+        image.start_address = self.start_address
+        for addr in page_addrs:
+            if addr in self.pages:
+                image.pages[addr] = bytearray(self.pages[addr])
+            else:
+                # Page dropped from the new image, flash it blank
+                image.pages[addr] = bytearray([ERASED_BYTE]) * self.page_size
+        return image
+
+    def size(self):
+        return len(self.pages) * self.page_size
+
+
+def iter_hex_records(path):
+    """Yield (address, data) for every data record in an Intel HEX file.
+
+    The image start address, if present, is yielded as (None, address).
+    """
+    base = 0
+    with open(path, "r", encoding="ascii") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            if not line.startswith(":"):
+                raise HexFormatError(f"{path}:{line_no}: missing start code")
+            try:
+                record = bytes.fromhex(line[1:])
+            except ValueError:
+                raise HexFormatError(f"{path}:{line_no}: invalid hex digits")
+            if len(record) < 5 or len(record) != record[0] + 5:
+                raise HexFormatError(f"{path}:{line_no}: bad record length")
+            if sum(record) & 0xFF:
+                raise HexFormatError(f"{path}:{line_no}: checksum mismatch")
+            length = record[0]
+            offset = (record[1] << 8) | record[2]
+            rectype = record[3]
+            data = record[4:4 + length]
+            if rectype == 0x00:
+                yield base + offset, data
+            elif rectype == 0x01:
+                break
+            elif rectype == 0x02:
+                base = int.from_bytes(data, "big") << 4
+            elif rectype == 0x04:
+                base = int.from_bytes(data, "big") << 16
+            elif rectype in (0x03, 0x05):
+                yield None, int.from_bytes(data, "big")
+            else:
+                raise HexFormatError(
+                    f"{path}:{line_no}: unsupported record type {rectype:#04x}")
+
+
+def read_hex(path, page_size=DEFAULT_PAGE_SIZE):
+    """Parse an Intel HEX file into a FlashImage."""
+    image = FlashImage(page_size)
+    for address, data in iter_hex_records(path):
+        if address is None:
+            image.start_address = data
+        else:
+            image.write(address, data)
+    return image
+
+
+def _hex_record(rectype, offset, data):
+    record = bytes([len(data), (offset >> 8) & 0xFF, offset & 0xFF, rectype]) + data
+    checksum = (-sum(record)) & 0xFF
+    return ":" + (record + bytes([checksum])).hex().upper() + "\n"
+
+
+def write_hex(image, path):
+    """Write a FlashImage as Intel HEX, skipping fully erased lines.
+
+    A page that is erased as a whole (one dropped from the image) is written
+    out in full instead, otherwise the programmer would never touch it and
+    the old contents would stay on the chip.
+    """
+    upper = None
+    with open(path, "w", encoding="ascii", newline="\n") as f:
+        for page_addr in sorted(image.pages):
+            page = image.pages[page_addr]
+            blank = page.count(ERASED_BYTE) == len(page)
+            for start in range(0, image.page_size, HEX_LINE_BYTES):
+                chunk = bytes(page[start:start + HEX_LINE_BYTES])
+                if not blank and chunk.count(ERASED_BYTE) == len(chunk):
+                    continue
+                address = page_addr + start
+                if address >> 16 != upper:
+                    upper = address >> 16
+                    f.write(_hex_record(0x04, 0, upper.to_bytes(2, "big")))
+                f.write(_hex_record(0x00, address & 0xFFFF, chunk))
+        if image.start_address is not None:
+            f.write(_hex_record(0x05, 0, image.start_address.to_bytes(4, "big")))
+        f.write(_hex_record(0x01, 0, b""))
+
+
+def diff_pages(previous, current):
+    """Return the sorted page addresses that must be reflashed.
+
+    previous and current are {page_address: hash} maps. Pages that are new,
+    modified or no longer present in the current image are included.
+    """
+    changed = [addr for addr, digest in current.items()
+               if previous.get(addr) != digest]
+    dropped = [addr for addr in previous if addr not in current]
+    return sorted(changed + dropped)
+
+
+class FlashState:
+    """Per-board record of the page hashes last flashed."""
+
+    def __init__(self, state_dir):
+        self.state_dir = state_dir
+
+    def _path(self, board):
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in board)
+        return os.path.join(self.state_dir, f"{safe}.json")
+
+    def load(self, board, page_size):
+        """Return the stored page hashes, or None if unknown/incompatible."""
+        path = self._path(board)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("page_size") != page_size:
+            return None
+        return {int(addr, 16): digest for addr, digest in state["pages"].items()}
+
+    def save(self, board, page_size, hashes, image_path):
+        os.makedirs(self.state_dir, exist_ok=True)
+        state = {
+            "board": board,
+            "image": os.path.abspath(image_path),
+            "page_size": page_size,
+            "flashed_at": time.time(),
+            "pages": {f"{addr:08X}": digest for addr, digest in sorted(hashes.items())},
+        }
+        path = self._path(board)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def record(self, board, image, image_path):
+        """Store image as what the board now holds (after a full flash elsewhere)."""
+        self.save(board, image.page_size, image.page_hashes(), image_path)
+
+    def forget(self, board):
+        path = self._path(board)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class FlashTransport:
+    """Base class for the link used to push pages to a bootloader."""
+
+    name = "base"
+
+    def flash(self, image, full):
+        """Program every page in image. full is True for a complete image."""
+        raise NotImplementedError
+
+
+class MikroHBTransport(FlashTransport):
+    """Flash through the MikroC HID bootloader command line tool."""
+
+    name = "mikro_hb"
+
+    def __init__(self, programmer="mikro_hb"):
+        self.programmer = programmer
+
+    def flash(self, image, full):
+        fd, hex_path = tempfile.mkstemp(suffix=".hex", prefix="delta_")
+        os.close(fd)
+        try:
+            write_hex(image, hex_path)
+            cmd = self.programmer.split() + [hex_path]
+            print(f"Running: {' '.join(cmd)}")
+            subprocess.run(cmd, check=True)
+        finally:
+            os.remove(hex_path)
+
+
+TRANSPORTS = {
+    "mikro_hb": MikroHBTransport,
+    "fake": "fake_bootloader:FakeBootloaderTransport",
+}
+
+
+def get_transport(name, **options):
+    """Create a transport from the registry or a 'module:Class' reference."""
+    factory = TRANSPORTS.get(name, name)
+    if isinstance(factory, str):
+        if ":" not in factory:
+            raise ValueError(f"Unknown flash transport: {name}")
+        module_name, class_name = factory.split(":", 1)
+        factory = getattr(importlib.import_module(module_name), class_name)
+    return factory(**options)
+
+
+def plan_flash(image, state, board, full=False):
+    """Return (pages_to_flash, is_full) for image against the board state."""
+    current = image.page_hashes()
+    previous = None if full else state.load(board, image.page_size)
+    if previous is None:
+        return sorted(current), True
+    return diff_pages(previous, current), False
+
+
+def flash_image(hex_path, transport, state, board="default",
+                page_size=DEFAULT_PAGE_SIZE, full=False, delta_out=None):
+    """Flash only the changed pages of hex_path and record the new state."""
+    image = read_hex(hex_path, page_size)
+    pages, is_full = plan_flash(image, state, board, full)
+    total = len(image.pages)
+    if not pages:
+        print(f"Board '{board}' already up to date ({total} pages unchanged)")
+        return []
+
+    delta = image if is_full else image.subset(pages)
+    if delta_out:
+        write_hex(delta, delta_out)
+        print(f"Wrote delta image: {delta_out}")
+
+    mode = "full image" if is_full else "delta"
+    print(f"Flashing {len(pages)}/{total} pages ({mode}) to board '{board}'")
+    started = time.perf_counter()
+    transport.flash(delta, is_full)
+    print(f"Flash complete in {time.perf_counter() - started:.2f}s")
+
+    state.save(board, page_size, image.page_hashes(), hex_path)
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Page-level delta flashing for PIC32MZ bootloaders")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(p):
+        p.add_argument("hexfile", help="Intel HEX image produced by xc32-bin2hex")
+        p.add_argument("-b", "--board", default="default",
+                       help="Board identifier used to track flashed state")
+        p.add_argument("-s", "--state", default=os.path.join("..", "other", "flash_state"),
+                       help="Directory holding per-board flash state")
+        p.add_argument("--page-size", type=lambda v: int(v, 0), default=DEFAULT_PAGE_SIZE,
+                       help="Flash page size in bytes (default: 0x4000)")
+        p.add_argument("--full", action="store_true",
+                       help="Ignore stored state and flash the whole image")
+
+    flash_p = sub.add_parser("flash", help="Flash changed pages to a board")
+    add_common(flash_p)
+    flash_p.add_argument("-t", "--transport", default="mikro_hb",
+                         help="Transport name or module:Class (default: mikro_hb)")
+    flash_p.add_argument("--programmer", default="mikro_hb",
+                         help="mikro_hb command line (mikro_hb transport)")
+    flash_p.add_argument("--endpoint", default="127.0.0.1:5151",
+                         help="host:port of the bootloader endpoint (fake transport)")
+    flash_p.add_argument("--delta-out", help="Also write the delta image to this HEX file")
+
+    diff_p = sub.add_parser("diff", help="Show pages that would be flashed")
+    add_common(diff_p)
+    diff_p.add_argument("-o", "--output", help="Write the delta image to this HEX file")
+
+    record_p = sub.add_parser("record",
+                              help="Store an image as flashed, after programming it in full")
+    add_common(record_p)
+
+    forget_p = sub.add_parser("forget", help="Drop stored state for a board")
+    forget_p.add_argument("-b", "--board", default="default")
+    forget_p.add_argument("-s", "--state", default=os.path.join("..", "other", "flash_state"))
+
+    args = parser.parse_args()
+    state = FlashState(args.state)
+
+    try:
+        if args.command == "forget":
+            state.forget(args.board)
+            print(f"Forgot flash state for board '{args.board}'")
+        elif args.command == "record":
+            image = read_hex(args.hexfile, args.page_size)
+            state.record(args.board, image, args.hexfile)
+            print(f"Recorded {len(image.pages)} pages as flashed to board '{args.board}'")
+        elif args.command == "diff":
+            image = read_hex(args.hexfile, args.page_size)
+            pages, is_full = plan_flash(image, state, args.board, args.full)
+            print(f"{len(pages)}/{len(image.pages)} pages differ"
+                  + (" (no stored state, full image)" if is_full else ""))
+            for addr in pages:
+                print(f"  0x{addr:08X}")
+            if args.output:
+                write_hex(image.subset(pages), args.output)
+                print(f"Wrote delta image: {args.output}")
+        else:
+            if args.transport == "mikro_hb":
+                options = {"programmer": args.programmer}
+            elif args.transport == "fake":
+                options = {"endpoint": args.endpoint}
+            else:
+                options = {}
+            transport = get_transport(args.transport, **options)
+            flash_image(args.hexfile, transport, state, args.board,
+                        args.page_size, args.full, args.delta_out)
+    # Transports import this module as flash_image, so when it runs as a script
+    # their FlashError is not this file's class; catch its RuntimeError base
+    except (OSError, HexFormatError, RuntimeError, ValueError,
+            subprocess.CalledProcessError) as ex:
+        print(f"Error flashing image: {ex}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,164 +7,136 @@ Automatically creates a complete embedded project structure with cross-platform
 import os
 import sys
 import argparse
-from pathlib import Path
+import threading
 # from makefile_utils import create_root_makefile
+from generator_fs import DISK
+from project_plan import (DEFAULT_DEVICE, ProjectSpec, plan_project, apply_plan, apply_file,
+                          create_directories)
+from project_manifest import load_manifest, record_manifest, regenerate_project
+from project_archive import ArchiveError, archive_plan, format_for, open_output
+
+
+class DependencyCache:
+    """Keeps the contents of the dependancies files in memory.
+
+    Entries are revalidated against the file size and mtime, so edits to the
+    dependancies folder are picked up by long-running processes.
+    """
+
+    def __init__(self, fs=DISK):
+        self.fs = fs
+        self._files = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def read(self, path):
+        """Return the bytes of path, or None if it does not exist."""
+        try:
+            key = self.fs.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._files.get(path)
+            if entry and entry[0] == key:
+                self.hits += 1
+                return entry[1]
+        data = self.fs.read_bytes(path)
+        with self._lock:
+            self._files[path] = (key, data)
+            self.misses += 1
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._files.clear()
+
+
+# Shared by every generator in the process (see generator_server.py)
+DEPENDENCY_CACHE = DependencyCache()
 
 
 class PIC32ProjectGenerator:
-    def __init__(self):
+    def __init__(self, cache=None, fs=None):
         self.project_name = ""
-        self.device = "32MZ1024EFH064"
+        self.device = DEFAULT_DEVICE
         self.project_root = ""
-
+        self.cache = cache or DEPENDENCY_CACHE
+        # Where the project is written (see generator_fs.py)
+        self.fs = fs or DISK
+        self.log = print
+
+    @classmethod
+    def from_spec(cls, spec, cache=None, fs=None):
+        """Create a generator configured from a ProjectSpec."""
+        generator = cls(cache, fs)
+        generator.project_name = spec.project_name
+        generator.device = spec.device
+        generator.project_root = spec.project_root
+        return generator
+
+    def spec(self, include_startup=False):
+        """Return the ProjectSpec matching the generator's attributes."""
+        return ProjectSpec(self.project_name, self.device,
+                           os.path.dirname(self.project_root), include_startup)
+
+    def plan(self, include_startup=False):
+        """Return the GenerationPlan for this project without touching disk."""
+        return plan_project(self.spec(include_startup))
+
+    def _apply_planned(self, path, include_startup=False):
+        """Apply the single planned file at path and record it in the manifest.
+
+        The startup option already in the manifest is kept, so helpers run
+        after copy_startup_file() do not record the project without it.
+        """
+        manifest = load_manifest(self.project_root, self.fs)
+        if manifest:
+            include_startup = include_startup or manifest["spec"].get("include_startup", False)
+        plan = self.plan(include_startup)
+        planned = next(f for f in plan.files if f.path == path)
+        action = apply_file(plan, planned, self.cache, self.log, self.fs)
+        record_manifest(plan, [(path, action)], self.cache, self.fs)
+        return action == "created"
+
+    def generate(self, include_startup=False):
+        """Plan the configured project, apply it and record the manifest."""
+        plan = self.plan(include_startup)
+        results = apply_plan(plan, self.cache, self.log, self.fs)
+        record_manifest(plan, results, self.cache, self.fs)
+        return results
+
+    def generate_archive(self, out, fmt="tar", include_startup=False):
+        """Stream the project into a tar/tgz/zip on out instead of the disk."""
+        return archive_plan(self.plan(include_startup), out, fmt, self.cache, self.log)
+
+    def regenerate(self):
+        """Update an existing project from its manifest (see project_manifest.py)."""
+        return regenerate_project(self.project_root, self.cache, self.log, fs=self.fs)
+
+    # The methods below create one part of the plan each and are kept for
+    # callers that build a project piece by piece; generate() does it all.
     def create_directory_structure(self, include_startup=False):
         """Create the simple directory structure - first level only"""
-        dirs = [
-            "srcs",
-            "incs",
-            "objs",
-            "bins",
-            "other",
-            "docs"
-        ]
-
-        # Add startup directory if mikroc option is enabled
-        if include_startup:
-            dirs.extend([
-                "srcs/startup"
-            ])
-
-        for dir_path in dirs:
-            full_path = os.path.join(self.project_root, dir_path)
-            Path(full_path).mkdir(parents=True, exist_ok=True)
-            print(f"Created directory: {full_path}")
-        return dirs
-
-# Copy the root makefile to the project
+        plan = self.plan(include_startup)
+        create_directories(plan, self.log, self.fs)
+        return list(plan.directories)
+
     def copy_root_makefile(self):
-        """Copy root files to the project structure. Specifically, copy Makefile_Root from the dependancies folder one level up from this script's directory to the project root folder as Makefile. Also copy README.md and LICENSE if present in this script's directory."""
-        import shutil
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        parent_dir = os.path.abspath(os.path.join(script_dir, '..'))
-        dependancies_dir = os.path.join(parent_dir, 'dependancies')
-
-        # Copy Makefile_Root from dependancies as Makefile in project root
-        makefile_src = os.path.join(dependancies_dir, 'Makefile_Root')
-        makefile_dst = os.path.join(self.project_root, 'Makefile')
-        if os.path.exists(makefile_src):
-            if not os.path.exists(makefile_dst):
-                shutil.copyfile(makefile_src, makefile_dst)
-                print(f"Copied {makefile_src} to {makefile_dst}")
-            else:
-                print(f"File {makefile_dst} already exists, skipping.")
-        else:
-            print(f"Source Makefile_Root not found at {makefile_src}")
+        """Copy Makefile_Root from the dependancies folder to the project root as Makefile."""
+        return self._apply_planned("Makefile")
 
-    # Copy the source makefile from dependancies folder to root/srcs folder
     def copy_srcs_makefile(self):
-        """Copy srcs maefile to the project srcs folder from dependancies folder."""
-        import shutil
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        parent_dir = os.path.abspath(os.path.join(script_dir, '..'))
-        dependancies_dir = os.path.join(parent_dir, 'dependancies')
-
-        # copy the Makefile_Srcs from dependancies to srcs/ folder
-        makefile_src = os.path.join(dependancies_dir, 'Makefile_Srcs')
-        makefile_dst = os.path.join(self.project_root, 'srcs', 'Makefile')
-        if os.path.exists(makefile_src):
-            if not os.path.exists(makefile_dst):
-                shutil.copyfile(makefile_src, makefile_dst)
-                print(f"Copied {makefile_src} to {makefile_dst}")
-            else:
-                print(f"File {makefile_dst} already exists, skipping.")
-        else:
-            print(f"Source Makefile_Srcs not found at {makefile_src}")
+        """Copy Makefile_Srcs from the dependancies folder to srcs/Makefile."""
+        return self._apply_planned("srcs/Makefile")
 
-    # If the --mikroc flag has been set then copy then create the startup folder and copy the startup.S file to srcs folder
     def copy_startup_file(self):
-        """create a startup folder under srcs and copy the startup.S file from dependancies to the new startup folder."""
-        import shutil
-        startup_src = os.path.dirname(os.path.abspath(__file__))
-        startup_dst = os.path.join(self.project_root, 'srcs', 'startup')
-        if not os.path.exists(startup_dst):
-            os.makedirs(startup_dst)
-            print(f"Created directory: {startup_dst}")
-
-        startup_file_src = os.path.join(startup_src, 'startup.S')
-        startup_file_dst = os.path.join(startup_dst, 'startup.S')
-        if os.path.exists(startup_file_src):
-            if not os.path.exists(startup_file_dst):
-                shutil.copyfile(startup_file_src, startup_file_dst)
-                print(f"Copied {startup_file_src} to {startup_file_dst}")
-            else:
-                print(f"File {startup_file_dst} already exists, skipping.")
-        else:
-            print(f"Source startup.S not found at {startup_file_src}")
+        """Copy startup.S from the dependancies folder to srcs/startup/."""
+        return self._apply_planned("srcs/startup/startup.S", include_startup=True)
 
     def create_main_c(self):
-        """Create a main.c file in srcs/ with a template similar to the C# version."""
-        srcs_dir = os.path.join(self.project_root, "srcs")
-        os.makedirs(srcs_dir, exist_ok=True)
-        main_c_path = os.path.join(srcs_dir, "main.c")
-        if os.path.exists(main_c_path):
-            print(f"File {main_c_path} already exists, skipping.")
-            return
-        content = f"""/*****************************************************************************
-  Main Source File
-
-  Company:
-    Your Company Name
-
-  File Name:
-    main.c
-
-  Summary:
-    This file contains the \"main\" function for {self.project_name}.
-
-  Description:
-    This file contains the \"main\" function for the project.
-    Simple bare-metal main function without system initialization dependencies.
- ******************************************************************************/
-
-// *****************************************************************************
-// Section: Included Files
-// *****************************************************************************
-
-#include <stddef.h>                     // Defines NULL
-#include <stdbool.h>                    // Defines true
-#include <stdlib.h>                     // Defines EXIT_FAILURE
-#include <stdint.h>                     // Defines uint32_t, uintptr_t
-
-// *****************************************************************************
-// Variables
-// *****************************************************************************
-
-// *****************************************************************************
-// Section: Main Entry Point
-// *****************************************************************************
-
-int main ( void )
-{{
-    // Initialize your hardware/peripherals here
-    // Example: GPIO configuration, clock setup, etc.
-    
-    while ( true )
-    {{
-        // Your main application code here
-        // Example: toggle LED, read sensors, communicate, etc.
-    }}
-
-    /* Execution should not come here during normal operation */
-    return ( EXIT_FAILURE );
-}}
-
-/*****************************************************************************
- End of File
-*/
-"""
-        with open(main_c_path, "w", encoding="utf-8") as f:
-            f.write(content)
-        print(f"Created {main_c_path}")
+        """Create srcs/main.c from the main.c template."""
+        return self._apply_planned("srcs/main.c")
 
 
 def main():
@@ -177,17 +149,33 @@ def main():
                         help="PIC32MZ device (default: 32MZ1024EFH064)")
     parser.add_argument("-o", "--output", default=".",
                         help="Root directory where project folder will be created (default: current directory)")
-    parser.add_argument("--mikroc", action="store_false",
-                        help="Include startup files for MikroC compatibility (optional)")
+    parser.add_argument("--mikroc", dest="mikroc", action="store_true", default=True,
+                        help="Include startup files for MikroC compatibility (default)")
+    parser.add_argument("--no-mikroc", dest="mikroc", action="store_false",
+                        help="Do not include the MikroC startup files")
+    parser.add_argument("-n", "--dry-run", action="store_true",
+                        help="Print the generation plan without writing anything")
+    parser.add_argument("--regenerate", action="store_true",
+                        help="Update an existing project: rewrite untouched files, merge edited ones")
+    parser.add_argument("--archive", metavar="FILE",
+                        help="Write the project into a tar/tar.gz/zip archive instead of "
+                             "--output (- for stdout)")
+    parser.add_argument("--archive-format", choices=("tar", "tgz", "zip"),
+                        help="Archive format (default: from the FILE suffix, else tar)")
 
     args = parser.parse_args()
 
     # Set up project generator
-    generator = PIC32ProjectGenerator()
-    generator.project_name = args.projname
-    generator.device = args.device
-    generator.project_root = os.path.abspath(
-        os.path.join(args.output, args.projname))
+    spec = ProjectSpec(args.projname, args.device, args.output, args.mikroc)
+    if args.dry_run:
+        print("\n".join(plan_project(spec).describe()))
+        return
+    generator = PIC32ProjectGenerator.from_spec(spec)
+    if args.archive:
+        if args.regenerate:
+            parser.error("--archive cannot be combined with --regenerate")
+        archive_main(generator, args)
+        return
 
     print("PIC32MZ Project Generator")
     print("==========================")
@@ -200,13 +188,14 @@ def main():
     print()
 
     try:
-        generator.create_directory_structure(include_startup=args.mikroc)
-        generator.copy_root_makefile()
-        generator.copy_srcs_makefile()
-        if args.mikroc:
-            generator.copy_startup_file()
-        generator.create_main_c()
-        # Add more method calls as needed, e.g. generator.create_root_makefile(), etc.
+        if args.regenerate:
+            actions = generator.regenerate()
+            conflicts = [path for path, action in actions.items() if action == "conflict"]
+            if conflicts:
+                print(f"\n⚠ Merge conflicts in: {', '.join(conflicts)}")
+                sys.exit(1)
+        else:
+            generator.generate(args.mikroc)
         print(
             f"\n✅ Project '{generator.project_name}' generated successfully!")
         print(f"📁 Location: {generator.project_root}")
@@ -215,5 +204,31 @@ def main():
         sys.exit(1)
 
 
+def archive_main(generator, args):
+    """--archive: stream the project to a file or stdout, progress on stderr."""
+    generator.log = lambda message: print(message, file=sys.stderr)
+    fmt = args.archive_format or format_for(args.archive)
+    tmp_path = None
+    try:
+        if args.archive == "-":
+            out, _owned = open_output("-")
+            generator.generate_archive(out, fmt, args.mikroc)
+            out.flush()
+            return
+        # Written next to the target and renamed, so a failed run leaves no partial archive
+        tmp_path = f"{args.archive}.{os.getpid()}.tmp"
+        out, _owned = open_output(tmp_path)
+        with out:
+            generator.generate_archive(out, fmt, args.mikroc)
+        os.replace(tmp_path, args.archive)
+        tmp_path = None
+    except (OSError, ArchiveError) as ex:
+        print(f"Error archiving project: {ex}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Generator Client
+Thin client for generator_server.py; only uses the standard library so it
+starts quickly from editors and scripts
+"""
+
+import os
+import sys
+import json
+import socket
+import argparse
+import itertools
+
+
+def default_address():
+    """Unix socket under the user cache dir, localhost TCP on Windows."""
+    if hasattr(socket, "AF_UNIX") and os.name != "nt":
+        cache = os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))
+        return "unix:" + os.path.join(cache, "pic32gen", "generator.sock")
+    return "tcp:127.0.0.1:47832"
+
+
+def parse_address(address):
+    """Return (family, target) for 'unix:/path', 'tcp:host:port' or 'host:port'."""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    if address.startswith("tcp:"):
+        address = address[len("tcp:"):]
+    host, port = address.rsplit(":", 1)
+    return socket.AF_INET, (host, int(port))
+
+
+class GeneratorClient:
+    """Keeps one connection open and sends JSON line requests over it."""
+
+    def __init__(self, address=None, timeout=30.0):
+        family, target = parse_address(address or default_address())
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(target)
+        self.stream = self.sock.makefile("rwb")
+        self._ids = itertools.count(1)
+
+    def call(self, op, **params):
+        request = dict(params, op=op, id=next(self._ids))
+        self.stream.write(json.dumps(request).encode("utf-8") + b"\n")
+        self.stream.flush()
+        line = self.stream.readline()
+        if not line:
+            raise ConnectionError("Generator server closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        self.stream.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Send a request to a running PIC32MZ generator server")
+    parser.add_argument("-a", "--address", default=None,
+                        help="Server address: unix:/path or tcp:host:port")
+    sub = parser.add_subparsers(dest="op", required=True)
+
+    for op in ("generate", "regenerate"):
+        p = sub.add_parser(op, help=f"{op.capitalize()} a project")
+        p.add_argument("projname", help="Name of the project")
+        p.add_argument("-d", "--device", default="32MZ1024EFH064")
+        p.add_argument("-o", "--output", default=".")
+        p.add_argument("--no-mikroc", dest="mikroc", action="store_false",
+                       help="Do not include the MikroC startup files")
+
+    p = sub.add_parser("validate", help="Validate a HEX/ELF image")
+    p.add_argument("image")
+    p.add_argument("-l", "--linker-script", required=True)
+
+    sub.add_parser("ping", help="Check that the server is alive")
+    sub.add_parser("stats", help="Show server cache statistics")
+    sub.add_parser("shutdown", help="Stop the server")
+
+    args = parser.parse_args()
+    params = {}
+    if args.op in ("generate", "regenerate"):
+        params = {"project": args.projname, "device": args.device,
+                  "output": os.path.abspath(args.output), "mikroc": args.mikroc}
+    elif args.op == "validate":
+        params = {"image": os.path.abspath(args.image),
+                  "linker_script": os.path.abspath(args.linker_script)}
+
+    try:
+        with GeneratorClient(args.address) as client:
+            reply = client.call(args.op, **params)
+    except OSError as ex:
+        print(f"Cannot reach generator server: {ex}")
+        sys.exit(2)
+
+    print(json.dumps(reply, indent=2))
+    sys.exit(0 if reply.get("ok") else 1)
+
+
+if __name__ == "__main__":
+    main()
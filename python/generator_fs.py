@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Generator Filesystem
+The few filesystem operations the project generator performs, behind one
+small interface with three backends:
+
+- DiskFS: the real disk (the default everywhere, as DISK)
+- MemoryFS: a dict of files and folders, optionally layered over a
+  read-only lower backend so dependancies/ still resolve; nothing is written
+  to disk, so tests and benchmarks can generate thousands of projects
+- RecordingFS: wraps another backend and records every operation, so a test
+  can assert exactly what a generation does
+"""
+
+import os
+
+
+class DiskFS:
+    """Operations on the real filesystem."""
+
+    name = "disk"
+
+    def stat(self, path):
+        """(size, mtime_ns) of a file; raises OSError when missing."""
+        st = os.stat(path)
+        return st.st_size, st.st_mtime_ns
+
+    def exists(self, path):
+        return os.path.exists(path)
+
+    def isdir(self, path):
+        return os.path.isdir(path)
+
+    def makedirs(self, path):
+        """Create path and its parents; existing folders are fine."""
+        os.makedirs(path, exist_ok=True)
+
+    def read_bytes(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def write_bytes(self, path, data):
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def replace(self, src, dst):
+        os.replace(src, dst)
+
+    def remove(self, path):
+        os.remove(path)
+
+    def listdir(self, path):
+        return sorted(os.listdir(path))
+
+
+DISK = DiskFS()
+
+
+def _key(path):
+    return os.path.normpath(os.path.abspath(path))
+
+
+class MemoryFS:
+    """Files and folders held in dicts, with disk-like errors.
+
+    Reads, stats and listings fall through to lower (read-only) for paths
+    not written here; writes, renames and removals only touch memory.
+    Removing a file that lower holds leaves a whiteout, so it stays removed
+    until it is written again, as in an overlay filesystem.
+    """
+
+    name = "memory"
+
+    def __init__(self, lower=None):
+        self.lower = lower
+        self.files = {}
+        self.mtimes = {}
+        self.dirs = set()
+        self.whiteouts = set()
+        self._clock = 0
+
+    def _in_lower(self, key, path):
+        """True when lower shows path and it has not been removed here."""
+        return (self.lower is not None and key not in self.whiteouts
+                and key not in self.dirs and self.lower.exists(path))
+
+    def _parent_exists(self, key):
+        parent = os.path.dirname(key)
+        return parent == key or self.isdir(parent)
+
+    def stat(self, path):
+        key = _key(path)
+        if key in self.files:
+            return len(self.files[key]), self.mtimes[key]
+        if self.lower is not None and key not in self.dirs and key not in self.whiteouts:
+            return self.lower.stat(path)
+        raise FileNotFoundError(2, "No such file", path)
+
+    def exists(self, path):
+        key = _key(path)
+        return key in self.files or key in self.dirs or self._in_lower(key, path)
+
+    def isdir(self, path):
+        key = _key(path)
+        if key in self.dirs or os.path.dirname(key) == key:
+            return True
+        return (key not in self.files and key not in self.whiteouts
+                and self.lower is not None and self.lower.isdir(path))
+
+    def makedirs(self, path):
+        key = _key(path)
+        if key in self.files:
+            raise FileExistsError(17, "File exists", path)
+        self.whiteouts.discard(key)
+        while key not in self.dirs and os.path.dirname(key) != key:
+            self.dirs.add(key)
+            key = os.path.dirname(key)
+
+    def read_bytes(self, path):
+        key = _key(path)
+        if key in self.files:
+            return self.files[key]
+        if key in self.dirs:
+            raise IsADirectoryError(21, "Is a directory", path)
+        if self.lower is not None and key not in self.whiteouts:
+            return self.lower.read_bytes(path)
+        raise FileNotFoundError(2, "No such file", path)
+
+    def write_bytes(self, path, data):
+        key = _key(path)
+        if key in self.dirs:
+            raise IsADirectoryError(21, "Is a directory", path)
+        if not self._parent_exists(key):
+            raise FileNotFoundError(2, "No such directory", os.path.dirname(path))
+        self._clock += 1
+        self.whiteouts.discard(key)
+        self.files[key] = bytes(data)
+        self.mtimes[key] = self._clock
+
+    def replace(self, src, dst):
+        data = self.read_bytes(src)
+        if _key(src) == _key(dst):
+            return
+        self.write_bytes(dst, data)
+        self.remove(src)
+
+    def remove(self, path):
+        key = _key(path)
+        in_lower = self._in_lower(key, path)
+        if key in self.files:
+            del self.files[key]
+            del self.mtimes[key]
+        elif not in_lower or self.lower.isdir(path):
+            raise FileNotFoundError(2, "No such file", path)
+        if in_lower:
+            self.whiteouts.add(key)
+
+    def listdir(self, path):
+        key = _key(path)
+        if not self.isdir(path):
+            raise NotADirectoryError(20, "Not a directory", path)
+        names = {os.path.basename(p) for p in list(self.files) + list(self.dirs)
+                 if os.path.dirname(p) == key}
+        if self.lower is not None and self.lower.isdir(path) and key not in self.dirs:
+            names.update(name for name in self.lower.listdir(path)
+                         if os.path.join(key, name) not in self.whiteouts)
+        return sorted(names)
+
+    def tree(self, root):
+        """{relative_path: bytes} of the files written under root."""
+        root = _key(root)
+        return {os.path.relpath(p, root).replace("\\", "/"): data
+                for p, data in sorted(self.files.items())
+                if p.startswith(root + os.sep)}
+
+    @property
+    def total_bytes(self):
+        return sum(len(data) for data in self.files.values())
+
+
+class RecordingFS:
+    """Records (operation, path) for every call and forwards it to inner."""
+
+    name = "recording"
+
+    def __init__(self, inner=None):
+        self.inner = inner if inner is not None else MemoryFS(DISK)
+        self.ops = []
+
+    def reset(self):
+        self.ops = []
+
+    @property
+    def counts(self):
+        """{operation: calls} since the last reset."""
+        counts = {}
+        for op, _path in self.ops:
+            counts[op] = counts.get(op, 0) + 1
+        return counts
+
+    @property
+    def total(self):
+        return len(self.ops)
+
+    def paths(self, op):
+        """Paths passed to one operation, in call order."""
+        return [path for name, path in self.ops if name == op]
+
+    def stat(self, path):
+        self.ops.append(("stat", path))
+        return self.inner.stat(path)
+
+    def exists(self, path):
+        self.ops.append(("exists", path))
+        return self.inner.exists(path)
+
+    def isdir(self, path):
+        self.ops.append(("isdir", path))
+        return self.inner.isdir(path)
+
+    def makedirs(self, path):
+        self.ops.append(("makedirs", path))
+        self.inner.makedirs(path)
+
+    def read_bytes(self, path):
+        self.ops.append(("read_bytes", path))
+        return self.inner.read_bytes(path)
+
+    def write_bytes(self, path, data):
+        self.ops.append(("write_bytes", path))
+        self.inner.write_bytes(path, data)
+
+    def replace(self, src, dst):
+        self.ops.append(("replace", dst))
+        self.inner.replace(src, dst)
+
+    def remove(self, path):
+        self.ops.append(("remove", path))
+        self.inner.remove(path)
+
+    def listdir(self, path):
+        self.ops.append(("listdir", path))
+        return self.inner.listdir(path)
+
+
+BACKENDS = {"disk": lambda: DISK, "memory": lambda: MemoryFS(DISK),
+            "recording": lambda: RecordingFS()}
+
+
+def make_fs(name):
+    """Backend by name: disk, memory (over the disk, read-only) or recording."""
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"unknown filesystem backend {name!r} "
+                         f"(use {', '.join(sorted(BACKENDS))})") from None
+
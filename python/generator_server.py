@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Generator Server
+Keeps the project generator, the dependancies file cache and the parsed
+device linker scripts warm, and serves JSON line requests over a Unix socket
+or localhost TCP
+"""
+
+import os
+import sys
+import json
+import time
+import struct
+import socket
+import argparse
+import threading
+import traceback
+import socketserver
+
+from generate_project import PIC32ProjectGenerator, DEPENDENCY_CACHE
+from flash_image import HexFormatError
+from image_validator import ImageValidator, ValidationError, validate_image
+from generator_client import default_address, parse_address
+
+
+class ValidatorCache:
+    """Parsed linker scripts keyed by path, size and mtime."""
+
+    def __init__(self):
+        self._validators = {}
+        self._lock = threading.Lock()
+
+    def get(self, linker_script):
+        st = os.stat(linker_script)
+        key = (linker_script, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            validator = self._validators.get(key)
+        if validator is None:
+            validator = ImageValidator.from_linker_script(linker_script)
+            with self._lock:
+                self._validators[key] = validator
+        return validator
+
+    def __len__(self):
+        return len(self._validators)
+
+
+class GeneratorService:
+    """Request handlers shared by every connection."""
+
+    def __init__(self):
+        self.validators = ValidatorCache()
+        self.started = time.time()
+        self.requests = 0
+
+    def handle(self, request):
+        op = request.get("op")
+        handler = getattr(self, f"op_{op}", None)
+        if handler is None:
+            raise ValueError(f"Unknown op: {op}")
+        self.requests += 1
+        return handler(request)
+
+    def _generator(self, request, messages):
+        project = request.get("project")
+        if not project:
+            raise ValueError("'project' is required")
+        if not isinstance(project, str):
+            raise ValueError("'project' must be a string")
+        generator = PIC32ProjectGenerator()
+        generator.project_name = project
+        generator.device = request.get("device", generator.device)
+        generator.project_root = os.path.abspath(
+            os.path.join(request.get("output", "."), project))
+        generator.log = messages.append
+        return generator
+
+    def op_generate(self, request):
+        messages = []
+        generator = self._generator(request, messages)
+        generator.generate(include_startup=request.get("mikroc", True))
+        return {"project_root": generator.project_root, "log": messages}
+
+    def op_regenerate(self, request):
+        messages = []
+        generator = self._generator(request, messages)
+        if not os.path.isdir(generator.project_root):
+            raise ValueError(f"No project at {generator.project_root}")
+        actions = generator.regenerate()
+        return {"project_root": generator.project_root, "actions": actions, "log": messages}
+
+    def op_validate(self, request):
+        linker_script = request["linker_script"]
+        validator = self.validators.get(linker_script)
+        ranges, problems = validate_image(request["image"], linker_script, validator)
+        return {"valid": not problems, "ranges": len(ranges), "problems": problems}
+
+    def op_ping(self, request):
+        return {"pong": True}
+
+    def op_stats(self, request):
+        return {
+            "uptime": time.time() - self.started,
+            "requests": self.requests,
+            "dependency_cache": {"hits": DEPENDENCY_CACHE.hits,
+                                 "misses": DEPENDENCY_CACHE.misses},
+            "linker_scripts": len(self.validators),
+        }
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        service = self.server.service
+        for line in self.rfile:
+            started = time.perf_counter()
+            reply = {}
+            try:
+                request = json.loads(line)
+                reply["id"] = request.get("id")
+                if request.get("op") == "shutdown":
+                    reply.update(ok=True, result={})
+                    self._send(reply)
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                    return
+                reply["result"] = service.handle(request)
+                reply["ok"] = True
+            except (ValueError, KeyError, TypeError, OSError, HexFormatError,
+                    ValidationError, struct.error) as ex:
+                reply.update(ok=False, error=str(ex))
+            except Exception as ex:
+                # Keep the connection and the server alive on unexpected errors
+                traceback.print_exc()
+                reply.update(ok=False, error=f"{type(ex).__name__}: {ex}")
+            reply["elapsed_ms"] = (time.perf_counter() - started) * 1000.0
+            self._send(reply)
+
+    def _send(self, reply):
+        self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+
+def create_server(address=None):
+    """Bind a server for address ('unix:/path' or 'tcp:host:port')."""
+    family, target = parse_address(address or default_address())
+    if family == getattr(socket, "AF_UNIX", None):
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+        if os.path.exists(target):
+            os.remove(target)
+        server = _UnixServer(target, _RequestHandler)
+    else:
+        if target[0] not in ("127.0.0.1", "localhost", "::1"):
+            raise ValueError("The generator server only listens on localhost")
+        server = _TCPServer(target, _RequestHandler)
+    server.service = GeneratorService()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the PIC32MZ project generator as a local server")
+    parser.add_argument("-a", "--address", default=None,
+                        help=f"unix:/path or tcp:127.0.0.1:port (default: {default_address()})")
+    args = parser.parse_args()
+
+    try:
+        server = create_server(args.address)
+    except (OSError, ValueError) as ex:
+        print(f"Error starting generator server: {ex}")
+        sys.exit(1)
+
+    address = args.address or default_address()
+    print(f"PIC32MZ generator server listening on {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping generator server")
+    finally:
+        server.server_close()
+        family, target = parse_address(address)
+        if family == getattr(socket, "AF_UNIX", None) and os.path.exists(target):
+            os.remove(target)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Image Validator
+Checks the address ranges of a HEX or ELF image against the MEMORY regions of
+the device linker script before the image is flashed
+"""
+
+import os
+import re
+import sys
+import time
+import bisect
+import struct
+import argparse
+
+from flash_image import iter_hex_records, HexFormatError
+
+# KSEG0/KSEG1 are fixed windows onto physical memory; bin2hex emits physical
+# addresses while the linker script uses virtual ones.
+KSEG_BASE = 0x80000000
+KSEG_END = 0xC0000000
+PHYS_MASK = 0x1FFFFFFF
+
+# Regions that exist in the linker script but are never loaded from an image
+NON_LOADABLE_REGIONS = ("kseg0_data_mem", "kseg1_data_mem", "sfrs")
+NON_LOADABLE_PATTERN = re.compile(r"sqi|data_mem$")
+CONFIG_PREFIXES = ("config_", "configsfrs_")
+
+_MEMORY_BLOCK = re.compile(r"\bMEMORY\s*\{(.*?)\}", re.S)
+_REGION_LINE = re.compile(
+    r"(?P<name>[A-Za-z_][\w.]*)\s*(?:\((?P<attrs>[^)]*)\))?\s*:\s*"
+    r"ORIGIN\s*=\s*(?P<origin>[0-9A-Fa-fxX]+[KkMm]?)\s*,\s*"
+    r"LENGTH\s*=\s*(?P<length>[0-9A-Fa-fxX]+[KkMm]?)")
+
+
+class ValidationError(Exception):
+    """Raised when the image or linker script cannot be read."""
+
+
+def to_physical(address):
+    """Translate a KSEG0/KSEG1 virtual address to its physical address."""
+    if KSEG_BASE <= address < KSEG_END:
+        return address & PHYS_MASK
+    return address
+
+
+def _parse_number(text):
+    multiplier = 1
+    if text[-1] in "Kk":
+        multiplier, text = 1024, text[:-1]
+    elif text[-1] in "Mm":
+        multiplier, text = 1024 * 1024, text[:-1]
+    return int(text, 0) * multiplier
+
+
+class MemoryRegion:
+    def __init__(self, name, origin, length, attrs=""):
+        self.name = name
+        self.origin = origin
+        self.length = length
+        self.attrs = attrs or ""
+        self.start = to_physical(origin)
+        self.end = self.start + length
+
+    @property
+    def loadable(self):
+        return not (self.name in NON_LOADABLE_REGIONS
+                    or NON_LOADABLE_PATTERN.search(self.name))
+
+    @property
+    def is_config(self):
+        return self.name.startswith(CONFIG_PREFIXES)
+
+    def __repr__(self):
+        return f"MemoryRegion({self.name}, 0x{self.origin:08X}, 0x{self.length:X})"
+
+
+def parse_memory_regions(linker_script):
+    """Return the MEMORY regions declared in a GNU ld linker script."""
+    with open(linker_script, "r", encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    block = _MEMORY_BLOCK.search(text)
+    if not block:
+        raise ValidationError(f"No MEMORY block found in {linker_script}")
+    regions = []
+    for match in _REGION_LINE.finditer(block.group(1)):
+        length = _parse_number(match.group("length"))
+        if length == 0:
+            continue
+        regions.append(MemoryRegion(match.group("name"),
+                                    _parse_number(match.group("origin")),
+                                    length, match.group("attrs")))
+    return regions
+
+
+class IntervalTree:
+    """Static augmented interval tree over half-open [start, end) intervals.
+
+    Intervals are stored sorted by start in an implicit balanced binary tree;
+    each node keeps the largest end in its subtree so whole subtrees that end
+    before a query can be skipped.
+    """
+
+    def __init__(self, intervals):
+        self.items = sorted(intervals, key=lambda item: (item[0], item[1]))
+        self.max_end = [0] * len(self.items)
+        if self.items:
+            self._build(0, len(self.items) - 1)
+
+    def _build(self, lo, hi):
+        mid = (lo + hi) // 2
+        best = self.items[mid][1]
+        if lo <= mid - 1:
+            best = max(best, self._build(lo, mid - 1))
+        if mid + 1 <= hi:
+            best = max(best, self._build(mid + 1, hi))
+        self.max_end[mid] = best
+        return best
+
+    def overlapping(self, start, end):
+        """Return the payloads of all intervals overlapping [start, end)."""
+        found = []
+        stack = [(0, len(self.items) - 1)] if self.items else []
+        while stack:
+            lo, hi = stack.pop()
+            if lo > hi:
+                continue
+            mid = (lo + hi) // 2
+            if self.max_end[mid] <= start:
+                continue
+            item_start, item_end, payload = self.items[mid]
+            if item_start < end and item_end > start:
+                found.append(payload)
+            stack.append((lo, mid - 1))
+            # Everything right of mid starts at or after item_start
+            if item_start < end:
+                stack.append((mid + 1, hi))
+        return found
+
+    def __len__(self):
+        return len(self.items)
+
+
+def merge_ranges(ranges):
+    """Coalesce (start, end) ranges that touch or overlap."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def load_hex_ranges(path, merge=True):
+    """Physical ranges of the data records; merge=False keeps one per record."""
+    ranges = []
+    for address, data in iter_hex_records(path):
+        if address is not None and data:
+            ranges.append((to_physical(address), to_physical(address) + len(data)))
+    return merge_ranges(ranges) if merge else ranges
+
+
+def load_elf_ranges(path, merge=True):
+    """Return the physical ranges of the PT_LOAD segments with file contents."""
+    with open(path, "rb") as f:
+        ident = f.read(16)
+        if ident[:4] != b"\x7fELF":
+            raise ValidationError(f"{path} is not an ELF file")
+        if ident[4] != 1:
+            raise ValidationError(f"{path}: only 32-bit ELF images are supported")
+        endian = "<" if ident[5] == 1 else ">"
+        header = f.read(36)
+        (_type, _machine, _version, _entry, phoff, _shoff, _flags, _ehsize,
+         phentsize, phnum, _shentsize, _shnum, _shstrndx) = struct.unpack(
+            endian + "HHIIIIIHHHHHH", header)
+        ranges = []
+        for index in range(phnum):
+            f.seek(phoff + index * phentsize)
+            (p_type, _offset, _vaddr, p_paddr, p_filesz, _memsz, _pflags,
+             _align) = struct.unpack(endian + "IIIIIIII", f.read(32))
+            if p_type == 1 and p_filesz:
+                start = to_physical(p_paddr)
+                ranges.append((start, start + p_filesz))
+    return merge_ranges(ranges) if merge else ranges
+
+
+def load_image_ranges(path, merge=True):
+    with open(path, "rb") as f:
+        magic = f.read(4)
+    if magic == b"\x7fELF":
+        return load_elf_ranges(path, merge)
+    return load_hex_ranges(path, merge)
+
+
+class ImageValidator:
+    """Checks image ranges against the linker script MEMORY regions."""
+
+    def __init__(self, regions):
+        self.regions = regions
+        self.tree = IntervalTree([(r.start, r.end, r) for r in regions])
+
+    @classmethod
+    def from_linker_script(cls, linker_script):
+        return cls(parse_memory_regions(linker_script))
+
+    def _check(self, start, end, hits):
+        """(problems, uncovered) for the placement of one range."""
+        problems = []
+        span = f"0x{start:08X}-0x{end - 1:08X}"
+
+        for region in hits:
+            if not region.loadable:
+                problems.append(f"{span} places data in non-loadable region '{region.name}'")
+
+        # Walk the covered area to find bytes no region claims
+        cursor = start
+        uncovered = False
+        for region in sorted(hits, key=lambda r: r.start):
+            if region.start > cursor:
+                uncovered = True
+                problems.append(
+                    f"{span} has 0x{region.start - cursor:X} bytes outside any MEMORY "
+                    f"region at 0x{cursor:08X}")
+            cursor = max(cursor, region.end)
+            if cursor >= end:
+                break
+        if cursor < end:
+            uncovered = True
+            problems.append(
+                f"{span} has 0x{end - cursor:X} bytes outside any MEMORY region "
+                f"at 0x{cursor:08X}")
+        return problems, uncovered
+
+    def _config_overlap(self, start, end, hits, uncovered):
+        """Problem string when one write puts other data into the config words."""
+        # Config words must only ever be written on their own
+        config = sorted((r for r in hits if r.is_config), key=lambda r: r.start)
+        other = sorted({r.name for r in hits if not r.is_config and r.loadable})
+        if config and (other or uncovered):
+            source = ", ".join(other) if other else "unmapped data"
+            return (f"0x{start:08X}-0x{end - 1:08X} overlaps config words "
+                    f"({config[0].name}) from {source}")
+        return None
+
+    def check_range(self, start, end):
+        """Return a list of problem strings for one image range."""
+        hits = self.tree.overlapping(start, end)
+        problems, uncovered = self._check(start, end, hits)
+        overlap = self._config_overlap(start, end, hits, uncovered)
+        return problems + [overlap] if overlap else problems
+
+    def validate(self, ranges):
+        """Problems of an image given as unmerged ranges (one per record/segment).
+
+        Placement is checked on the merged ranges. Config-word overlap is
+        checked on each original range, so a record ending right where the
+        config words start is not mistaken for one write covering both.
+        """
+        ranges = sorted(ranges)
+        problems = []
+        # Original ranges are only rechecked inside merged ranges that reach a config region
+        config_spans = []
+        for start, end in merge_ranges(ranges):
+            hits = self.tree.overlapping(start, end)
+            found, _uncovered = self._check(start, end, hits)
+            problems.extend(found)
+            if any(region.is_config for region in hits):
+                config_spans.append((start, end))
+        for span_start, span_end in config_spans:
+            for start, end in ranges[bisect.bisect_left(ranges, (span_start,)):]:
+                if start >= span_end:
+                    break
+                hits = self.tree.overlapping(start, end)
+                overlap = self._config_overlap(start, end, hits, self._check(start, end, hits)[1])
+                if overlap:
+                    problems.append(overlap)
+        return problems
+
+
+def validate_image(image_path, linker_script, validator=None):
+    """Validate an image file; returns (merged ranges, problems)."""
+    validator = validator or ImageValidator.from_linker_script(linker_script)
+    ranges = load_image_ranges(image_path, merge=False)
+    return merge_ranges(ranges), validator.validate(ranges)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Validate a HEX/ELF image against linker script MEMORY regions")
+    parser.add_argument("image", help="Intel HEX or ELF image to check")
+    parser.add_argument("-l", "--linker-script", required=True,
+                        help="Device linker script (e.g. p32MZ2048EFH064.ld)")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="Only print problems")
+    args = parser.parse_args()
+
+    try:
+        started = time.perf_counter()
+        validator = ImageValidator.from_linker_script(args.linker_script)
+        ranges, problems = validate_image(args.image, args.linker_script, validator)
+        elapsed = (time.perf_counter() - started) * 1000.0
+    except (OSError, HexFormatError, ValidationError, struct.error) as ex:
+        print(f"Error validating image: {ex}")
+        sys.exit(2)
+
+    if problems:
+        print(f"✗ {os.path.basename(args.image)}: {len(problems)} problem(s)")
+        for problem in problems:
+            print(f"  {problem}")
+        sys.exit(1)
+    if not args.quiet:
+        print(f"✓ {os.path.basename(args.image)}: {len(ranges)} ranges fit "
+              f"{len(validator.regions)} MEMORY regions ({elapsed:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
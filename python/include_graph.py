@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Include Graph
+Indexes the #include graph of srcs/ and incs/ and answers reverse-dependency
+queries: which translation units rebuild when a header changes, and what
+that rebuild costs using the compile times of the last TRACE=1 build.
+Changed files are scanned in parallel and every scan is cached by content
+hash; the graph is saved to objs/include_graph.json and can be exported as
+JSON or Graphviz dot.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from build_model import BuildModelError, load_build_model
+from include_paths import INCLUDE_CACHE, IncludeCache, IncludeResolver, scan_includes
+
+GRAPH_FILE = "include_graph.json"
+GRAPH_VERSION = 1
+SOURCE_EXTENSIONS = (".c", ".h", ".S")
+# Below this many changed files a process pool costs more than it saves
+PARALLEL_THRESHOLD = 256
+
+
+def _scan_worker(path):
+    st = os.stat(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    return path, [st.st_size, st.st_mtime_ns], hashlib.sha1(data).hexdigest(), scan_includes(data)
+
+
+def scan_files(cache, paths, jobs=None):
+    """Bring the include cache up to date for paths, scanning changed files in parallel."""
+    stale = []
+    for path in paths:
+        st = os.stat(path)
+        entry = cache.by_path.get(path)
+        if not (entry and entry["stat"] == [st.st_size, st.st_mtime_ns]
+                and entry["sha1"] in cache.by_hash):
+            stale.append(path)
+    if len(stale) < PARALLEL_THRESHOLD:
+        for result in map(_scan_worker, stale):
+            _store(cache, *result)
+        return len(stale)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for result in pool.map(_scan_worker, stale, chunksize=64):
+            _store(cache, *result)
+    return len(stale)
+
+
+def _store(cache, path, stat_key, digest, includes):
+    cache.by_hash.setdefault(digest, [list(item) for item in includes])
+    cache.by_path[path] = {"stat": stat_key, "sha1": digest}
+    cache.dirty = True
+
+
+def project_files(srcs_dir):
+    """.c, .h and .S files under srcs/ and incs/, relative to srcs_dir."""
+    files = []
+    for top in ("../srcs", "../incs"):
+        for dirpath, dirnames, filenames in os.walk(os.path.join(srcs_dir, top)):
+            dirnames.sort()
+            rel = os.path.relpath(dirpath, srcs_dir)
+            files += [os.path.normpath(os.path.join(rel, name)) for name in sorted(filenames)
+                      if name.endswith(SOURCE_EXTENSIONS)]
+    return files
+
+
+def default_search_dirs(srcs_dir):
+    """INCS as srcs/Makefile builds it, for projects that have not been built yet."""
+    dirs = ["../incs"]
+    for dirpath, dirnames, _filenames in os.walk(os.path.join(srcs_dir, "../incs")):
+        depth = os.path.relpath(dirpath, os.path.join(srcs_dir, "../incs")).count(os.sep)
+        if depth >= 3:
+            dirnames[:] = []
+        dirnames.sort()
+        dirs += [os.path.normpath(os.path.relpath(os.path.join(dirpath, d), srcs_dir))
+                 for d in dirnames]
+    return dirs
+
+
+class IncludeGraph:
+    """Forward and reverse include edges between project files.
+
+    Paths are relative to the project root; headers outside the project
+    (DFP, compiler) appear as leaves with their absolute path.
+    """
+
+    def __init__(self, forward, units):
+        self.forward = forward
+        self.units = set(units)
+        self.reverse = {}
+        for path, headers in forward.items():
+            for header in headers:
+                self.reverse.setdefault(header, set()).add(path)
+
+    def dependents(self, path):
+        """Every file that includes path directly or indirectly."""
+        seen = set()
+        stack = [path]
+        while stack:
+            for includer in self.reverse.get(stack.pop(), ()):
+                if includer not in seen:
+                    seen.add(includer)
+                    stack.append(includer)
+        return seen
+
+    def affected_units(self, path):
+        """Translation units that rebuild when path changes."""
+        affected = {p for p in self.dependents(path) if p in self.units}
+        if path in self.units:
+            affected.add(path)
+        return sorted(affected)
+
+    def includes(self, path):
+        """Every file path pulls in directly or indirectly."""
+        seen = set()
+        stack = [path]
+        while stack:
+            for header in self.forward.get(stack.pop(), ()):
+                if header not in seen:
+                    seen.add(header)
+                    stack.append(header)
+        return seen
+
+    def to_dict(self):
+        return {"version": GRAPH_VERSION, "units": sorted(self.units),
+                "forward": {path: sorted(headers) for path, headers in sorted(self.forward.items())}}
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != GRAPH_VERSION:
+            raise ValueError("Unsupported include graph version")
+        return cls({path: set(headers) for path, headers in data["forward"].items()},
+                   data["units"])
+
+    def to_dot(self):
+        lines = ["digraph includes {", "  rankdir=LR;"]
+        for path in sorted(self.units):
+            lines.append(f'  "{path}" [shape=box];')
+        for path, headers in sorted(self.forward.items()):
+            for header in sorted(headers):
+                lines.append(f'  "{path}" -> "{header}";')
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+
+def build_graph(project_root, jobs=None):
+    """Scan the project and return its IncludeGraph; caches scans in objs/."""
+    root = os.path.abspath(project_root)
+    srcs_dir = os.path.join(root, "srcs")
+    try:
+        model = load_build_model(root)
+        search_dirs = model.include_dirs()
+    except BuildModelError:
+        search_dirs = default_search_dirs(srcs_dir)
+
+    cache = IncludeCache(os.path.join(root, "objs", INCLUDE_CACHE))
+    previous = os.getcwd()
+    # Resolve from srcs/ like the compiler, so cache keys match include_paths.py
+    os.chdir(srcs_dir)
+    try:
+        files = project_files(srcs_dir)
+        scan_files(cache, files, jobs)
+        resolver = IncludeResolver(search_dirs, cache)
+        forward = {}
+        for path in files:
+            headers = set()
+            for kind, name in cache.includes(path):
+                if kind == "macro":
+                    continue
+                resolved, _index = resolver.resolve(kind, name, os.path.dirname(path))
+                if resolved is not None:
+                    headers.add(_from_srcs(resolved, srcs_dir, root))
+            forward[_from_srcs(path, srcs_dir, root)] = headers
+    finally:
+        os.chdir(previous)
+    os.makedirs(os.path.join(root, "objs"), exist_ok=True)
+    cache.save()
+    units = [p for p in forward if p.endswith((".c", ".S")) and p.startswith("srcs")]
+    return IncludeGraph(forward, units)
+
+
+def _from_srcs(path, srcs_dir, root):
+    """srcs-relative path -> project-relative path, or absolute when outside."""
+    full = os.path.normpath(os.path.join(srcs_dir, path))
+    rel = os.path.relpath(full, root)
+    return full if rel.startswith("..") else rel.replace("\\", "/")
+
+
+def save_graph(project_root, graph):
+    path = os.path.join(project_root, "objs", GRAPH_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(graph.to_dict(), f)
+    os.replace(tmp_path, path)
+
+
+def load_graph(project_root, refresh=False, jobs=None):
+    """Return the saved graph, (re)building it if asked or missing."""
+    path = os.path.join(project_root, "objs", GRAPH_FILE)
+    if not refresh:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return IncludeGraph.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            pass
+    graph = build_graph(project_root, jobs)
+    save_graph(project_root, graph)
+    return graph
+
+
+def compile_times(project_root):
+    """{unit: seconds} from the last TRACE=1 build, if there was one."""
+    from build_trace import parse_log
+    log = os.path.join(project_root, "other", "build_trace.log")
+    if not os.path.exists(log):
+        return {}
+    srcs_dir = os.path.join(os.path.abspath(project_root), "srcs")
+    times = {}
+    for step in parse_log(log):
+        if step.kind not in ("compile", "assemble"):
+            continue
+        obj = os.path.relpath(os.path.normpath(os.path.join(srcs_dir, step.target)),
+                              os.path.join(os.path.abspath(project_root), "objs"))
+        times[obj[:-2]] = step.duration
+    return times
+
+
+def rebuild_cost(graph, path, times):
+    """(units, known_seconds, units_without_timing) for touching path."""
+    units = graph.affected_units(path)
+    seconds = 0.0
+    unknown = 0
+    for unit in units:
+        key = os.path.splitext(os.path.relpath(unit, "srcs"))[0].replace("\\", "/")
+        if key in times:
+            seconds += times[key]
+        else:
+            unknown += 1
+    return units, seconds, unknown
+
+
+def _normalize(project_root, path):
+    """Accept a path relative to the cwd or the project root."""
+    root = os.path.abspath(project_root)
+    for candidate in (os.path.abspath(path), os.path.join(root, path)):
+        if os.path.exists(candidate):
+            rel = os.path.relpath(candidate, root)
+            return candidate if rel.startswith("..") else rel.replace("\\", "/")
+    return path.replace("\\", "/")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Index the include graph of a PIC32MZ project and query it")
+    parser.add_argument("-p", "--project", default=".", help="Project root (default: .)")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Rescan changed files before answering")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Parallel scan processes (default: CPU count)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("index", help="Scan the project and save the graph")
+    p = sub.add_parser("deps", help="Translation units that depend on a file")
+    p.add_argument("file")
+    p = sub.add_parser("cost", help="Rebuild cost of touching a file")
+    p.add_argument("file")
+    p = sub.add_parser("export", help="Write the graph for other tools")
+    p.add_argument("-f", "--format", choices=("json", "dot"), default="json")
+    p.add_argument("-o", "--output", help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    try:
+        graph = load_graph(args.project, args.refresh or args.command == "index", args.jobs)
+    except OSError as ex:
+        print(f"Error indexing include graph: {ex}")
+        sys.exit(1)
+
+    if args.command == "index":
+        edges = sum(len(headers) for headers in graph.forward.values())
+        print(f"Indexed {len(graph.forward)} files, {len(graph.units)} translation units, "
+              f"{edges} include edges")
+    elif args.command == "deps":
+        target = _normalize(args.project, args.file)
+        for unit in graph.affected_units(target):
+            print(unit)
+    elif args.command == "cost":
+        target = _normalize(args.project, args.file)
+        units, seconds, unknown = rebuild_cost(graph, target, compile_times(args.project))
+        print(f"Touching {target} rebuilds {len(units)} of {len(graph.units)} translation units")
+        if seconds:
+            print(f"  {seconds:.2f} s of compile time in the last traced build"
+                  + (f" ({unknown} unit(s) without timing)" if unknown else ""))
+    else:
+        text = (graph.to_dot() if args.format == "dot"
+                else json.dumps(graph.to_dict(), indent=2) + "\n")
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text)
+        else:
+            sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Include Paths
+Follows the #include graph of every translation unit and works out the
+smallest ordered -I set that resolves each header to the same file the full
+INCS list would. srcs/Makefile uses the result with MIN_INCS=1 as a
+per-object TU_INCS. Header directives are cached by content hash, and
+headers found in more than one include folder are reported as shadowed.
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+
+from build_model import BuildModelError, DEFAULT_CONFIG, config_root, load_build_model
+
+INCLUDE_PATHS_MK = "include_paths.mk"
+INCLUDE_CACHE = "include_cache.json"
+# Bumped whenever scan_includes changes what it records
+CACHE_VERSION = 1
+
+_INCLUDE = re.compile(rb'^[ \t]*#[ \t]*include[ \t]*(?:<([^>\n]+)>|"([^"\n]+)"|(\S+))', re.M)
+_COMMENT = re.compile(rb"/\*.*?\*/", re.S)
+
+
+def scan_includes(data):
+    """Return [(kind, name)] for each #include in data.
+
+    kind is "angle", "quote" or "macro" (a computed include that cannot be
+    followed). Every branch of #if blocks is scanned, so the result is a
+    superset of what the preprocessor opens.
+    """
+    data = _COMMENT.sub(b"", data)
+    includes = []
+    for match in _INCLUDE.finditer(data):
+        angle, quote, macro = match.groups()
+        if angle is not None:
+            includes.append(("angle", angle.decode("utf-8", "replace").strip()))
+        elif quote is not None:
+            includes.append(("quote", quote.decode("utf-8", "replace")))
+        else:
+            includes.append(("macro", macro.decode("utf-8", "replace")))
+    return includes
+
+
+class IncludeCache:
+    """scan_includes results keyed on file content, revalidated by size and mtime."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.by_path = {}
+        self.by_hash = {}
+        self.dirty = False
+        if path:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == CACHE_VERSION:
+                    self.by_path = data["paths"]
+                    self.by_hash = data["hashes"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+    def includes(self, path):
+        st = os.stat(path)
+        stat_key = [st.st_size, st.st_mtime_ns]
+        entry = self.by_path.get(path)
+        if entry and entry["stat"] == stat_key and entry["sha1"] in self.by_hash:
+            return self.by_hash[entry["sha1"]]
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha1(data).hexdigest()
+        if digest not in self.by_hash:
+            self.by_hash[digest] = [list(item) for item in scan_includes(data)]
+        self.by_path[path] = {"stat": stat_key, "sha1": digest}
+        self.dirty = True
+        return self.by_hash[digest]
+
+    def save(self):
+        if not (self.path and self.dirty):
+            return
+        live = {entry["sha1"] for entry in self.by_path.values()}
+        data = {"version": CACHE_VERSION, "paths": self.by_path,
+                "hashes": {k: v for k, v in self.by_hash.items() if k in live}}
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+
+class IncludeResolver:
+    """Resolves includes against an ordered search list the way gcc does."""
+
+    def __init__(self, search_dirs, cache=None):
+        self.search_dirs = list(search_dirs)
+        self.cache = cache or IncludeCache()
+        self._exists = {}
+        self._resolved = {}
+        # name -> indices of every search dir holding it, for shadowing reports
+        self.shadowed = {}
+
+    def _isfile(self, path):
+        found = self._exists.get(path)
+        if found is None:
+            found = self._exists[path] = os.path.isfile(path)
+        return found
+
+    def resolve(self, kind, name, current_dir):
+        """Return (path, search_index); index is None for the includer's folder."""
+        key = (kind, name, current_dir if kind == "quote" else None)
+        if key in self._resolved:
+            return self._resolved[key]
+        result = (None, None)
+        if kind == "quote":
+            local = os.path.normpath(os.path.join(current_dir, name))
+            if self._isfile(local):
+                result = (local, None)
+        if result[0] is None:
+            hits = [index for index, directory in enumerate(self.search_dirs)
+                    if self._isfile(os.path.normpath(os.path.join(directory, name)))]
+            if hits:
+                result = (os.path.normpath(os.path.join(self.search_dirs[hits[0]], name)), hits[0])
+                if len(hits) > 1:
+                    self.shadowed[name] = hits
+        self._resolved[key] = result
+        return result
+
+    def analyze(self, source):
+        """Return the sorted search indices source needs, or None if it must keep all.
+
+        A TU keeps the full list when it has a computed include or a quoted
+        include that no folder provides.
+        """
+        needed = set()
+        visited = set()
+        stack = [os.path.normpath(source)]
+        while stack:
+            path = stack.pop()
+            if path in visited:
+                continue
+            visited.add(path)
+            current_dir = os.path.dirname(path)
+            for kind, name in self.cache.includes(path):
+                if kind == "macro":
+                    return None
+                resolved, index = self.resolve(kind, name, current_dir)
+                if resolved is None:
+                    if kind == "quote":
+                        return None
+                    # Compiler-provided header such as <stdint.h>
+                    continue
+                if index is not None:
+                    needed.add(index)
+                stack.append(resolved)
+        return sorted(needed)
+
+
+def compute_include_paths(model, cache=None):
+    """Return ({object: [dirs]}, resolver) for every C source of the model.
+
+    Objects that must keep the full include list are left out.
+    """
+    previous = os.getcwd()
+    os.chdir(model.directory)
+    try:
+        search_dirs = model.include_dirs()
+        resolver = IncludeResolver(search_dirs, cache)
+        per_object = {}
+        for source in model.sources:
+            needed = resolver.analyze(source)
+            if needed is not None:
+                per_object[model.object_for(source)] = [search_dirs[i] for i in needed]
+        return per_object, resolver
+    finally:
+        os.chdir(previous)
+
+
+def render_mk(per_object):
+    lines = ["# Generated by include_paths.py - do not edit\n"]
+    for obj, dirs in sorted(per_object.items()):
+        flags = " ".join(f'-I"{d}"' for d in dirs)
+        lines.append(f"{obj}: TU_INCS := {flags}\n")
+    return "".join(lines)
+
+
+def write_if_changed(path, text):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == text:
+                # make reruns this while the file looks older than its inputs
+                os.utime(path)
+                return False
+    except OSError:
+        pass
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compute the minimal ordered -I set for every translation unit")
+    parser.add_argument("project", nargs="?", default=".",
+                        help="Project root (default: current directory)")
+    parser.add_argument("--mk", help="Make fragment to write (default: PROJECT/objs/include_paths.mk)")
+    parser.add_argument("--config", default=DEFAULT_CONFIG,
+                        help="Build configuration (default: default)")
+    parser.add_argument("--device", help="Device of a matrix build (MATRIX=1)")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="List shadowed headers and the objects keeping the full list")
+    args = parser.parse_args()
+
+    try:
+        model = load_build_model(args.project, args.config, args.device)
+        root = os.path.abspath(args.project)
+        objs_dir = os.path.join(config_root(root, args.config, args.device), "objs")
+        os.makedirs(objs_dir, exist_ok=True)
+        # Header scans do not depend on flags or device: one cache per project
+        os.makedirs(os.path.join(root, "objs"), exist_ok=True)
+        cache = IncludeCache(os.path.join(root, "objs", INCLUDE_CACHE))
+        per_object, resolver = compute_include_paths(model, cache)
+        cache.save()
+        write_if_changed(args.mk or os.path.join(objs_dir, INCLUDE_PATHS_MK),
+                         render_mk(per_object))
+    except (OSError, BuildModelError) as ex:
+        print(f"Error computing include paths: {ex}")
+        sys.exit(1)
+
+    total = len(resolver.search_dirs)
+    average = (sum(len(d) for d in per_object.values()) / len(per_object)) if per_object else 0
+    print(f"Include paths: {len(per_object)}/{len(model.sources)} objects reduced from "
+          f"{total} to {average:.1f} -I folders on average, "
+          f"{len(resolver.shadowed)} shadowed header(s)")
+    if args.verbose:
+        for name, hits in sorted(resolver.shadowed.items()):
+            folders = ", ".join(resolver.search_dirs[i] for i in hits)
+            print(f"  shadowed  {name}: {folders} (first wins)")
+        kept = set(model.object_for(s) for s in model.sources) - set(per_object)
+        for obj in sorted(kept):
+            print(f"  full list {obj}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+CC := "$(COMPILER_LOCATION)/xc32"
+MCU := -mprocessor=$(DEVICE)
+STD := c90
@@ -0,0 +1,4 @@
+CC := "$(COMPILER_LOCATION)/xc32-gcc"
+MCU := -mprocessor=$(DEVICE)
+STD := c99
+FLAGS := -Werror -Wall -MP -MMD
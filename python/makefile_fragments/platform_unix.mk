@@ -0,0 +1,7 @@
+detected_OS := $(shell uname -s)
+MKDIR = mkdir -p $(1)
+RMDIR = rm -rf $(1)
+RM = rm -f $(1)
+MOVE = if [ -f "$(1)" ]; then mv "$(1)" "$(2)"; fi
+PATH_SEP = /
+NULL_DEVICE = /dev/null
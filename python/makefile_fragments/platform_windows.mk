@@ -0,0 +1,7 @@
+detected_OS := Windows
+MKDIR = if not exist "$(subst /,\,$(1))" mkdir "$(subst /,\,$(1))"
+RMDIR = if exist "$(subst /,\,$(1))" rmdir /s /q "$(subst /,\,$(1))"
+RM = if exist "$(subst /,\,$(1))" del /q "$(subst /,\,$(1))"
+MOVE = if exist "$(subst /,\,$(1))" move "$(subst /,\,$(1))" "$(subst /,\,$(2))"
+PATH_SEP = \\
+NULL_DEVICE = nul
@@ -0,0 +1,25 @@
+# Assign all Include directories dynamically, first run "make build_dir" from terminal.
+# Get all directories under INC_DIR recursively (up to 4 levels deep)
+define get_inc_dirs
+$(sort $(dir $(wildcard $(1)/*/)) $(dir $(wildcard $(1)/*/*/)) $(dir $(wildcard $(1)/*/*/*/)) $(dir $(wildcard $(1)/*/*/*/*/)))
+endef
+
+INC_SUBDIRS := $(call get_inc_dirs,$(INC_DIR))
+# Remove trailing slashes and add -I prefix for each directory
+INC_FLAGS := $(foreach d,$(patsubst %/,%,$(INC_SUBDIRS)),-I"$(d)")
+INCS := -I"$(INC_DIR)" $(INC_FLAGS) -I"$(DFP_INCLUDE)"
+
+
+#Direct the compiler outputs for .o files from .c or .cpp code
+DIRECT_OBJ := $(CC)    -g -x c -c $(MCU)  -ffunction-sections -fdata-sections -O1 -fno-common \
+			$(INCS)  $(FLAGS) -DXPRJ_default=default -mdfp="$(DFP)"
+
+
+# Direct compiler output for linker
+LINKER_SCRIPT := $(DFP)/xc32/$(DEVICE)/p$(DEVICE).ld
+DIRECT_LINK := $(CC)  $(MCU) -nostartfiles -DXPRJ_default=default -mdfp="$(DFP)" 	\
+			-Wl,--defsym=__MPLAB_BUILD=1,--script="$(LINKER_SCRIPT)",--defsym=_min_heap_size=512,--gc-sections,--no-code-in-dinit,--no-dinit-in-serial-mem,-Map="$(OUT_DIR)/production.map",--memorysummary,$(OUT_DIR)/memoryfile.xml \
+
+
+
+
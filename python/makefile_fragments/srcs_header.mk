@@ -0,0 +1,9 @@
+# DFP (Device Family Pack) configuration
+# These variables should be passed from the root Makefile
+DFP_DIR := $(DFP)
+DFP_INCLUDE := $(DFP)/include
+
+# Helper variables for cross-platform compatibility
+space := $(empty) $(empty)
+comma := ,
+
@@ -0,0 +1,30 @@
+# Project directories expected in the project.
+# These directories are created if they do not exist when "make build_dir" is run.
+# The directories are used to store object files, binaries, source files, include files, and other files.
+# The directories are created relative to the project root directory.
+# The project root directory is expected to be one level above the srcs directory.
+# The project root directory is expected to contain the srcs, objs, incs, bins, and other directories.
+# The objs directory is used to store object files.
+# The incs directory is used to store header files.
+# The bins directory is used to store binaries.
+# The other directory is used to store other files such as maps and XML files.
+ROOT     := ..
+OBJ_DIR  := $(ROOT)/objs
+INC_DIR  := $(ROOT)/incs
+BIN_DIR  := $(ROOT)/bins
+SRC_DIR  := $(ROOT)/srcs
+OUT_DIR  := $(ROOT)/other
+
+
+# Source files and object files
+# The source files are expected to be in the srcs directory & sub-directories.
+# The source files are expected to have the .c extension.
+# The object file list is created from the SRCS variable with the .o extension inplaceof the .c extension.
+# Dynamically find all .c files using Make functions (up to 4 levels deep)
+define get_c_files
+$(wildcard $(1)/*.c) $(wildcard $(1)/*/*.c) $(wildcard $(1)/*/*/*.c) $(wildcard $(1)/*/*/*/*.c)
+endef
+SRCS := $(call get_c_files,$(SRC_DIR))
+OBJS := $(SRCS:$(SRC_DIR)/%.c=$(OBJ_DIR)/%.o)
+
+
@@ -0,0 +1,14 @@
+# Define the default target (which is built when make is invoked without any arguments)
+$(BIN_DIR)/$(MODULE): $(OBJS)
+	@echo "Building project for $(DEVICE)"
+	@echo "Linking object files to create the final executable"
+	$(DIRECT_LINK) -o $@ $^
+	@echo "Build complete. Output is in $(BIN_DIR)"
+
+# Compile all source files to object files
+$(OBJ_DIR)/%.o: $(SRC_DIR)/%.c
+	@echo "Compiling $< to $@"
+	@$(call MKDIR,$(dir $@))
+	$(DIRECT_OBJ) -MF $(@:.o=.d) $< -o $@
+	@echo "Object file created: $@"
+
@@ -0,0 +1,105 @@
+
+
+.PHONY: clean build_dir debug help platform
+
+# Show platform-specific configuration
+platform:
+	@echo "Cross-platform build configuration:"
+	@echo "  Detected OS: $(detected_OS)"
+	@echo "  Path separator: $(PATH_SEP)"
+	@echo "  Null device: $(NULL_DEVICE)"
+	@echo "  MKDIR command: $(value MKDIR)"
+	@echo "  RMDIR command: $(value RMDIR)"
+	@echo "  RM command: $(value RM)"
+	@echo "  MOVE command: $(value MOVE)"
+
+# Create the build directories if they do not exist
+# This target is used to create the necessary directories for the build process.
+# It creates the OBJ_DIR, BIN_DIR, SRC_DIR, INC_DIR, and OUT_DIR
+# It also creates subdirectories in OBJ_DIR and INC_DIR for each subdirectory in SRC_DIR
+# This is useful for organizing the build output and include files.
+# To run this target, use: make build_dir
+# Get all directories under SRC_DIR dynamically (similar to how we get source files)
+SRC_DIRS := $(sort $(dir $(wildcard $(SRC_DIR)/*/)) $(dir $(wildcard $(SRC_DIR)/*/*/)) $(dir $(wildcard $(SRC_DIR)/*/*/*/)) $(dir $(wildcard $(SRC_DIR)/*/*/*/*/)))
+# Filter out startup directory from automatic creation and convert to relative paths
+SRC_SUBDIRS := $(sort $(filter-out startup/,$(SRC_DIRS:$(SRC_DIR)/%=%)))
+
+build_dir:
+	@echo "Creating build base directories if they do not exist ($(detected_OS))"
+	@$(call MKDIR,$(OBJ_DIR))
+	@$(call MKDIR,$(BIN_DIR))
+	@$(call MKDIR,$(SRC_DIR))
+	@$(call MKDIR,$(INC_DIR))
+	@$(call MKDIR,$(OUT_DIR))
+	@echo "Creating subdirectories in OBJ_DIR and INC_DIR based on SRC_DIR structure"
+	@$(call MKDIR,$(OBJ_DIR)/startup)
+	@$(foreach subdir,$(SRC_SUBDIRS),$(call MKDIR,$(OBJ_DIR)/$(subdir)) && $(call MKDIR,$(INC_DIR)/$(subdir)) &&) echo "Created peripheral directories"
+	@echo "Moving header files from src subdirectories to corresponding inc subdirectories"
+	@$(foreach subdir,$(SRC_SUBDIRS),$(foreach header,$(wildcard $(SRC_DIR)/$(subdir)*.h),$(call MOVE,$(header),$(INC_DIR)/$(subdir)) &&)) echo "Headers moved"
+	@echo "Build directories created successfully"
+
+# Display the source files, object files, and include directories
+debug:
+	@echo "Build system debug info ($(detected_OS)):"
+	@echo "Source files:"
+	@$(foreach src,$(SRCS),echo "  $(src)" &&) echo ""
+	@echo "Object files:"
+	@$(foreach obj,$(OBJS),echo "  $(obj)" &&) echo ""
+	@echo "Include directories:"
+	@$(foreach inc,$(subst -I",,$(subst ",,$(INCS))),echo "  -I\"$(inc)\"" &&) echo ""
+	@echo "Include subdirectories found:"
+	@$(foreach dir,$(INC_SUBDIRS),echo "  $(dir)" &&) echo ""
+	@echo "Include flags generated:"
+	@$(foreach flag,$(INC_FLAGS),echo "  $(flag)" &&) echo ""
+	@echo "Source subdirectories found:"
+	@$(foreach dir,$(SRC_SUBDIRS),echo "  $(dir)" &&) echo ""
+	@echo "DFP Include path:"
+	@echo "  $(DFP_INCLUDE)"
+	@echo "Linker script:"
+	@echo "  $(LINKER_SCRIPT)"
+
+
+# For xc32 Compiler help with less use: make help less
+# For xc32 Compiler help without less use: make help
+help:
+	@echo "Displaying help information for xc32-gcc"
+ifeq ($(filter less,$(MAKECMDGOALS)),less)
+	xc32-gcc --help | less
+else
+	xc32-gcc --help
+endif
+
+
+
+
+
+clean:
+	@echo "Cleaning up object files and binaries ($(detected_OS))"
+	@$(call RM,$(BIN_DIR)/*) 2>$(NULL_DEVICE) || true
+	@$(call RMDIR,$(OBJ_DIR)) 2>$(NULL_DEVICE) || true
+	@$(call MKDIR,$(OBJ_DIR))
+	@$(call RM,$(OUT_DIR)/*) 2>$(NULL_DEVICE) || true
+	@echo "Clean complete."
+
+
+define clear_build_dir
+	-@rm -rf $(BIN_DIR)/* $(OBJ_DIR)/* $(OUT_DIR)/* 2>/dev/null || true
+endef
+
+
+
+##################################################################################################
+##                       Table 5-6. Kind-of-Output Control Options								##
+##################################################################################################
+# Option      |  Definition
+# -----------------------------------------------------------------------------------------------
+# -c          |  Stop compilation before the link step, producing an intermediate file.
+# -E          |  Stop compilation after preprocessing, producing a preprocessed file.
+# --help      |  Print a description of the command line options.
+# -o file     |Place the output in a file with the specified name.
+# -S          |  Stop compilation before the assembly step, producing an assembly file output.
+# -specs=file |  Overrides the standard specs file.
+# -v          |  Print the commands executed during each stage of compilation.
+# --version   |  Show version information then quit.
+# -x          |  Specify the language of a source file regardless of its file extension.
+#################################################################################################
@@ -0,0 +1,8 @@
+DIRECT_ASM :=   -c  -DXPRJ_default=default    -Wa,--defsym=__MPLAB_BUILD=1,-MD=$(OBJ_DIR)/startup/startup.o.asm.d,--gdwarf-2 -mdfp="$(DFP)" -MMD -MF $(OBJ_DIR)/startup/startup.o.d
+
+$(OBJ_DIR)/%.o: $(SRC_DIR)/%.S
+	@echo "Compiling assembly file $< to object file $@"
+	@$(call MKDIR,$(dir $@))
+	$(CC) $(MCU) $(DIRECT_ASM) -o $@ $<
+	@echo "Object file created: $@"
+
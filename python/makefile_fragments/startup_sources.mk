@@ -0,0 +1,17 @@
+# The assembly files are expected to be in the srcs directory & sub-directories.
+# Dynamically find all .S files using Make functions (up to 4 levels deep)
+define get_s_files
+$(wildcard $(1)/*.S) $(wildcard $(1)/*/*.S) $(wildcard $(1)/*/*/*.S) $(wildcard $(1)/*/*/*/*.S)
+endef
+ASM := $(call get_s_files,$(SRC_DIR))
+ASMS := $(ASM:$(SRC_DIR)/%.S=$(OBJ_DIR)/%.o)
+
+# The assembly object files are created from the ASM variable with the .o extension inplace of the .S extension.
+# The assembly object files are added to the OBJS variable.
+# This allows the assembly files to be compiled and linked with the C source files.
+# The assembly files are expected to be in the srcs directory & sub-directories.
+# The assembly files are expected to have the .S extension.
+# The assembly files are expected to be compiled with the same compiler as the C source files.
+# The assembly files are expected to be compiled with the same flags as the C source files.
+OBJS += $(ASMS)
+
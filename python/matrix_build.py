@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Matrix Build
+Builds one project for several devices at the same time, each into
+build/<config>/<device>/ (MATRIX=1). Work that does not depend on the device
+runs once up front: the include graph scan fills the shared header cache in
+objs/, and the compiler is probed once for objs/toolchain.mk. Run from make
+(`make matrix -j`) the device builds share make's jobserver; otherwise -j is
+split between them. Ends with image size and build time per device.
+"""
+
+import os
+import re
+import sys
+import time
+import glob
+import argparse
+import subprocess
+import threading
+
+from build_model import DEFAULT_CONFIG, config_root
+
+# Variables the matrix sets itself for every device build
+MATRIX_VARIABLES = ("DEVICE", "DEVICES", "CONFIG", "MATRIX")
+_FLASH_KB = re.compile(r"32MZ(\d{4})", re.I)
+
+
+def parse_devices(text):
+    """Device names from a space or comma separated list, in order, without repeats."""
+    devices = []
+    for name in re.split(r"[\s,]+", text.strip()):
+        if name and name not in devices:
+            devices.append(name)
+    return devices
+
+
+def flash_size(device):
+    """Program flash in bytes from the part number (32MZ2048... -> 2 MB), or None."""
+    match = _FLASH_KB.search(device)
+    return int(match.group(1)) * 1024 if match else None
+
+
+def prepare_shared(root, cc, log=print):
+    """Device-independent work done once for the whole matrix."""
+    from include_graph import build_graph, save_graph
+    started = time.monotonic()
+    os.makedirs(os.path.join(root, "objs"), exist_ok=True)
+    graph = build_graph(root)
+    save_graph(root, graph)
+    done = [f"{len(graph.forward)} files scanned"]
+    if cc:
+        from toolchain_cache import TOOLCHAIN_MK, ToolchainError, load_toolchain, render_mk
+        from include_paths import write_if_changed
+        try:
+            info = load_toolchain(cc)
+            write_if_changed(os.path.join(root, "objs", TOOLCHAIN_MK), render_mk(info, cc))
+            done.append(f"toolchain {info.version or info.target or 'probed'}")
+        except (OSError, ToolchainError) as ex:
+            # Every device build would fail the same way, make reports it there
+            done.append(f"toolchain not probed ({ex})")
+    log(f"Shared: {', '.join(done)} in {time.monotonic() - started:.2f} s")
+
+
+class DeviceBuild:
+    """One device of the matrix: its make process, log and results."""
+
+    def __init__(self, root, config, device):
+        self.device = device
+        self.tree = config_root(root, config, device)
+        self.log_path = os.path.join(self.tree, "other", "matrix_build.log")
+        self.status = None
+        self.elapsed = 0.0
+        self.image_bytes = None
+
+    def run(self, command, env):
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        started = time.monotonic()
+        with open(self.log_path, "w", encoding="utf-8") as log:
+            # close_fds=False keeps a classic jobserver's pipe open for make
+            self.status = subprocess.call(command, stdout=log, stderr=subprocess.STDOUT,
+                                          env=env, close_fds=False)
+        self.elapsed = time.monotonic() - started
+        self.image_bytes = self._image_bytes()
+
+    def _image_bytes(self):
+        from image_validator import ValidationError, load_image_ranges
+        images = sorted(glob.glob(os.path.join(self.tree, "bins", "*.hex")))
+        if self.status != 0 or not images:
+            return None
+        try:
+            return sum(end - start for start, end in load_image_ranges(images[0]))
+        except (OSError, ValueError, ValidationError):
+            return None
+
+    def tail(self, lines=15):
+        try:
+            with open(self.log_path, "r", encoding="utf-8", errors="replace") as f:
+                return f.read().splitlines()[-lines:]
+        except OSError:
+            return []
+
+
+def _under_jobserver(env):
+    flags = env.get("MAKEFLAGS", "")
+    return "--jobserver-auth" in flags or "--jobserver-fds" in flags
+
+
+def run_matrix(root, devices, config, make, jobs, make_args, log=print):
+    """Build every device concurrently; returns the DeviceBuild list in device order."""
+    env = dict(os.environ)
+    jobserver = _under_jobserver(env)
+    if jobserver:
+        parallel = []
+    else:
+        for name in ("MAKEFLAGS", "MFLAGS", "MAKELEVEL"):
+            env.pop(name, None)
+        parallel = [f"-j{max(1, jobs // len(devices))}"]
+    make_args = [arg for arg in make_args if arg.partition("=")[0] not in MATRIX_VARIABLES]
+    builds = [DeviceBuild(root, config, device) for device in devices]
+    threads = []
+    for build in builds:
+        command = [make, "-C", root, "all", *parallel, *make_args,
+                   f"DEVICE={build.device}", f"CONFIG={config}", "MATRIX=1"]
+        thread = threading.Thread(target=build.run, args=(command, env))
+        thread.start()
+        threads.append(thread)
+    log(f"Building {len(devices)} device(s) ({config}) "
+        + ("on make's jobserver" if jobserver else f"with {parallel[0]} each"))
+    for thread, build in zip(threads, builds):
+        thread.join()
+        log(f"  {build.device}: {'ok' if build.status == 0 else 'FAILED'} "
+            f"in {build.elapsed:.2f} s")
+    return builds
+
+
+def format_summary(builds):
+    rows = [("Device", "Result", "Time", "Image", "Flash")]
+    for build in builds:
+        size = flash_size(build.device)
+        image = "-" if build.image_bytes is None else f"{build.image_bytes:,} B"
+        used = ("-" if build.image_bytes is None or not size
+                else f"{100.0 * build.image_bytes / size:.1f}%")
+        rows.append((build.device, "ok" if build.status == 0 else "FAILED",
+                     f"{build.elapsed:.2f} s", image, used))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    lines = []
+    for index, row in enumerate(rows):
+        lines.append("  ".join(cell.ljust(width) if i < 2 else cell.rjust(width)
+                               for i, (cell, width) in enumerate(zip(row, widths))))
+        if index == 0:
+            lines.append("  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build a PIC32MZ project for several devices at once")
+    parser.add_argument("project", nargs="?", default=".",
+                        help="Project root (default: current directory)")
+    parser.add_argument("--devices", required=True,
+                        help="Devices to build, space or comma separated")
+    parser.add_argument("--config", default=DEFAULT_CONFIG,
+                        help="Build configuration (default: default)")
+    parser.add_argument("--cc", help="Compiler to probe once for every device (xc32-gcc)")
+    parser.add_argument("--make", default="make", help="make executable (default: make)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Parallel jobs for all devices together outside make "
+                             "(default: CPU count)")
+    parser.epilog = "Arguments after -- are passed to every device build, e.g. -- UNITY=1"
+    argv = sys.argv[1:]
+    make_args = []
+    if "--" in argv:
+        make_args = argv[argv.index("--") + 1:]
+        argv = argv[:argv.index("--")]
+    args = parser.parse_args(argv)
+
+    root = os.path.abspath(args.project)
+    devices = parse_devices(args.devices)
+    if not devices:
+        print("Error starting matrix build: no devices given")
+        sys.exit(1)
+    sys.stdout.reconfigure(line_buffering=True)
+    started = time.monotonic()
+    try:
+        prepare_shared(root, args.cc)
+        builds = run_matrix(root, devices, args.config, args.make, args.jobs, make_args)
+    except OSError as ex:
+        print(f"Error in matrix build: {ex}")
+        sys.exit(1)
+
+    for build in builds:
+        if build.status != 0:
+            print(f"\n--- {build.device} failed, last lines of "
+                  f"{os.path.relpath(build.log_path, root)}:")
+            print("\n".join(build.tail()))
+    print()
+    print(format_summary(builds))
+    print(f"\nMatrix of {len(builds)} device(s) built in {time.monotonic() - started:.2f} s")
+    if any(build.status != 0 for build in builds):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Object Pool
+Compiler launcher that lets build configurations share objects. srcs/Makefile
+runs every C compile as `object_pool.py --pool DIR -- xc32-gcc ...`. The
+command line without its -o and -MF paths, the compiler binary and the
+working folder select a manifest; each manifest entry lists the source and
+headers the object was built from (size, mtime and sha1, taken from the .d
+file). When every file of an entry still matches, the pooled object and
+dependency file are copied into place instead of compiling, so a debug and a
+profiling configuration with the same flags compile each unit once.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import subprocess
+
+POOL_VERSION = 1
+# Header sets kept per command line; older ones are dropped first
+MAX_ENTRIES = 16
+# Arguments whose value names an output, not an input
+OUTPUT_OPTIONS = ("-o", "-MF")
+STAMP_MARGIN_NS = 10_000_000
+
+
+def _sha1_file(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def split_outputs(args):
+    """(key arguments, {option: value}) with the OUTPUT_OPTIONS values taken out."""
+    key_args = []
+    outputs = {}
+    it = iter(args)
+    for arg in it:
+        key_args.append(arg)
+        if arg in OUTPUT_OPTIONS:
+            outputs[arg] = next(it, "")
+    return key_args, outputs
+
+
+def command_key(args, cwd):
+    """Manifest key: compiler binary identity, working folder and the flags."""
+    compiler = shutil.which(args[0]) or args[0]
+    try:
+        st = os.stat(compiler)
+        identity = [os.path.abspath(compiler), st.st_size, st.st_mtime_ns]
+    except OSError:
+        identity = [compiler]
+    key_args, _outputs = split_outputs(args[1:])
+    text = json.dumps([POOL_VERSION, identity, cwd, key_args])
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _file_state(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns, _sha1_file(path)]
+
+
+def _matches(files):
+    """True when every recorded dependency still has the recorded content."""
+    for path, (size, mtime_ns, sha1) in files.items():
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if st.st_size != size:
+            return False
+        if st.st_mtime_ns != mtime_ns and _sha1_file(path) != sha1:
+            return False
+    return True
+
+
+class ObjectPool:
+    """Manifests and objects under one pool folder, safe for parallel makes."""
+
+    def __init__(self, path):
+        self.path = path
+        self.manifests = os.path.join(path, "manifests")
+        self.objects = os.path.join(path, "objects")
+
+    def _manifest_path(self, key):
+        return os.path.join(self.manifests, key[:2], key + ".json")
+
+    def _load(self, key):
+        try:
+            with open(self._manifest_path(key), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return []
+        return data.get("entries", []) if data.get("version") == POOL_VERSION else []
+
+    def _write(self, path, data, mode="w"):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, mode) as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def lookup(self, key):
+        """The stored entry whose dependencies all match, else None."""
+        for entry in self._load(key):
+            if _matches(entry["files"]):
+                return entry
+        return None
+
+    def restore(self, entry, obj, depfile):
+        """Copy a pooled object (and its .d, retargeted to obj) into place."""
+        stored = os.path.join(self.objects, entry["object"][:2], entry["object"])
+        shutil.copyfile(stored + ".o", obj)
+        # make compares mtimes, the copy must look freshly built
+        os.utime(obj)
+        if depfile:
+            with open(stored + ".d", "r", encoding="utf-8") as f:
+                text = f.read()
+            if text.startswith(entry["target"] + ":"):
+                text = obj + text[len(entry["target"]):]
+            self._write(depfile, text)
+
+    def store(self, key, obj, depfile, started_ns):
+        """Record a fresh compile; skipped when an input changed during it."""
+        # Only misses pay for this import, hits stay at interpreter start-up
+        from build_model import parse_depfile
+        deps = parse_depfile(depfile) if depfile else None
+        if deps is None:
+            return False
+        files = {}
+        for dep in deps:
+            state = _file_state(dep)
+            if state[1] >= started_ns:
+                return False
+            files[dep] = state
+        digest = hashlib.sha1(json.dumps([key, sorted(files.items())]).encode("utf-8")).hexdigest()
+        stored = os.path.join(self.objects, digest[:2], digest)
+        with open(obj, "rb") as f:
+            self._write(stored + ".o", f.read(), "wb")
+        with open(depfile, "r", encoding="utf-8") as f:
+            self._write(stored + ".d", f.read())
+        entries = [e for e in self._load(key) if e["object"] != digest]
+        entries.insert(0, {"object": digest, "target": obj, "files": files})
+        self._write(self._manifest_path(key),
+                    json.dumps({"version": POOL_VERSION, "entries": entries[:MAX_ENTRIES]}))
+        return True
+
+    def stats(self):
+        """(manifests, objects, bytes) currently in the pool."""
+        manifests = objects = size = 0
+        for folder, _dirs, files in os.walk(self.path):
+            for name in files:
+                if name.endswith(".json"):
+                    manifests += 1
+                elif name.endswith(".o"):
+                    objects += 1
+                    size += os.path.getsize(os.path.join(folder, name))
+        return manifests, objects, size
+
+
+def compile_pooled(pool, args):
+    """Run one compile through the pool; returns the compiler's exit status."""
+    _key_args, outputs = split_outputs(args[1:])
+    obj = outputs.get("-o")
+    depfile = outputs.get("-MF")
+    if not obj:
+        return subprocess.call(args)
+    try:
+        key = command_key(args, os.getcwd())
+        entry = pool.lookup(key)
+        if entry is not None:
+            pool.restore(entry, obj, depfile)
+            print(f"Reused {obj} from the object pool")
+            return 0
+    except (OSError, ValueError, KeyError):
+        key = None  # a damaged pool never fails the build, it just compiles
+    # Headers saved during the compile (or in the same timestamp tick) may not
+    # match the object, such results are not pooled
+    started_ns = int(time.time() * 1e9) - STAMP_MARGIN_NS
+    status = subprocess.call(args)
+    if status == 0 and key is not None:
+        try:
+            pool.store(key, obj, depfile, started_ns)
+        except (OSError, ValueError):
+            pass
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Reuse objects compiled with the same flags and inputs across configurations",
+        epilog="Usage in a compile rule: object_pool.py --pool DIR -- xc32-gcc -c ... -o obj")
+    parser.add_argument("--pool", required=True, help="Pool folder (e.g. build/pool)")
+    parser.add_argument("--stats", action="store_true", help="Print the pool size and exit")
+    parser.add_argument("--clear", action="store_true", help="Empty the pool and exit")
+    argv = sys.argv[1:]
+    command = []
+    if "--" in argv:
+        command = argv[argv.index("--") + 1:]
+        argv = argv[:argv.index("--")]
+    args = parser.parse_args(argv)
+    pool = ObjectPool(args.pool)
+
+    if args.clear:
+        shutil.rmtree(args.pool, ignore_errors=True)
+        print(f"Object pool {args.pool} cleared")
+        return
+    if args.stats:
+        manifests, objects, size = pool.stats()
+        print(f"Object pool {args.pool}: {objects} objects ({size / 1024:.1f} KiB) "
+              f"for {manifests} command lines")
+        return
+    if not command:
+        parser.error("no compiler command after --")
+    try:
+        sys.exit(compile_pooled(pool, command))
+    except OSError as ex:
+        print(f"Error running compiler: {ex}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
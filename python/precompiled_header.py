@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Precompiled Header
+Builds a precompiled prefix header (.gch) for the DFP and project-wide
+headers once per compiler, device, DFP and flags combination. Each
+combination gets its own folder under the cache, so switching DEVICE or
+flags back and forth reuses earlier builds. With PCH=1 srcs/Makefile runs
+this to remake its --stamp makefile and force-includes the header recorded
+there.
+"""
+
+import os
+import sys
+import json
+import shlex
+import shutil
+import hashlib
+import argparse
+import subprocess
+
+PREFIX_HEADER = "pch.h"
+# States of the headers the .gch was built from, next to it
+DEPS_FILE = "deps.json"
+# Bumped whenever the prefix header layout or key inputs change
+PCH_VERSION = 2
+
+
+def _read(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def include_dirs(flags):
+    """-I directories from a compiler flag string, in search order."""
+    dirs = []
+    tokens = shlex.split(flags, posix=os.name != "nt")
+    for index, token in enumerate(tokens):
+        if token == "-I" and index + 1 < len(tokens):
+            dirs.append(tokens[index + 1].strip('"'))
+        elif token.startswith("-I"):
+            dirs.append(token[2:].strip('"'))
+    return dirs
+
+
+def resolve_header(name, search_dirs):
+    """Return the path the compiler would pick for #include <name>, or None."""
+    for directory in search_dirs:
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def render_prefix(headers):
+    lines = ["/* Precompiled prefix header generated by precompiled_header.py */\n"]
+    lines += [f"#include <{name}>\n" for name in headers]
+    return "".join(lines)
+
+
+def pch_key(cc, flags, headers):
+    """Folder name for a compiler, flags and header list combination.
+
+    The compiler binary contributes its path, size and mtime; the DFP
+    version is part of the include paths in the flags. The headers the
+    .gch was built from are checked separately (see deps_match).
+    """
+    digest = hashlib.sha1()
+    digest.update(f"v{PCH_VERSION}\0{cc}\0{flags}\0{' '.join(headers)}\0".encode("utf-8"))
+    try:
+        st = os.stat(shutil.which(cc) or cc)
+        digest.update(f"{st.st_size}\0{st.st_mtime_ns}\0".encode("utf-8"))
+    except OSError:
+        digest.update(b"missing\0")
+    return digest.hexdigest()[:16]
+
+
+def _sha1_file(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def dependency_states(paths):
+    """{path: [size, mtime_ns, sha1]} of every dependency that exists."""
+    states = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+            states[path] = [st.st_size, st.st_mtime_ns, _sha1_file(path)]
+        except OSError:
+            continue
+    return states
+
+
+def deps_match(states):
+    """True when every recorded dependency still has the recorded content."""
+    if not states:
+        return False
+    for path, (size, mtime_ns, sha1) in states.items():
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if st.st_size != size:
+            return False
+        if st.st_mtime_ns != mtime_ns and _sha1_file(path) != sha1:
+            return False
+    return True
+
+
+def _load_deps(final_dir):
+    try:
+        with open(os.path.join(final_dir, DEPS_FILE), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data.get("files") if data.get("version") == PCH_VERSION else None
+
+
+def build_pch(cc, flags_file, headers, cache_dir, log=print):
+    """Return the prefix header path for this combination, building it if needed.
+
+    A cached .gch is reused while every header in its dependency file (all
+    transitive includes, DFP and compiler headers too) is unchanged.
+    """
+    flags_data = _read(flags_file)
+    if flags_data is None:
+        raise OSError(f"Cannot read compiler flags from {flags_file}")
+    flags = flags_data.decode("utf-8").strip()
+    key = pch_key(cc, flags, headers)
+    final_dir = os.path.join(cache_dir, key)
+    header = os.path.join(final_dir, PREFIX_HEADER)
+    if os.path.exists(header + ".gch") and deps_match(_load_deps(final_dir)):
+        return header
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_dir = f"{final_dir}.{os.getpid()}.tmp"
+    os.makedirs(tmp_dir, exist_ok=True)
+    tmp_header = os.path.join(tmp_dir, PREFIX_HEADER)
+    depfile = tmp_header + ".d"
+    with open(tmp_header, "w", encoding="utf-8") as f:
+        f.write(render_prefix(headers))
+    log(f"Building precompiled header {key} for {', '.join(headers)}")
+    # xc32-gcc reads the flags from the response file itself
+    result = subprocess.run([cc, "-x", "c-header", f"@{flags_file}", "-MD", "-MF", depfile,
+                             tmp_header, "-o", tmp_header + ".gch"])
+    if result.returncode != 0 or not os.path.exists(tmp_header + ".gch"):
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise RuntimeError(f"{os.path.basename(cc)} failed to build the precompiled header")
+
+    from build_model import parse_depfile
+    # The prefix header itself lives in tmp_dir and is recreated on every build
+    deps = [path for path in parse_depfile(depfile) or ()
+            if os.path.dirname(os.path.abspath(path)) != os.path.abspath(tmp_dir)]
+    if not deps:
+        # No usable dependency file: fall back to the top-level headers
+        search_dirs = include_dirs(flags)
+        deps = [resolve_header(name, search_dirs) or name for name in headers]
+    deps.append(shutil.which(cc) or cc)
+    with open(os.path.join(tmp_dir, DEPS_FILE), "w", encoding="utf-8") as f:
+        json.dump({"version": PCH_VERSION, "files": dependency_states(deps)}, f)
+
+    stale_dir = f"{final_dir}.{os.getpid()}.old"
+    try:
+        if os.path.isdir(final_dir):
+            # Out of date: move it aside so the rename below can take its place
+            os.rename(final_dir, stale_dir)
+        os.rename(tmp_dir, final_dir)
+    except OSError:
+        # Another build finished the same key first; use theirs
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    shutil.rmtree(stale_dir, ignore_errors=True)
+    return header
+
+
+def write_stamp(stamp, header):
+    """Record the active header as a makefile setting PCH_HEADER.
+
+    Only rewritten on change, so make starts over and the objects rebuild
+    once. An empty header means compiling without one.
+    """
+    header = header.replace("\\", "/")
+    text = f"PCH_HEADER := {header}\n"
+    if _read(stamp) == text.encode("utf-8"):
+        return
+    os.makedirs(os.path.dirname(stamp) or ".", exist_ok=True)
+    with open(stamp, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build or reuse a precompiled prefix header for xc32-gcc")
+    parser.add_argument("--cc", required=True, help="Path to xc32-gcc")
+    parser.add_argument("--flags-file", required=True,
+                        help="Response file holding the compile flags")
+    parser.add_argument("--headers", default="xc.h",
+                        help="Space separated headers to precompile (default: xc.h)")
+    parser.add_argument("--cache", required=True, help="Folder holding one subfolder per key")
+    parser.add_argument("--stamp",
+                        help="Makefile recording the active header, changes whenever it does")
+    args = parser.parse_args()
+
+    # Make reads stdout as the header path, so progress goes to stderr
+    def log(message):
+        print(message, file=sys.stderr)
+
+    try:
+        header = build_pch(args.cc, args.flags_file, args.headers.split(), args.cache, log)
+        if args.stamp:
+            write_stamp(args.stamp, header)
+    except (OSError, RuntimeError) as ex:
+        log(f"Error building precompiled header: {ex}")
+        if args.stamp:
+            log("Compiling without a precompiled header")
+            write_stamp(args.stamp, "")
+        sys.exit(1)
+    print(header.replace("\\", "/"))
+
+
+if __name__ == "__main__":
+    main()
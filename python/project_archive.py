@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Project Archive
+Writes a generation plan straight into a tar, tar.gz or zip stream instead of
+the disk, for CI jobs that only want the project as an artifact. File
+contents come from the DependencyCache and the templates, one file at a time,
+so memory stays bounded by the largest file; the stream may be stdout or any
+other non-seekable file. The archive holds <project_name>/ with the same
+files (and .pic32gen manifest) a normal generation creates.
+"""
+
+import io
+import os
+import sys
+import time
+
+from project_manifest import manifest_entries
+
+ARCHIVE_FORMATS = ("tar", "tgz", "zip")
+_SUFFIXES = ((".tar.gz", "tgz"), (".tgz", "tgz"), (".tar", "tar"), (".zip", "zip"))
+
+
+class ArchiveError(Exception):
+    """Raised when a plan cannot be archived."""
+
+
+def format_for(path, default="tar"):
+    """Archive format from a file name suffix, else default."""
+    for suffix, fmt in _SUFFIXES:
+        if path.lower().endswith(suffix):
+            return fmt
+    return default
+
+
+def _mtime():
+    # Reproducible archives for CI caches when SOURCE_DATE_EPOCH is set
+    return int(os.environ.get("SOURCE_DATE_EPOCH") or time.time())
+
+
+def iter_plan_entries(plan, cache=None, log=print):
+    """Yield (relative_path, bytes or None for a directory) for the whole project."""
+    for directory in plan.directories:
+        yield directory, None
+    for planned in plan.files:
+        data = planned.source.read(cache)
+        if data is None:
+            log(f"Source {planned.label} not found at {planned.source.path}")
+            continue
+        yield planned.path, data
+    yield from manifest_entries(plan, cache)
+
+
+class _TarWriter:
+    def __init__(self, out, compress):
+        # tarfile and zipfile are imported on use to keep generator startup fast
+        import tarfile
+        self.tarfile = tarfile
+        self.tar = tarfile.open(fileobj=out, mode="w|gz" if compress else "w|",
+                                format=tarfile.PAX_FORMAT)
+        self.mtime = _mtime()
+
+    def add(self, name, data):
+        info = self.tarfile.TarInfo(name)
+        info.mtime = self.mtime
+        if data is None:
+            info.type = self.tarfile.DIRTYPE
+            info.mode = 0o755
+            self.tar.addfile(info)
+        else:
+            info.mode = 0o644
+            info.size = len(data)
+            self.tar.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self.tar.close()
+
+
+class _ZipWriter:
+    def __init__(self, out):
+        import zipfile
+        self.zipfile = zipfile
+        # zipfile writes data descriptors when out cannot seek (a pipe)
+        self.zip = zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED)
+        self.date_time = time.localtime(_mtime())[:6]
+
+    def add(self, name, data):
+        if data is None:
+            info = self.zipfile.ZipInfo(name + "/", self.date_time)
+            info.external_attr = (0o40755 << 16) | 0x10
+            self.zip.writestr(info, b"")
+        else:
+            info = self.zipfile.ZipInfo(name, self.date_time)
+            info.external_attr = 0o644 << 16
+            info.compress_type = self.zipfile.ZIP_DEFLATED
+            self.zip.writestr(info, data)
+
+    def close(self):
+        self.zip.close()
+
+
+def archive_plan(plan, out, fmt="tar", cache=None, log=print):
+    """Stream the plan into out as fmt; returns the archived relative paths."""
+    if fmt not in ARCHIVE_FORMATS:
+        raise ArchiveError(f"unknown archive format {fmt!r} (use {', '.join(ARCHIVE_FORMATS)})")
+    writer = _ZipWriter(out) if fmt == "zip" else _TarWriter(out, fmt == "tgz")
+    prefix = plan.spec.project_name
+    written = []
+    try:
+        writer.add(prefix, None)
+        for path, data in iter_plan_entries(plan, cache, log):
+            writer.add(f"{prefix}/{path}", data)
+            written.append(path)
+    finally:
+        writer.close()
+    log(f"Archived {len(written)} entries of {prefix} as {fmt}")
+    return written
+
+
+def open_output(path):
+    """Binary stream for path, "-" being stdout."""
+    if path == "-":
+        return sys.stdout.buffer, False
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    return open(path, "wb"), True
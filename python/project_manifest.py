@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Project Manifest
+Records a hash of every file the generator emits so existing projects can be
+regenerated: untouched files are rewritten from the current dependancies,
+user-edited files get a three-way merge
+"""
+
+import os
+import re
+import sys
+import json
+import difflib
+import hashlib
+import argparse
+
+from generator_fs import DISK
+from project_plan import ProjectSpec, DEFAULT_DEVICE, plan_project
+
+MANIFEST_DIR = ".pic32gen"
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _manifest_path(root):
+    return os.path.join(root, MANIFEST_DIR, MANIFEST_FILE)
+
+
+def _base_path(root, rel_path):
+    return os.path.join(root, MANIFEST_DIR, "base", rel_path)
+
+
+def _write_atomic(path, data, fs=DISK):
+    fs.makedirs(os.path.dirname(path))
+    tmp_path = path + ".tmp"
+    fs.write_bytes(tmp_path, data)
+    fs.replace(tmp_path, path)
+
+
+def _read(path, fs=DISK):
+    try:
+        return fs.read_bytes(path)
+    except OSError:
+        return None
+
+
+def load_manifest(root, fs=DISK):
+    """Return the manifest dict for a project, or None if it has none."""
+    data = _read(_manifest_path(root), fs)
+    if data is None:
+        return None
+    manifest = json.loads(data)
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def save_manifest(root, manifest, fs=DISK):
+    _write_atomic(_manifest_path(root),
+                  json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"), fs)
+
+
+def _spec_to_dict(spec):
+    return {"project_name": spec.project_name, "device": spec.device,
+            "include_startup": spec.include_startup}
+
+
+def record_manifest(plan, results, cache=None, fs=DISK):
+    """Add the files created by apply_plan to the project manifest.
+
+    The generated content of each file is kept under .pic32gen/base so a
+    later regeneration has the common ancestor for a three-way merge.
+    """
+    root = plan.spec.project_root
+    manifest = load_manifest(root, fs) or {"version": MANIFEST_VERSION, "files": {}}
+    manifest["spec"] = _spec_to_dict(plan.spec)
+    actions = dict(results)
+    for planned in plan.files:
+        if actions.get(planned.path) != "created":
+            continue
+        data = planned.source.read(cache)
+        _write_atomic(_base_path(root, planned.path), data, fs)
+        manifest["files"][planned.path] = {"sha256": sha256(data),
+                                           "source": planned.source.describe()}
+    save_manifest(root, manifest, fs)
+    return manifest
+
+
+def manifest_entries(plan, cache=None):
+    """Yield (relative_path, bytes) of the .pic32gen folder for a fresh project.
+
+    Used when the project is written somewhere other than its root (an
+    archive); every planned file counts as created. One file is held at a time.
+    """
+    manifest = {"version": MANIFEST_VERSION, "files": {}, "spec": _spec_to_dict(plan.spec)}
+    for planned in plan.files:
+        data = planned.source.read(cache)
+        if data is None:
+            continue
+        manifest["files"][planned.path] = {"sha256": sha256(data),
+                                           "source": planned.source.describe()}
+        yield f"{MANIFEST_DIR}/base/{planned.path}", data
+    yield (f"{MANIFEST_DIR}/{MANIFEST_FILE}",
+           json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+
+
+def _hunks(base, other):
+    """Return (base_start, base_end, replacement_lines) for each change."""
+    matcher = difflib.SequenceMatcher(None, base, other, autojunk=False)
+    return [(i1, i2, other[j1:j2])
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"]
+
+
+def _apply_hunks(base, start, end, hunks):
+    lines = []
+    cursor = start
+    for h_start, h_end, replacement in hunks:
+        lines.extend(base[cursor:h_start])
+        lines.extend(replacement)
+        cursor = h_end
+    lines.extend(base[cursor:end])
+    return lines
+
+
+def merge3(base, ours, theirs, ours_label="yours", theirs_label="generated"):
+    """Line based three-way merge. Returns (lines, conflict_count)."""
+    if ours == theirs or theirs == base:
+        return list(ours), 0
+    if ours == base:
+        return list(theirs), 0
+
+    pending = sorted([(h, 0) for h in _hunks(base, ours)] +
+                     [(h, 1) for h in _hunks(base, theirs)],
+                     key=lambda item: (item[0][0], item[0][1]))
+    merged = []
+    conflicts = 0
+    cursor = 0
+    index = 0
+    while index < len(pending):
+        (start, end, _), _side = pending[index]
+        cluster = [[], []]
+        # Absorb every hunk that overlaps or touches the current cluster
+        while index < len(pending):
+            hunk, side = pending[index]
+            h_start, h_end, _ = hunk
+            if cluster[0] or cluster[1]:
+                touches = h_start < end or (h_start == end and (h_start == h_end or start == end))
+                if not touches:
+                    break
+            cluster[side].append(hunk)
+            end = max(end, h_end)
+            index += 1
+
+        merged.extend(base[cursor:start])
+        if not cluster[1]:
+            merged.extend(_apply_hunks(base, start, end, cluster[0]))
+        elif not cluster[0]:
+            merged.extend(_apply_hunks(base, start, end, cluster[1]))
+        else:
+            mine = _apply_hunks(base, start, end, cluster[0])
+            generated = _apply_hunks(base, start, end, cluster[1])
+            if mine == generated:
+                merged.extend(mine)
+            else:
+                conflicts += 1
+                merged.append(f"<<<<<<< {ours_label}\n")
+                merged.extend(mine)
+                merged.append("=======\n")
+                merged.extend(generated)
+                merged.append(f">>>>>>> {theirs_label}\n")
+        cursor = end
+    merged.extend(base[cursor:])
+    return merged, conflicts
+
+
+def _lines(data):
+    return data.decode("utf-8", errors="surrogateescape").splitlines(keepends=True)
+
+
+def infer_spec(root, fs=DISK):
+    """Build a ProjectSpec for a project generated before manifests existed."""
+    device = DEFAULT_DEVICE
+    makefile = _read(os.path.join(root, "Makefile"), fs)
+    if makefile:
+        match = re.search(rb"^DEVICE\s*:=\s*(\S+)", makefile, re.M)
+        if match:
+            device = match.group(1).decode("ascii", errors="replace")
+    return ProjectSpec(os.path.basename(os.path.abspath(root)), device,
+                       os.path.dirname(os.path.abspath(root)),
+                       fs.exists(os.path.join(root, "srcs", "startup", "startup.S")))
+
+
+def regenerate_project(root, cache=None, log=print, dry_run=False, fs=DISK):
+    """Bring an existing project up to date with the current generator.
+
+    Returns {relative_path: action} with actions: created, updated,
+    unchanged, kept, merged, conflict or untracked.
+    """
+    root = os.path.abspath(root)
+    manifest = load_manifest(root, fs)
+    if manifest:
+        saved = manifest["spec"]
+        spec = ProjectSpec(saved["project_name"], saved["device"],
+                           os.path.dirname(root), saved["include_startup"])
+    else:
+        manifest = {"version": MANIFEST_VERSION, "files": {}}
+        spec = infer_spec(root, fs)
+    manifest["spec"] = _spec_to_dict(spec)
+    plan = plan_project(spec)
+
+    if not dry_run:
+        for directory in plan.directories:
+            fs.makedirs(os.path.join(root, directory))
+
+    actions = {}
+    for planned in plan.files:
+        new = planned.source.read(cache)
+        if new is None:
+            continue
+        dst = os.path.join(root, planned.path)
+        current = _read(dst, fs)
+        entry = manifest["files"].get(planned.path)
+        write = None
+
+        if current is None:
+            action, write = "created", new
+        elif entry and sha256(current) == entry["sha256"]:
+            # Untouched since it was generated
+            action = "unchanged" if current == new else "updated"
+            write = new if action == "updated" else None
+        elif current == new:
+            action = "unchanged"
+        elif entry is None:
+            # Predates the manifest: no common ancestor to merge from
+            action = "untracked"
+            if not dry_run:
+                _write_atomic(os.path.join(root, MANIFEST_DIR, "incoming", planned.path), new, fs)
+        else:
+            base = _read(_base_path(root, planned.path), fs)
+            if base == new:
+                action = "kept"
+            elif base is None:
+                action = "untracked"
+            else:
+                lines, conflicts = merge3(_lines(base), _lines(current), _lines(new))
+                write = "".join(lines).encode("utf-8", errors="surrogateescape")
+                action = "conflict" if conflicts else "merged"
+
+        actions[planned.path] = action
+        if action != "unchanged":
+            log(f"{action:>9}  {dst}")
+        if dry_run:
+            continue
+        if write is not None:
+            _write_atomic(dst, write, fs)
+        if action != "untracked":
+            _write_atomic(_base_path(root, planned.path), new, fs)
+            manifest["files"][planned.path] = {"sha256": sha256(new),
+                                               "source": planned.source.describe()}
+
+    if not dry_run:
+        save_manifest(root, manifest, fs)
+    return actions
+
+
+def find_projects(parent):
+    """Return the generated projects directly under parent."""
+    projects = []
+    for entry in sorted(os.scandir(parent), key=lambda e: e.name):
+        if not entry.is_dir():
+            continue
+        if (os.path.exists(_manifest_path(entry.path))
+                or os.path.exists(os.path.join(entry.path, "srcs", "Makefile"))):
+            projects.append(entry.path)
+    return projects
+
+
+def _regenerate_worker(args):
+    root, dry_run = args
+    messages = []
+    try:
+        return root, regenerate_project(root, log=messages.append, dry_run=dry_run), messages, None
+    except (OSError, ValueError, KeyError) as ex:
+        return root, {}, messages, str(ex)
+
+
+def regenerate_tree(parent, jobs=None, dry_run=False):
+    """Regenerate every project under parent in parallel processes."""
+    # Imported here: multiprocessing dominates the generator's import time
+    from concurrent.futures import ProcessPoolExecutor
+    projects = find_projects(parent)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_regenerate_worker, [(p, dry_run) for p in projects]))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Regenerate existing PIC32MZ projects from the current generator")
+    parser.add_argument("path", help="Project directory, or parent directory with --all")
+    parser.add_argument("--all", action="store_true",
+                        help="Regenerate every project directly under path")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Parallel processes for --all (default: CPU count)")
+    parser.add_argument("-n", "--dry-run", action="store_true",
+                        help="Report what would change without writing")
+    args = parser.parse_args()
+
+    if not args.all:
+        try:
+            actions = regenerate_project(args.path, dry_run=args.dry_run)
+        except (OSError, ValueError, KeyError) as ex:
+            print(f"Error regenerating project: {ex}")
+            sys.exit(1)
+        conflicts = [p for p, a in actions.items() if a == "conflict"]
+        print(f"\n✅ Regenerated {args.path}"
+              + (f" ({len(conflicts)} file(s) with conflicts)" if conflicts else ""))
+        sys.exit(1 if conflicts else 0)
+
+    failed = 0
+    for root, actions, messages, error in regenerate_tree(args.path, args.jobs, args.dry_run):
+        if error:
+            failed += 1
+            print(f"✗ {root}: {error}")
+            continue
+        counts = {}
+        for action in actions.values():
+            counts[action] = counts.get(action, 0) + 1
+        summary = ", ".join(f"{n} {a}" for a, n in sorted(counts.items()))
+        print(f"{'✗' if 'conflict' in counts else '✓'} {root}: {summary}")
+        failed += 1 if "conflict" in counts else 0
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
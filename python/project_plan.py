@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Project Plan
+Declarative project specification and a side-effect-free planning step: the
+plan lists every directory and file a generation would produce, with the
+source of each file's content, and is applied to disk as a separate step
+"""
+
+import os
+import re
+import sys
+import json
+from dataclasses import dataclass
+
+from generator_fs import DISK
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEPENDANCIES_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, '..', 'dependancies'))
+DEFAULT_DEVICE = "32MZ1024EFH064"
+# Written into the generated Makefiles so make finds the build tools
+TOOLS_DIR = SCRIPT_DIR.replace("\\", "/")
+
+# Simple directory structure - first level only
+PROJECT_DIRS = ("srcs", "incs", "objs", "bins", "other", "docs", ".vscode")
+# Added when the mikroc option is enabled
+STARTUP_DIRS = ("srcs/startup",)
+
+# slots=True needs Python 3.10; older interpreters get regular dataclasses
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+def render_main_c(project_name):
+    """Return the main.c template for project_name."""
+    return f"""/*****************************************************************************
+  Main Source File
+
+  Company:
+    Your Company Name
+
+  File Name:
+    main.c
+
+  Summary:
+    This file contains the \"main\" function for {project_name}.
+
+  Description:
+    This file contains the \"main\" function for the project.
+    Simple bare-metal main function without system initialization dependencies.
+ ******************************************************************************/
+
+// *****************************************************************************
+// Section: Included Files
+// *****************************************************************************
+
+#include <stddef.h>                     // Defines NULL
+#include <stdbool.h>                    // Defines true
+#include <stdlib.h>                     // Defines EXIT_FAILURE
+#include <stdint.h>                     // Defines uint32_t, uintptr_t
+
+// *****************************************************************************
+// Variables
+// *****************************************************************************
+
+// *****************************************************************************
+// Section: Main Entry Point
+// *****************************************************************************
+
+int main ( void )
+{{
+    // Initialize your hardware/peripherals here
+    // Example: GPIO configuration, clock setup, etc.
+    
+    while ( true )
+    {{
+        // Your main application code here
+        // Example: toggle LED, read sensors, communicate, etc.
+    }}
+
+    /* Execution should not come here during normal operation */
+    return ( EXIT_FAILURE );
+}}
+
+/*****************************************************************************
+ End of File
+*/
+"""
+
+
+MAKEFILE_ROOT = os.path.join(DEPENDANCIES_DIR, "Makefile_Root")
+# VS Code configuration name for each branch of the root Makefile's OS check
+OS_CONFIGURATIONS = ("Win32", "Linux")
+_ASSIGNMENT = re.compile(r"^[ \t]*(\w+)[ \t]*[:?]?=[ \t]*(.*?)[ \t]*$")
+_REFERENCE = re.compile(r"\$\((\w+)\)")
+# MODULE in dependancies/Makefile_Root, the name of the linked image in bins/
+DEFAULT_MODULE = "CS21"
+DEBUG_TOOLS = ("PICkit 4", "Snap", "ICD 4")
+
+
+def _json(data):
+    return json.dumps(data, indent=4) + "\n"
+
+
+def toolchain_roots(makefile_text):
+    """{configuration: (xc32 root, DFP root)} from a root Makefile's defaults.
+
+    Reads COMPILER_LOCATION and DFP for both branches of the
+    ifeq ($(OS),Windows_NT) blocks, so IntelliSense points at the toolchain
+    the Makefile builds with.
+    """
+    common = {}
+    branches = {name: {} for name in OS_CONFIGURATIONS}
+    # One entry per open conditional: a configuration name for the OS check
+    stack = []
+    for line in makefile_text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith(("ifeq", "ifneq", "ifdef", "ifndef")):
+            stack.append("Win32" if stripped.replace(" ", "") == "ifeq($(OS),Windows_NT)"
+                         else None)
+        elif stripped == "else" and stack:
+            stack[-1] = "Linux" if stack[-1] == "Win32" else stack[-1]
+        elif stripped == "endif" and stack:
+            stack.pop()
+        else:
+            match = _ASSIGNMENT.match(line)
+            if not match or len(stack) > 1 or stack == [None]:
+                continue
+            values = branches[stack[0]] if stack else common
+            values.setdefault(match.group(1), match.group(2))
+
+    roots = {}
+    for name, values in branches.items():
+        values = {**common, **values}
+        xc32 = _expand(values.get("COMPILER_LOCATION", ""), values)
+        if xc32.endswith("/bin"):
+            xc32 = xc32[:-len("/bin")]
+        roots[name] = (xc32, _expand(values.get("DFP", ""), values))
+    return roots
+
+
+def _expand(value, values, depth=0):
+    """Substitute $(NAME) references from values, as make would."""
+    if depth > 8:
+        return value
+    return _REFERENCE.sub(lambda m: _expand(values.get(m.group(1), ""), values, depth + 1), value)
+
+
+def render_c_cpp_properties(device, makefile=MAKEFILE_ROOT):
+    """IntelliSense configuration limited to the project and the device headers.
+
+    The device and the XC32/DFP folders are the ones the root Makefile
+    builds with. Only the top level of the DFP and XC32 include folders is
+    listed (no recursive /**; /* in browse.path) and browsing is limited to
+    included headers, so the extension does not index every device in the pack.
+    """
+    with open(makefile, "r", encoding="utf-8") as f:
+        roots = toolchain_roots(f.read())
+    configurations = []
+    for name, (xc32, dfp) in roots.items():
+        project = ["${workspaceFolder}/incs/**", "${workspaceFolder}/srcs/**"]
+        toolchain = [f"{dfp}/include", f"{xc32}/pic32mx/include"]
+        configurations.append({
+            "name": name,
+            "compileCommands": "${workspaceFolder}/compile_commands.json",
+            "compilerPath": f"{xc32}/bin/xc32-gcc" + (".exe" if name == "Win32" else ""),
+            "includePath": project + toolchain,
+            "defines": ["__XC32", "__XC32__", "__PIC32MZ__", "__LANGUAGE_C__",
+                        f"__{device}__", "XPRJ_default=default"],
+            "cStandard": "c99",
+            "intelliSenseMode": "gcc-x86",
+            "browse": {
+                "path": project + [f"{path}/*" for path in toolchain],
+                "limitSymbolsToIncludedHeaders": True,
+                "databaseFilename": "${workspaceFolder}/.vscode/browse.vc.db",
+            },
+        })
+    return _json({"configurations": configurations, "version": 4})
+
+
+def render_tasks_json():
+    """Build, clean, validate and flash tasks running the root Makefile."""
+    matcher = {"base": "$gcc", "fileLocation": ["relative", "${workspaceFolder}/srcs"]}
+
+    def task(label, args, group=None):
+        entry = {"label": label, "type": "shell", "command": "make", "args": args,
+                 "options": {"cwd": "${workspaceFolder}"}, "problemMatcher": matcher}
+        if group:
+            entry["group"] = group
+        return entry
+
+    return _json({"version": "2.0.0", "tasks": [
+        task("makemake", ["-j", "all"], {"kind": "build", "isDefault": True}),
+        task("makeclean", ["clean", "DRY_RUN=0"]),
+        task("Validate", ["validate"]),
+        task("Flash", ["flash"]),
+        task("Flash (full image)", ["flash", "FULL=1"]),
+    ]})
+
+
+def render_launch_json(device, module=DEFAULT_MODULE):
+    """Hardware debug configurations for the MPLAB VS Code extension."""
+    return _json({"version": "0.2.0", "configurations": [
+        {"name": f"Debug ({tool})", "type": "mplab-core-da", "request": "launch",
+         "program": f"${{workspaceFolder}}/bins/{module}",
+         "device": f"PIC{device}", "tool": tool, "preLaunchTask": "makemake"}
+        for tool in DEBUG_TOOLS
+    ]})
+
+
+@dataclass(frozen=True, **_SLOTS)
+class ProjectSpec:
+    """Everything needed to generate one project."""
+    project_name: str
+    device: str = DEFAULT_DEVICE
+    output_dir: str = "."
+    include_startup: bool = False
+
+    @property
+    def project_root(self):
+        return os.path.abspath(os.path.join(self.output_dir, self.project_name))
+
+
+def set_make_variables(data, settings):
+    """Set the value of the first assignment of each (name, value) make variable."""
+    for name, value in settings:
+        pattern = re.compile(rb"^(" + re.escape(name.encode("ascii")) + rb"[ \t]*[:?]?=[ \t]*).*$",
+                             re.M)
+        data = pattern.sub(lambda match: match.group(1) + value.encode("utf-8"), data, count=1)
+    return data
+
+
+@dataclass(frozen=True, **_SLOTS)
+class CopySource:
+    """File content copied from the dependancies folder.
+
+    settings is a tuple of (make variable, value) pairs written over the
+    template's defaults, e.g. the path of the build tools.
+    """
+    path: str
+    settings: tuple = ()
+
+    def read(self, cache=None):
+        if cache is not None:
+            data = cache.read(self.path)
+        elif not os.path.exists(self.path):
+            data = None
+        else:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        if data is None or not self.settings:
+            return data
+        return set_make_variables(data, self.settings)
+
+    def describe(self):
+        if self.settings:
+            return f"copy {self.path} setting {', '.join(name for name, _ in self.settings)}"
+        return f"copy {self.path}"
+
+
+@dataclass(frozen=True, **_SLOTS)
+class TemplateSource:
+    """File content rendered from a template in TEMPLATES."""
+    name: str
+    params: tuple = ()
+
+    def read(self, cache=None):
+        return TEMPLATES[self.name](**dict(self.params)).encode("utf-8")
+
+    def describe(self):
+        return f"template {self.name}"
+
+
+TEMPLATES = {
+    "main.c": render_main_c,
+    "c_cpp_properties.json": render_c_cpp_properties,
+    "tasks.json": render_tasks_json,
+    "launch.json": render_launch_json,
+}
+
+
+@dataclass(frozen=True, **_SLOTS)
+class PlannedFile:
+    """A file in the plan; path is relative to the project root."""
+    path: str
+    source: object
+    label: str = ""
+
+
+@dataclass(frozen=True, **_SLOTS)
+class GenerationPlan:
+    spec: ProjectSpec
+    directories: tuple = ()
+    files: tuple = ()
+
+    def describe(self):
+        """Return a human readable listing of the plan."""
+        lines = [f"Plan for {self.spec.project_name} ({self.spec.device}) "
+                 f"at {self.spec.project_root}"]
+        lines += [f"  dir   {d}/" for d in self.directories]
+        lines += [f"  file  {f.path:<30} <- {f.source.describe()}" for f in self.files]
+        return lines
+
+
+def plan_project(spec):
+    """Return the GenerationPlan for spec without touching the disk."""
+    directories = PROJECT_DIRS + (STARTUP_DIRS if spec.include_startup else ())
+    tools = (("TOOLS_DIR", TOOLS_DIR),)
+    files = [
+        # The device is also what .vscode/c_cpp_properties.json defines
+        PlannedFile("Makefile",
+                    CopySource(MAKEFILE_ROOT, (("DEVICE", spec.device),) + tools),
+                    "Makefile_Root"),
+        PlannedFile("srcs/Makefile",
+                    CopySource(os.path.join(DEPENDANCIES_DIR, "Makefile_Srcs"), tools),
+                    "Makefile_Srcs"),
+    ]
+    if spec.include_startup:
+        files.append(PlannedFile("srcs/startup/startup.S",
+                                 CopySource(os.path.join(DEPENDANCIES_DIR, "startup.S")),
+                                 "startup.S"))
+    files.append(PlannedFile("srcs/main.c",
+                             TemplateSource("main.c", (("project_name", spec.project_name),)),
+                             "main.c"))
+    device = (("device", spec.device),)
+    files += [
+        PlannedFile(".vscode/c_cpp_properties.json",
+                    TemplateSource("c_cpp_properties.json", device), "c_cpp_properties.json"),
+        PlannedFile(".vscode/tasks.json", TemplateSource("tasks.json"), "tasks.json"),
+        PlannedFile(".vscode/launch.json", TemplateSource("launch.json", device), "launch.json"),
+    ]
+    return GenerationPlan(spec, directories, tuple(files))
+
+
+def create_directories(plan, log=print, fs=DISK):
+    root = plan.spec.project_root
+    for directory in plan.directories:
+        full_path = os.path.join(root, directory)
+        fs.makedirs(full_path)
+        log(f"Created directory: {full_path}")
+
+
+def apply_file(plan, planned, cache=None, log=print, fs=DISK):
+    """Write one planned file unless it already exists; returns its action."""
+    dst = os.path.join(plan.spec.project_root, planned.path)
+    data = planned.source.read(cache)
+    if data is None:
+        log(f"Source {planned.label} not found at {planned.source.path}")
+        return "missing"
+    if fs.exists(dst):
+        log(f"File {dst} already exists, skipping.")
+        return "skipped"
+    fs.makedirs(os.path.dirname(dst))
+    fs.write_bytes(dst, data)
+    if isinstance(planned.source, CopySource):
+        log(f"Copied {planned.source.path} to {dst}")
+    else:
+        log(f"Created {dst}")
+    return "created"
+
+
+def apply_plan(plan, cache=None, log=print, fs=DISK):
+    """Create the plan's directories and files that do not exist yet.
+
+    Returns a list of (relative_path, action) where action is one of
+    "created", "skipped" or "missing". Everything goes through fs (a
+    generator_fs backend), the real disk by default.
+    """
+    create_directories(plan, log, fs)
+    return [(planned.path, apply_file(plan, planned, cache, log, fs)) for planned in plan.files]
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Startup Cache
+Assembles the MikroC startup.S once per source, compiler, device, DFP and
+flags combination and keeps the object with its .d files in a cache shared
+by every project of the user ($PIC32_STARTUP_CACHE, else startup/ in the
+user cache folder). srcs/Makefile runs the startup rule through this, so a
+new project links the cached object instead of assembling it again.
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+import subprocess
+
+from toolchain_cache import ToolchainError, resolve_compiler, user_cache_dir
+
+# Bumped whenever the key inputs or the cached file layout change
+STARTUP_VERSION = 1
+# Stands in for the object path (without .o) inside cached flags and .d files
+OBJ_PLACEHOLDER = "@STARTUP_OBJ@"
+_DFP_VERSION = re.compile(r"^\d+(\.\d+)+$")
+
+
+class StartupCacheError(Exception):
+    """Raised when the startup file cannot be assembled."""
+
+
+def default_cache_dir():
+    return os.environ.get("PIC32_STARTUP_CACHE") or os.path.join(user_cache_dir(), "startup")
+
+
+def dfp_version(dfp):
+    """Pack version from a .../PIC32MZ-EF_DFP/<version> path, or ""."""
+    name = os.path.basename(os.path.normpath(dfp))
+    return name if _DFP_VERSION.match(name) else ""
+
+
+def dependency_outputs(flags):
+    """Files the assembler writes besides the object: -MF and -Wa,-MD= targets."""
+    outputs = []
+    for index, flag in enumerate(flags):
+        if flag == "-MF" and index + 1 < len(flags):
+            outputs.append(flags[index + 1])
+        elif flag.startswith("-Wa,"):
+            outputs += [part[4:] for part in flag.split(",") if part.startswith("-MD=")]
+    return outputs
+
+
+def startup_key(cc, device, dfp, source, flags, stem):
+    """Hash of everything the assembled object depends on.
+
+    The DFP path is keyed as well as its version because the .d files name
+    its headers by absolute path.
+    """
+    digest = hashlib.sha1()
+    cc = resolve_compiler(cc)
+    st = os.stat(cc)
+    with open(source, "rb") as f:
+        source_sha1 = hashlib.sha1(f.read()).hexdigest()
+    normalized = [flag.replace(stem, OBJ_PLACEHOLDER) for flag in flags]
+    digest.update(json.dumps([STARTUP_VERSION, cc, st.st_size, st.st_mtime_ns,
+                              device, os.path.normpath(dfp), dfp_version(dfp),
+                              source_sha1, normalized]).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _suffix(path, stem):
+    return path[len(stem):] if path.startswith(stem) else None
+
+
+def restore(entry_dir, stem, obj):
+    """Copy a cached object and its .d files into place under stem."""
+    with open(os.path.join(entry_dir, "files.json"), "r", encoding="utf-8") as f:
+        suffixes = json.load(f)
+    for suffix in suffixes:
+        cached = os.path.join(entry_dir, "out" + suffix)
+        target = stem + suffix
+        if target == obj:
+            shutil.copyfile(cached, target)
+        else:
+            with open(cached, "r", encoding="utf-8") as f:
+                text = f.read().replace(OBJ_PLACEHOLDER, stem)
+            with open(target, "w", encoding="utf-8") as f:
+                f.write(text)
+        # make compares mtimes, the copies must look freshly built
+        os.utime(target)
+
+
+def store(cache_dir, entry_dir, stem, outputs):
+    """Copy freshly assembled outputs into a new cache entry (first writer wins)."""
+    os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+    tmp_dir = f"{entry_dir}.{os.getpid()}.tmp"
+    os.makedirs(tmp_dir, exist_ok=True)
+    suffixes = []
+    for path in outputs:
+        suffix = _suffix(path, stem)
+        if suffix is None or not os.path.exists(path):
+            continue
+        cached = os.path.join(tmp_dir, "out" + suffix)
+        if suffix == ".o":
+            shutil.copyfile(path, cached)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read().replace(stem, OBJ_PLACEHOLDER)
+            with open(cached, "w", encoding="utf-8") as f:
+                f.write(text)
+        suffixes.append(suffix)
+    with open(os.path.join(tmp_dir, "files.json"), "w", encoding="utf-8") as f:
+        json.dump(suffixes, f)
+    try:
+        os.rename(tmp_dir, entry_dir)
+    except OSError:
+        # Another project stored the same key first; keep theirs
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def assemble(cc, device, dfp, source, obj, flags, cache_dir, log=print):
+    """Bring obj (and its .d files) up to date from the cache; True on a cache hit."""
+    if not obj.endswith(".o"):
+        raise StartupCacheError(f"object {obj} does not end in .o")
+    stem = obj[:-2]
+    key = startup_key(cc, device, dfp, source, flags, stem)
+    entry_dir = os.path.join(cache_dir, device, key)
+    if os.path.exists(os.path.join(entry_dir, "files.json")):
+        restore(entry_dir, stem, obj)
+        log(f"Linked cached startup object {device}/{key}")
+        return True
+
+    result = subprocess.run([cc, *flags, "-o", obj, source])
+    if result.returncode != 0:
+        raise StartupCacheError(f"{os.path.basename(cc)} failed to assemble {source}")
+    try:
+        store(cache_dir, entry_dir, stem, [obj] + dependency_outputs(flags))
+        log(f"Cached startup object {device}/{key}")
+    except OSError as ex:
+        # The project still has its object, only the next one misses out
+        log(f"Startup object not cached: {ex}")
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Assemble startup.S once per device, DFP and flags and reuse the object")
+    parser.add_argument("--cc", required=True, help="Path to xc32-gcc")
+    parser.add_argument("--device", required=True, help="Device, e.g. 32MZ2048EFH064")
+    parser.add_argument("--dfp", required=True, help="DFP folder")
+    parser.add_argument("--cache", help="Cache folder (default: user cache folder)")
+    parser.add_argument("source", help="startup.S")
+    parser.add_argument("obj", help="Object to produce")
+    parser.epilog = "Assembler flags follow --, e.g. -- -mprocessor=... -c ... -MMD -MF obj.d"
+    argv = sys.argv[1:]
+    flags = []
+    if "--" in argv:
+        flags = argv[argv.index("--") + 1:]
+        argv = argv[:argv.index("--")]
+    args = parser.parse_args(argv)
+
+    try:
+        assemble(args.cc, args.device, args.dfp, args.source, args.obj, flags,
+                 args.cache or default_cache_dir())
+    except (OSError, StartupCacheError, ToolchainError) as ex:
+        print(f"Error assembling startup file: {ex}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
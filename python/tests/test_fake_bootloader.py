@@ -0,0 +1,38 @@
+import json
+import socket
+
+import pytest
+
+from fake_bootloader import FakeBootloader
+
+
+@pytest.fixture
+def stream():
+    server = FakeBootloader()
+    host, port = server.start().rsplit(":", 1)
+    with socket.create_connection((host, int(port))) as sock:
+        yield sock.makefile("rwb")
+    server.shutdown()
+    server.server_close()
+
+
+def _send(stream, line):
+    stream.write(line.encode("utf-8") + b"\n")
+    stream.flush()
+    return json.loads(stream.readline())
+
+
+@pytest.mark.parametrize("line", [
+    "[1, 2]",
+    '"erase"',
+    '{"op": "erase", "addr": "0x1000"}',
+    '{"op": "erase", "addr": true}',
+    '{"op": "read", "addr": 0}',
+    '{"op": "bogus"}',
+])
+def test_malformed_requests_get_an_error_reply(stream, line):
+    reply = _send(stream, line)
+    assert reply["ok"] is False
+    assert reply["error"]
+    # The connection stays usable after a bad request
+    assert _send(stream, '{"op": "info"}')["ok"] is True
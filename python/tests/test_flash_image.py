@@ -0,0 +1,19 @@
+from flash_image import diff_pages
+
+
+def test_diff_pages_unchanged():
+    assert diff_pages({0: "a", 0x4000: "b"}, {0: "a", 0x4000: "b"}) == []
+
+
+def test_diff_pages_modified_and_new():
+    previous = {0: "a", 0x4000: "b"}
+    current = {0: "a", 0x4000: "B", 0x8000: "c"}
+    assert diff_pages(previous, current) == [0x4000, 0x8000]
+
+
+def test_diff_pages_includes_dropped_pages():
+    assert diff_pages({0: "a", 0x4000: "b"}, {0: "a"}) == [0x4000]
+
+
+def test_diff_pages_without_history_flashes_everything():
+    assert diff_pages({}, {0x8000: "c", 0: "a"}) == [0, 0x8000]
@@ -0,0 +1,36 @@
+import pytest
+
+from generate_project import PIC32ProjectGenerator
+from generator_fs import DISK, MemoryFS
+from project_manifest import load_manifest
+from project_plan import ProjectSpec
+
+
+def _generator(fs):
+    generator = PIC32ProjectGenerator.from_spec(ProjectSpec("Demo", output_dir="/mem"), fs=fs)
+    generator.log = lambda message: None
+    return generator
+
+
+@pytest.mark.parametrize("startup_first", [True, False])
+def test_legacy_helpers_keep_the_startup_option(startup_first):
+    fs = MemoryFS(DISK)
+    generator = _generator(fs)
+    generator.create_directory_structure(include_startup=True)
+    helpers = [generator.copy_root_makefile, generator.copy_srcs_makefile,
+               generator.create_main_c]
+    helpers.insert(0 if startup_first else len(helpers), generator.copy_startup_file)
+    for helper in helpers:
+        assert helper()
+
+    manifest = load_manifest(generator.project_root, fs)
+    assert manifest["spec"]["include_startup"] is True
+    assert "srcs/startup/startup.S" in manifest["files"]
+    assert generator.regenerate()["srcs/startup/startup.S"] == "unchanged"
+
+
+def test_legacy_helper_skips_existing_file():
+    generator = _generator(MemoryFS(DISK))
+    generator.create_directory_structure()
+    assert generator.create_main_c()
+    assert not generator.create_main_c()
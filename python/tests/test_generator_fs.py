@@ -0,0 +1,70 @@
+import pytest
+
+from generator_fs import DISK, MemoryFS
+
+
+@pytest.fixture
+def lower(tmp_path):
+    (tmp_path / "a.txt").write_bytes(b"lower")
+    (tmp_path / "b.txt").write_bytes(b"b")
+    (tmp_path / "sub").mkdir()
+    return tmp_path
+
+
+def test_reads_fall_through_to_lower(lower):
+    fs = MemoryFS(DISK)
+    assert fs.read_bytes(str(lower / "a.txt")) == b"lower"
+    assert fs.listdir(str(lower)) == ["a.txt", "b.txt", "sub"]
+
+
+def test_writes_stay_in_memory(lower):
+    fs = MemoryFS(DISK)
+    fs.write_bytes(str(lower / "a.txt"), b"upper")
+    assert fs.read_bytes(str(lower / "a.txt")) == b"upper"
+    assert (lower / "a.txt").read_bytes() == b"lower"
+
+
+def test_remove_of_lower_file_leaves_a_whiteout(lower):
+    fs = MemoryFS(DISK)
+    path = str(lower / "a.txt")
+    fs.remove(path)
+    assert not fs.exists(path)
+    assert fs.listdir(str(lower)) == ["b.txt", "sub"]
+    with pytest.raises(FileNotFoundError):
+        fs.stat(path)
+    with pytest.raises(FileNotFoundError):
+        fs.read_bytes(path)
+    with pytest.raises(FileNotFoundError):
+        fs.remove(path)
+    assert (lower / "a.txt").exists()
+
+
+def test_remove_of_shadowing_file_does_not_reveal_lower(lower):
+    fs = MemoryFS(DISK)
+    path = str(lower / "a.txt")
+    fs.write_bytes(path, b"upper")
+    fs.remove(path)
+    assert not fs.exists(path)
+
+
+def test_write_clears_the_whiteout(lower):
+    fs = MemoryFS(DISK)
+    path = str(lower / "a.txt")
+    fs.remove(path)
+    fs.write_bytes(path, b"again")
+    assert fs.read_bytes(path) == b"again"
+    assert "a.txt" in fs.listdir(str(lower))
+
+
+def test_replace_copies_a_lower_file_up(lower):
+    fs = MemoryFS(DISK)
+    fs.replace(str(lower / "b.txt"), str(lower / "c.txt"))
+    assert fs.listdir(str(lower)) == ["a.txt", "c.txt", "sub"]
+    assert fs.read_bytes(str(lower / "c.txt")) == b"b"
+    assert (lower / "b.txt").exists()
+
+
+def test_remove_refuses_folders(lower):
+    fs = MemoryFS(DISK)
+    with pytest.raises(FileNotFoundError):
+        fs.remove(str(lower / "sub"))
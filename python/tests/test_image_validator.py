@@ -0,0 +1,99 @@
+from image_validator import (ImageValidator, IntervalTree, MemoryRegion, merge_ranges,
+                             to_physical, validate_image)
+
+REGIONS = [
+    MemoryRegion("kseg0_program_mem", 0x9D000000, 0x1000, "rx"),
+    MemoryRegion("kseg0_boot_mem", 0x9D001000, 0x100),
+    MemoryRegion("kseg1_boot_mem", 0xBFC0FF00, 0xC0),
+    MemoryRegion("config_BFC0FFC0", 0xBFC0FFC0, 4),
+    MemoryRegion("kseg0_data_mem", 0x80000000, 0x1000),
+]
+
+
+def _record(rectype, offset, data):
+    body = bytes([len(data), offset >> 8, offset & 0xFF, rectype]) + data
+    return f":{body.hex().upper()}{(-sum(body)) & 0xFF:02X}\n"
+
+
+def validator():
+    return ImageValidator(REGIONS)
+
+
+def test_merge_ranges_joins_adjacent_and_overlapping():
+    assert merge_ranges([(10, 12), (0, 4), (4, 8), (11, 20), (30, 31)]) == \
+        [(0, 8), (10, 20), (30, 31)]
+
+
+def test_merge_ranges_keeps_gaps():
+    assert merge_ranges([(0, 4), (5, 8)]) == [(0, 4), (5, 8)]
+
+
+def test_interval_tree_is_half_open():
+    tree = IntervalTree([(0, 4, "a"), (4, 8, "b"), (6, 10, "c")])
+    assert sorted(tree.overlapping(3, 5)) == ["a", "b"]
+    assert tree.overlapping(8, 9) == ["c"]
+    assert tree.overlapping(10, 11) == []
+    assert len(tree) == 3
+
+
+def test_interval_tree_empty():
+    assert IntervalTree([]).overlapping(0, 100) == []
+
+
+def test_kseg0_and_kseg1_alias_the_same_physical_address():
+    assert to_physical(0x9D000000) == to_physical(0xBD000000) == 0x1D000000
+    assert to_physical(0x1D000000) == 0x1D000000
+    # Regions declared in KSEG0 cover data addressed through KSEG1
+    start = to_physical(0xBD000010)
+    assert validator().check_range(start, start + 0x10) == []
+
+
+def test_range_spanning_adjacent_regions_is_covered():
+    assert validator().check_range(0x1D000000, 0x1D001100) == []
+
+
+def test_range_past_the_last_region_reports_the_gap():
+    problems = validator().check_range(0x1D000F00, 0x1D001200)
+    assert problems == ["0x1D000F00-0x1D0011FF has 0x100 bytes outside any MEMORY "
+                        "region at 0x1D001100"]
+
+
+def test_data_in_non_loadable_region():
+    problems = validator().check_range(0x00000010, 0x00000020)
+    assert problems == ["0x00000010-0x0000001F places data in non-loadable region "
+                        "'kseg0_data_mem'"]
+
+
+def test_config_words_on_their_own_are_fine():
+    assert validator().check_range(0x1FC0FFC0, 0x1FC0FFC4) == []
+
+
+def test_boot_code_ending_at_the_config_words_is_fine():
+    # Two records that merge into one range are still two separate writes
+    assert validator().validate([(0x1FC0FFB0, 0x1FC0FFC0), (0x1FC0FFC0, 0x1FC0FFC4)]) == []
+
+
+def test_config_words_overlapped_by_boot_data():
+    problems = validator().validate([(0x1FC0FFB8, 0x1FC0FFC4)])
+    assert problems == ["0x1FC0FFB8-0x1FC0FFC3 overlaps config words (config_BFC0FFC0) "
+                        "from kseg1_boot_mem"]
+
+
+def test_validate_image_reads_records_unmerged(tmp_path):
+    linker_script = tmp_path / "p.ld"
+    linker_script.write_text("MEMORY\n{\n"
+                             "  kseg1_boot_mem (rx) : ORIGIN = 0xBFC0FF00, LENGTH = 0xC0\n"
+                             "  config_BFC0FFC0 : ORIGIN = 0xBFC0FFC0, LENGTH = 0x4\n}\n")
+    image = tmp_path / "a.hex"
+    image.write_text(_record(0x04, 0, bytes([0x1F, 0xC0]))
+                     + _record(0x00, 0xFFB0, bytes(16))
+                     + _record(0x00, 0xFFC0, bytes(4))
+                     + _record(0x01, 0, b""))
+    assert validate_image(str(image), str(linker_script)) == ([(0x1FC0FFB0, 0x1FC0FFC4)], [])
+
+
+def test_config_words_overlapped_by_unmapped_data():
+    regions = [r for r in REGIONS if r.name != "kseg1_boot_mem"]
+    problems = ImageValidator(regions).check_range(0x1FC0FFBC, 0x1FC0FFC4)
+    assert problems[-1] == ("0x1FC0FFBC-0x1FC0FFC3 overlaps config words "
+                            "(config_BFC0FFC0) from unmapped data")
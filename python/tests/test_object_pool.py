@@ -0,0 +1,43 @@
+import os
+
+from object_pool import _file_state, _matches, split_outputs
+
+
+def test_split_outputs_takes_out_output_values():
+    key_args, outputs = split_outputs(["-c", "-MF", "a.d", "x.c", "-o", "a.o"])
+    assert key_args == ["-c", "-MF", "x.c", "-o"]
+    assert outputs == {"-MF": "a.d", "-o": "a.o"}
+
+
+def test_split_outputs_ignores_attached_values():
+    # -oa.o is not split from its value, so it stays part of the key
+    assert split_outputs(["-c", "-oa.o"]) == (["-c", "-oa.o"], {})
+
+
+def test_split_outputs_trailing_option():
+    assert split_outputs(["-c", "-o"]) == (["-c", "-o"], {"-o": ""})
+
+
+def test_matches_unchanged_file(tmp_path):
+    header = tmp_path / "a.h"
+    header.write_text("int a;\n")
+    assert _matches({str(header): _file_state(str(header))})
+
+
+def test_matches_touched_file_with_same_content(tmp_path):
+    header = tmp_path / "a.h"
+    header.write_text("int a;\n")
+    state = _file_state(str(header))
+    os.utime(header, ns=(state[1] + 10**9, state[1] + 10**9))
+    assert _matches({str(header): state})
+
+
+def test_matches_edited_or_missing_file(tmp_path):
+    header = tmp_path / "a.h"
+    header.write_text("int a;\n")
+    state = _file_state(str(header))
+    header.write_text("int b;\n")
+    os.utime(header, ns=(state[1] + 10**9, state[1] + 10**9))
+    assert not _matches({str(header): state})
+    header.unlink()
+    assert not _matches({str(header): state})
@@ -0,0 +1,27 @@
+from project_manifest import merge3
+
+BASE = ["a\n", "b\n", "c\n"]
+
+
+def test_merge3_conflicting_inserts_at_the_same_place():
+    merged, conflicts = merge3(BASE, ["a\n", "x\n", "b\n", "c\n"], ["a\n", "y\n", "b\n", "c\n"])
+    assert conflicts == 1
+    assert merged == ["a\n", "<<<<<<< yours\n", "x\n", "=======\n", "y\n",
+                      ">>>>>>> generated\n", "b\n", "c\n"]
+
+
+def test_merge3_inserts_at_different_places():
+    merged, conflicts = merge3(BASE, ["a\n", "x\n", "b\n", "c\n"], ["a\n", "b\n", "c\n", "y\n"])
+    assert conflicts == 0
+    assert merged == ["a\n", "x\n", "b\n", "c\n", "y\n"]
+
+
+def test_merge3_identical_inserts():
+    ours = ["a\n", "x\n", "b\n", "c\n"]
+    assert merge3(BASE, ours, list(ours)) == (ours, 0)
+
+
+def test_merge3_one_side_unchanged():
+    theirs = ["a\n", "B\n", "c\n"]
+    assert merge3(BASE, list(BASE), theirs) == (theirs, 0)
+    assert merge3(BASE, theirs, list(BASE)) == (theirs, 0)
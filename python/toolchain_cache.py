@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Toolchain Cache
+Probes an xc32 compiler once for its version, target, built-in macros,
+system include folders and --help text, and caches the answers keyed on the
+binary's path, size and mtime. srcs/Makefile includes the facts as
+objs/toolchain.mk, so `make platform`, `make debug` and `make help` spawn
+neither uname nor the compiler, and other tools call load_toolchain().
+
+The cache is shared by every project of the user: $PIC32_TOOLCHAIN_CACHE,
+else toolchains.json in the user cache folder.
+"""
+
+import os
+import sys
+import json
+import argparse
+import platform
+import subprocess
+from dataclasses import dataclass, asdict, field
+
+from include_paths import write_if_changed
+
+CACHE_VERSION = 1
+TOOLCHAIN_MK = "toolchain.mk"
+PROBE_TIMEOUT = 30
+
+
+class ToolchainError(Exception):
+    """Raised when the compiler cannot be found or run."""
+
+
+@dataclass(frozen=True)
+class ToolchainInfo:
+    cc: str
+    size: int
+    mtime_ns: int
+    host_os: str
+    version: str = ""
+    target: str = ""
+    system_includes: tuple = ()
+    macros: dict = field(default_factory=dict)
+    help: str = ""
+
+
+def user_cache_dir():
+    """Per-user folder for caches shared by every project."""
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pic32mz")
+
+
+def default_cache_path():
+    return os.environ.get("PIC32_TOOLCHAIN_CACHE") or os.path.join(user_cache_dir(), "toolchains.json")
+
+
+def resolve_compiler(cc):
+    """Absolute path of the compiler binary (adds .exe on Windows when needed)."""
+    for candidate in (cc, cc + ".exe"):
+        if os.path.isfile(candidate):
+            return os.path.abspath(candidate)
+    raise ToolchainError(f"compiler not found: {cc}")
+
+
+def _run(args):
+    try:
+        result = subprocess.run(args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, timeout=PROBE_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired) as ex:
+        raise ToolchainError(f"running {os.path.basename(args[0])}: {ex}")
+    return (result.stdout.decode("utf-8", "replace"),
+            result.stderr.decode("utf-8", "replace"))
+
+
+def parse_macros(text):
+    """{name: value} from `-dM -E` output."""
+    macros = {}
+    for line in text.splitlines():
+        if line.startswith("#define "):
+            name, _, value = line[8:].partition(" ")
+            macros[name] = value
+    return macros
+
+
+def parse_system_includes(text):
+    """Folders between the "search starts here" and "End of search list" lines of -v."""
+    dirs = []
+    inside = False
+    for line in text.splitlines():
+        if line.startswith("#include <...> search starts here"):
+            inside = True
+        elif line.startswith("End of search list"):
+            break
+        elif inside and line.startswith(" "):
+            dirs.append(os.path.normpath(line.strip()))
+    return tuple(dirs)
+
+
+def probe(cc):
+    """Run the compiler to collect a ToolchainInfo; the only place that spawns it."""
+    path = resolve_compiler(cc)
+    st = os.stat(path)
+    version = _run([path, "--version"])[0].strip().splitlines()
+    target = _run([path, "-dumpmachine"])[0].strip()
+    macros = parse_macros(_run([path, "-dM", "-E", "-x", "c", "-"])[0])
+    includes = parse_system_includes(_run([path, "-E", "-v", "-x", "c", "-"])[1])
+    return ToolchainInfo(cc=path, size=st.st_size, mtime_ns=st.st_mtime_ns,
+                         host_os=platform.system(), version=version[0] if version else "",
+                         target=target, system_includes=includes, macros=macros,
+                         help=_run([path, "--help"])[0])
+
+
+class ToolchainCache:
+    """ToolchainInfo per compiler binary, revalidated by size and mtime."""
+
+    def __init__(self, path=None):
+        self.path = path or default_cache_path()
+        self.entries = {}
+        self.probes = 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self.entries = data["toolchains"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def get(self, cc):
+        path = resolve_compiler(cc)
+        st = os.stat(path)
+        entry = self.entries.get(path)
+        if (entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns
+                and entry["host_os"] == platform.system()):
+            return ToolchainInfo(**dict(entry, system_includes=tuple(entry["system_includes"])))
+        info = probe(path)
+        self.probes += 1
+        self.entries[path] = asdict(info)
+        self.save()
+        return info
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "toolchains": self.entries}, f)
+        os.replace(tmp_path, self.path)
+
+
+def load_toolchain(cc, cache_path=None):
+    """ToolchainInfo for cc, probing the compiler only on a cache miss."""
+    return ToolchainCache(cache_path).get(cc)
+
+
+def _make_escape(text):
+    return text.replace("$", "$$").replace("#", "\\#")
+
+
+def render_mk(info, cc):
+    """Make fragment with the facts srcs/Makefile reads instead of spawning tools.
+
+    TOOLCHAIN_CC is cc exactly as make passed it, so the Makefile can tell
+    when CC changed by comparing strings.
+    """
+    includes = " ".join(f'"{_make_escape(d)}"' for d in info.system_includes)
+    return ("# Generated by toolchain_cache.py - do not edit\n"
+            f"TOOLCHAIN_CC := {_make_escape(cc)}\n"
+            f"TOOLCHAIN_HOST_OS := {info.host_os}\n"
+            f"TOOLCHAIN_VERSION := {_make_escape(info.version)}\n"
+            f"TOOLCHAIN_TARGET := {_make_escape(info.target)}\n"
+            f"TOOLCHAIN_SYSTEM_INCS := {includes}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cache compiler version, target, macros and system includes")
+    parser.add_argument("--cc", required=True, help="Compiler binary (xc32-gcc)")
+    parser.add_argument("--cache", help="Cache file (default: user cache folder)")
+    parser.add_argument("--mk", help="Also write the make fragment here")
+    parser.add_argument("show", nargs="?", default="summary",
+                        choices=("summary", "help", "macros", "includes", "json"),
+                        help="What to print (default: summary)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Print nothing but errors")
+    args = parser.parse_args()
+
+    try:
+        info = load_toolchain(args.cc, args.cache)
+        if args.mk:
+            os.makedirs(os.path.dirname(args.mk) or ".", exist_ok=True)
+            write_if_changed(args.mk, render_mk(info, args.cc))
+    except (OSError, ToolchainError) as ex:
+        print(f"Error probing toolchain: {ex}")
+        sys.exit(1)
+
+    if args.quiet:
+        return
+    if args.show == "help":
+        sys.stdout.write(info.help)
+    elif args.show == "macros":
+        for name, value in sorted(info.macros.items()):
+            print(f"#define {name} {value}".rstrip())
+    elif args.show == "includes":
+        for directory in info.system_includes:
+            print(directory)
+    elif args.show == "json":
+        print(json.dumps(asdict(info), indent=2))
+    else:
+        print(f"{info.cc}\n  version: {info.version or 'unknown'}\n"
+              f"  target:  {info.target or 'unknown'}\n"
+              f"  {len(info.macros)} built-in macros, "
+              f"{len(info.system_includes)} system include folders")
+
+
+if __name__ == "__main__":
+    main()
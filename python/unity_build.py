@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Unity Build
+Groups the C sources under srcs/ into jumbo translation units, one set per
+directory, so xc32-gcc is spawned and the DFP headers are parsed once per
+batch instead of once per file. Files whose file-scope statics, types or
+macros would leak into a neighbour are compiled on their own.
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+
+DEFAULT_BATCH = 16
+UNITY_MK = "unity.mk"
+SCAN_CACHE = "scan_cache.json"
+# Bumped whenever scan_unit changes what it records
+SCAN_VERSION = 2
+
+_COMMENT = re.compile(r"/\*.*?\*/|//[^\n]*", re.S)
+_LITERAL = re.compile(r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'')
+_DIRECTIVE = re.compile(r"^[ \t]*#[ \t]*(\w+)(.*)$", re.M)
+_IDENT = re.compile(r"[A-Za-z_]\w*")
+# Marker a file can carry to always be compiled on its own
+ISOLATE_MARKER = "unity: isolate"
+
+
+def _strip(text):
+    """Remove comments and string/char literals, keeping line structure."""
+    text = _COMMENT.sub(lambda m: "\n" * m.group(0).count("\n"), text)
+    return _LITERAL.sub('""', text)
+
+
+_TAG_KEYWORDS = ("struct", "union", "enum")
+
+
+def _type_body_tag(statement):
+    """For a '{' after statement: (keyword, tag or None) if it opens a type body."""
+    for index in range(len(statement) - 1, -1, -1):
+        if statement[index] in _TAG_KEYWORDS:
+            rest = statement[index + 1:]
+            if len(rest) <= 1 and all(_IDENT.fullmatch(tok) for tok in rest):
+                return statement[index], (rest[0] if rest else None)
+            return None
+    return None
+
+
+def _file_scope_names(code):
+    """Names a file defines at file scope: (private, tags).
+
+    private holds static declarations, typedef names and enumerators; tags
+    holds struct/union/enum tags. Tags and enumerators of types nested in a
+    file-scope type are file scope in C too, so they are included.
+    """
+    names, tags = set(), set()
+    # One entry per open brace: "struct"/"union"/"enum" for a type body at
+    # file scope, "block" for function bodies and initializers
+    stack = []
+    statement = outer = []
+    expect_enumerator = False
+    for token in re.finditer(r"[A-Za-z_]\w*|[{};(=\[,)]", code):
+        tok = token.group(0)
+        in_types = all(kind != "block" for kind in stack)
+        if tok == "{":
+            head = _type_body_tag(statement) if in_types else None
+            if head:
+                kind, tag = head
+                if tag:
+                    tags.add(tag)
+                if not stack:
+                    # Resumes after the body: 'typedef struct tag {...} name;'
+                    outer = statement
+                stack.append(kind)
+                expect_enumerator = kind == "enum"
+                statement = []
+                continue
+            if not stack and statement and statement[0] == "static":
+                _add_declared(statement, names)
+            stack.append("block")
+            statement = []
+        elif tok == "}":
+            kind = stack.pop() if stack else "block"
+            expect_enumerator = False
+            statement = outer if not stack and kind != "block" else []
+        elif not in_types:
+            continue
+        elif stack and stack[-1] == "enum":
+            if expect_enumerator and _IDENT.fullmatch(tok):
+                names.add(tok)
+            expect_enumerator = tok == ","
+        elif tok == ";":
+            if not stack and statement:
+                if statement[0] == "static" or "typedef" in statement:
+                    _add_declared(statement, names)
+            statement = []
+        else:
+            statement.append(tok)
+    return names, tags
+
+
+def _add_declared(statement, names):
+    """Record the declarator names of 'static ... name (' / '=' / '[' / ';'.
+
+    A name in parentheses, as in 'typedef void (*name)(void)', is the
+    declarator of a function pointer.
+    """
+    last = None
+    for index, tok in enumerate(statement):
+        if tok == "(" and statement[index + 2:index + 3] == [")"] \
+                and _IDENT.fullmatch(statement[index + 1]):
+            names.add(statement[index + 1])
+            return
+        if tok in ("(", "=", "[", ","):
+            if last:
+                names.add(last)
+            if tok != ",":
+                return
+            last = None
+        elif _IDENT.fullmatch(tok):
+            last = tok
+    if last:
+        names.add(last)
+
+
+def scan_unit(path):
+    """Return the names a source file would leak into a jumbo file.
+
+    {"private": [...statics, typedefs, enumerators and macros left defined...],
+     "tags": [...struct/union/enum tags defined...],
+     "tokens": [...every identifier used...], "isolate": bool}
+    """
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    isolate = ISOLATE_MARKER in text
+    code = _strip(text)
+
+    macros = set()
+    for match in _DIRECTIVE.finditer(code):
+        directive, rest = match.group(1), match.group(2)
+        name = _IDENT.match(rest.strip())
+        if not name:
+            continue
+        if directive == "define":
+            macros.add(name.group(0))
+        elif directive == "undef":
+            macros.discard(name.group(0))
+        elif directive in ("pragma", "line"):
+            isolate = True
+
+    names, tags = _file_scope_names(_DIRECTIVE.sub("", code))
+    return {"private": sorted(names | macros),
+            "tags": sorted(tags),
+            "tokens": sorted(set(_IDENT.findall(code))),
+            "isolate": isolate}
+
+
+class ScanCache:
+    """scan_unit results persisted next to the jumbo files, keyed on size and mtime."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == SCAN_VERSION:
+                self.entries = data["files"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def scan(self, path):
+        st = os.stat(path)
+        key = [st.st_size, st.st_mtime_ns]
+        entry = self.entries.get(path)
+        if entry and entry["key"] == key:
+            return entry["scan"]
+        result = scan_unit(path)
+        self.entries[path] = {"key": key, "scan": result}
+        self.dirty = True
+        return result
+
+    def save(self, live_paths):
+        stale = set(self.entries) - set(live_paths)
+        for path in stale:
+            del self.entries[path]
+        if not (self.dirty or stale):
+            return
+        _write_if_changed(self.path, json.dumps({"version": SCAN_VERSION,
+                                                 "files": self.entries}))
+
+
+def find_sources(src_dir, max_depth=4):
+    """C sources under src_dir up to max_depth folders deep, like srcs/Makefile."""
+    sources = []
+    base_depth = src_dir.rstrip("/").count("/")
+    for dirpath, dirnames, filenames in os.walk(src_dir):
+        if dirpath.rstrip("/").count("/") - base_depth >= max_depth - 1:
+            dirnames[:] = []
+        dirnames.sort()
+        sources += [f"{dirpath}/{name}" for name in sorted(filenames) if name.endswith(".c")]
+    return sources
+
+
+def find_conflicts(scans):
+    """Return the paths whose private names or tags appear in another file of the group."""
+    users = {}
+    for path, scan in scans.items():
+        for token in scan["tokens"]:
+            users.setdefault(token, set()).add(path)
+    conflicts = set()
+    for path, scan in scans.items():
+        if scan["isolate"]:
+            conflicts.add(path)
+            continue
+        for name in scan["private"] + scan["tags"]:
+            if len(users.get(name, ())) > 1:
+                conflicts.add(path)
+                break
+    return conflicts
+
+
+def plan_batches(sources, scan, batch_size=DEFAULT_BATCH, src_dir="."):
+    """Split sources into (batches, singles).
+
+    batches is [(name, [paths])], grouped by directory with at most
+    batch_size files each; singles are the files compiled on their own
+    because they conflict with a neighbour or have no batch partner.
+    """
+    by_dir = {}
+    for path in sources:
+        by_dir.setdefault(os.path.dirname(path), []).append(path)
+
+    batches, singles = [], []
+    for directory, paths in sorted(by_dir.items()):
+        conflicts = find_conflicts({path: scan(path) for path in paths})
+        members = [path for path in paths if path not in conflicts]
+        singles += [path for path in paths if path in conflicts]
+        chunks = [members[i:i + batch_size] for i in range(0, len(members), batch_size)]
+        label = os.path.relpath(directory, src_dir).replace(os.sep, "_").replace("/", "_")
+        label = "root" if label == "." else label
+        for index, chunk in enumerate(chunks):
+            if len(chunk) == 1:
+                singles += chunk
+            else:
+                batches.append((f"{label}_{index}", chunk))
+    return batches, sorted(singles)
+
+
+def _write_if_changed(path, text):
+    """Write text unless the file already holds it; keeps make timestamps stable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == text:
+                return False
+    except OSError:
+        pass
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+    return True
+
+
+def write_unity(src_dir, out_dir, batch_size=DEFAULT_BATCH):
+    """Write the jumbo sources and unity.mk; returns (batches, singles)."""
+    os.makedirs(out_dir, exist_ok=True)
+    cache = ScanCache(os.path.join(out_dir, SCAN_CACHE))
+    sources = find_sources(src_dir)
+    batches, singles = plan_batches(sources, cache.scan, batch_size, src_dir)
+    cache.save(sources)
+
+    keep = {UNITY_MK, SCAN_CACHE}
+    for name, paths in batches:
+        filename = f"{name}.c"
+        keep.add(filename)
+        lines = ["/* Unity batch generated by unity_build.py - do not edit */\n"]
+        lines += [f'#include "{os.path.relpath(path, out_dir)}"\n'.replace("\\", "/")
+                  for path in paths]
+        _write_if_changed(os.path.join(out_dir, filename), "".join(lines))
+
+    # Drop jumbo files from an earlier layout so they are not picked up again
+    for entry in os.scandir(out_dir):
+        if entry.name.endswith(".c") and entry.name not in keep:
+            os.remove(entry.path)
+
+    mk = ["# Generated by unity_build.py - do not edit\n",
+          f"UNITY_MK_BATCH := {batch_size}\n",
+          "UNITY_SRCS := " + " ".join(f"{out_dir}/{name}.c" for name, _ in batches) + "\n",
+          "UNITY_SINGLE := " + " ".join(singles) + "\n"]
+    mk_path = os.path.join(out_dir, UNITY_MK)
+    if not _write_if_changed(mk_path, "".join(mk)):
+        # make reruns this script on every build while unity.mk looks older
+        # than the sources, so refresh its timestamp even when unchanged
+        os.utime(mk_path)
+    return batches, singles
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Group srcs/ C files into unity (jumbo) translation units")
+    parser.add_argument("--src-dir", default="../srcs", help="Source folder (default: ../srcs)")
+    parser.add_argument("--out-dir", default="../objs/unity",
+                        help="Where the jumbo files and unity.mk go (default: ../objs/unity)")
+    parser.add_argument("-b", "--batch", type=int, default=DEFAULT_BATCH,
+                        help="Maximum files per jumbo file (default: 16)")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="List the files compiled on their own")
+    args = parser.parse_args()
+
+    if args.batch < 2:
+        print("Error: --batch must be at least 2")
+        sys.exit(2)
+    try:
+        batches, singles = write_unity(args.src_dir.rstrip("/"), args.out_dir.rstrip("/"),
+                                       args.batch)
+    except OSError as ex:
+        print(f"Error writing unity build files: {ex}")
+        sys.exit(1)
+
+    batched = sum(len(paths) for _, paths in batches)
+    print(f"Unity build: {batched} files in {len(batches)} batches, "
+          f"{len(singles)} compiled on their own")
+    if args.verbose:
+        for path in singles:
+            print(f"  single  {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+PIC32MZ Watch Build
+Rebuilds a project whenever a file in srcs/ or incs/ is saved. The tree is
+kept as an in-memory snapshot (os.scandir, size and mtime per file); on
+Linux inotify wakes the watcher, elsewhere the snapshot is polled. Bursts of
+saves are debounced into one build, the objects affected by the change are
+reported from other/build_graph.json, and make rebuilds only those, relinks
+and (by default) converts to hex and validates the image.
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import ctypes
+import argparse
+import subprocess
+
+WATCH_DIRS = ("srcs", "incs")
+WATCH_EXTENSIONS = (".c", ".h", ".S", ".s", ".inc")
+DEFAULT_DEBOUNCE = 0.1
+DEFAULT_POLL = 0.25
+# A save burst never holds a build back longer than this
+MAX_DEBOUNCE = 1.0
+
+# inotify(7) event mask: file written, created, deleted or renamed
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_WATCH_MASK = (_IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+               | _IN_CREATE | _IN_DELETE)
+
+
+def _watched(name):
+    return name.endswith(WATCH_EXTENSIONS) and not name.startswith((".", "#"))
+
+
+def snapshot(root, dirs=WATCH_DIRS):
+    """({path: (size, mtime_ns)}, [directories]) for the watched trees."""
+    files = {}
+    folders = []
+    stack = [os.path.join(root, d) for d in dirs if os.path.isdir(os.path.join(root, d))]
+    while stack:
+        folder = stack.pop()
+        folders.append(folder)
+        try:
+            entries = list(os.scandir(folder))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith("."):
+                        stack.append(entry.path)
+                elif _watched(entry.name):
+                    st = entry.stat()
+                    files[entry.path] = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                continue
+    return files, folders
+
+
+def diff(old, new):
+    """Sorted paths added, removed or modified between two snapshots."""
+    changed = [path for path, key in new.items() if old.get(path) != key]
+    changed += [path for path in old if path not in new]
+    return sorted(changed)
+
+
+class PollWaker:
+    """Wakes when a rescan of the tree differs from the last one."""
+
+    name = "polling"
+
+    def __init__(self, root, interval=DEFAULT_POLL):
+        self.root = root
+        self.interval = interval
+        self.files, _folders = snapshot(root)
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            if remaining > 0:
+                time.sleep(remaining)
+            files, _folders = snapshot(self.root)
+            if files != self.files:
+                self.files = files
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+    def close(self):
+        pass
+
+
+class InotifyWaker:
+    """Wakes on inotify events for every folder of the watched trees (Linux)."""
+
+    name = "inotify"
+
+    def __init__(self, root):
+        self.root = root
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watched = set()
+        _files, folders = snapshot(root)
+        self._watch(folders)
+
+    def _watch(self, folders):
+        for folder in folders:
+            if folder in self.watched:
+                continue
+            if self.libc.inotify_add_watch(self.fd, os.fsencode(folder), _WATCH_MASK) < 0:
+                err = ctypes.get_errno()
+                if err in (errno.ENOENT, errno.ENOTDIR):
+                    continue
+                self.close()
+                raise OSError(err, os.strerror(err))
+            self.watched.add(folder)
+
+    def _drain(self):
+        while True:
+            try:
+                if not os.read(self.fd, 65536):
+                    return
+            except BlockingIOError:
+                return
+
+    def wait(self, timeout=None):
+        ready, _w, _x = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        self._drain()
+        # New folders need their own watch before files appear in them
+        _files, folders = snapshot(self.root)
+        self._watch(folders)
+        return True
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def make_waker(root, poll=False, interval=DEFAULT_POLL):
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWaker(root)
+        except (OSError, AttributeError):
+            pass  # no inotify or out of watches: fall back to polling
+    return PollWaker(root, interval)
+
+
+def affected_objects(root, changed):
+    """Objects the changed files rebuild, from the exported build graph (None if unknown)."""
+    from build_graph import load_build_graph
+    graph = load_build_graph(root)
+    if graph is None:
+        return None
+    changed = {os.path.relpath(path, root).replace("\\", "/") for path in changed}
+    return sorted(unit["object"] for unit in graph["units"]
+                  if unit["source"] in changed or changed.intersection(unit["deps"]))
+
+
+def build_command(make, jobs, hex_image, make_args):
+    return [make, f"-j{jobs}", "all" if hex_image else "link", *make_args]
+
+
+def run_build(root, command):
+    env = dict(os.environ)
+    # A parent make's jobserver descriptors are not inherited by the child
+    for name in ("MAKEFLAGS", "MFLAGS", "MAKELEVEL"):
+        env.pop(name, None)
+    return subprocess.run(command, cwd=root, env=env).returncode
+
+
+def watch(root, command, debounce=DEFAULT_DEBOUNCE, poll=False, interval=DEFAULT_POLL,
+          initial=True, log=print):
+    waker = make_waker(root, poll, interval)
+    files, _folders = snapshot(root)
+    log(f"Watching {', '.join(WATCH_DIRS)} in {root} ({waker.name}, {len(files)} files); "
+        f"Ctrl+C to stop")
+    try:
+        if initial:
+            run_build(root, command)
+        while True:
+            waker.wait(None)
+            first = time.monotonic()
+            # Debounce: wait for a quiet period, but not longer than MAX_DEBOUNCE
+            while time.monotonic() - first < MAX_DEBOUNCE and waker.wait(debounce):
+                pass
+            new_files, _folders = snapshot(root)
+            changed = diff(files, new_files)
+            files = new_files
+            if not changed:
+                continue
+            names = ", ".join(os.path.relpath(p, root) for p in changed[:3])
+            more = f" and {len(changed) - 3} more" if len(changed) > 3 else ""
+            objects = affected_objects(root, changed)
+            log(f"\n>>> {names}{more} changed"
+                + (f"; {len(objects)} object(s) to rebuild" if objects is not None else ""))
+            status = run_build(root, command)
+            elapsed = time.monotonic() - first
+            log(f"<<< {'build ok' if status == 0 else f'build failed ({status})'} "
+                f"in {elapsed:.2f} s after the first change")
+    except KeyboardInterrupt:
+        log("Stopped watching")
+    finally:
+        waker.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rebuild a PIC32MZ project whenever srcs/ or incs/ change")
+    parser.add_argument("project", nargs="?", default=".",
+                        help="Project root (default: current directory)")
+    parser.add_argument("--make", default="make", help="make executable (default: make)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Parallel make jobs (default: CPU count)")
+    parser.add_argument("--no-hex", action="store_true",
+                        help="Stop after linking (skip bin2hex and validation)")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE,
+                        help="Quiet seconds that end a burst of saves (default: 0.1)")
+    parser.add_argument("--poll", action="store_true", help="Poll even where inotify works")
+    parser.add_argument("--interval", type=float, default=DEFAULT_POLL,
+                        help="Polling interval in seconds (default: 0.25)")
+    parser.add_argument("--no-initial", action="store_true",
+                        help="Do not build once before watching")
+    parser.epilog = "Arguments after -- are passed to make, e.g. -- UNITY=1"
+    argv = sys.argv[1:]
+    make_args = []
+    if "--" in argv:
+        make_args = argv[argv.index("--") + 1:]
+        argv = argv[:argv.index("--")]
+    args = parser.parse_args(argv)
+
+    root = os.path.abspath(args.project)
+    # Keep our lines in order with make's output when piped to a log or IDE
+    sys.stdout.reconfigure(line_buffering=True)
+    if not os.path.isdir(os.path.join(root, "srcs")):
+        print(f"Error starting watch: no srcs folder in {root}")
+        sys.exit(1)
+    watch(root, build_command(args.make, args.jobs, not args.no_hex, make_args),
+          args.debounce, args.poll, args.interval, not args.no_initial)
+
+
+if __name__ == "__main__":
+    main()